@@ -1 +1,91 @@
 LLM_CONFIG = {"model": "gpt-4o", "api_key": '','seed':0,"cache_seed": None,}
+
+## Opt-in on-disk cache for LLM responses, keyed on a hash of the full request. ttl is in seconds (None never expires).
+CACHE_CONFIG = {"enabled": False, "path": "assets/llm_cache", "max_entries": 10000, "ttl": None}
+
+## Backend for remote calls: 'live', 'record', 'replay' or 'local'. The SCENEPROG_BACKEND environment variable overrides mode.
+## latency_scale multiplies recorded latencies during replay (0.0 replays instantly).
+BACKEND_CONFIG = {"mode": "live", "path": "assets/recordings", "latency_scale": 0.0}
+
+## Token budgets of the prompt builder, keyed by call-site label. 'examples' caps the retrieved examples of a prompt,
+## 'errors' caps the captured stderr handed to the debugger and checker (the tail is kept).
+PROMPT_CONFIG = {
+    "encoding": "o200k_base",
+    "budgets": {
+        "program_synthesizer": {"examples": 6000},
+        "program_synthesizer.constraints": {"examples": 6000},
+        "program_synthesizer.refine": {"context": 4000},
+        "debugger": {"errors": 2000},
+        "checker": {"errors": 2000},
+    },
+}
+
+## Re-asks of responses that do not match the expected JSON keys or schema. backoff is the first delay in seconds, doubled on every retry.
+RETRY_CONFIG = {"max_retries": 3, "backoff": 0.5}
+
+## Model tiers and the tier each call-site label is routed to. Every tier has its own latency (timeout, seconds) and
+## cost (max_tokens, None is unbounded) budget. Responses failing validation are retried on the next tier in 'order'.
+ROUTING_CONFIG = {
+    "tiers": {
+        "fast": {"model": "gpt-4o-mini", "timeout": 30, "max_tokens": 1024},
+        "default": {"model": LLM_CONFIG['model'], "timeout": 120, "max_tokens": None},
+        "strong": {"model": "gpt-4o", "timeout": 180, "max_tokens": None},
+    },
+    "order": ["fast", "default", "strong"],
+    "default_tier": "default",
+    "force_accurate_tier": "strong",
+    "routes": {
+        "checker": "fast",
+        "wall_color": "fast",
+        "ignore_overlap": "fast",
+        "painting_prompt": "fast",
+        "scale_agent.concluding_llm": "fast",
+        "object3d_retriever.concluding_llm": "fast",
+        "object_database.concluding_llm": "fast",
+    },
+}
+
+## Per-provider limits for remote calls: token bucket (rate requests/s, burst) and max requests in flight, per process.
+## 'retry' is the jittered exponential backoff applied to 429/5xx and connection errors.
+RATE_LIMIT_CONFIG = {
+    "providers": {
+        "openai": {"rate": 8.0, "burst": 16, "max_concurrency": 16},
+        "openai_embeddings": {"rate": 20.0, "burst": 50, "max_concurrency": 8},
+        "clip": {"rate": 20.0, "burst": 20, "max_concurrency": 4},
+        "text2img": {"rate": 2.0, "burst": 2, "max_concurrency": 1},
+        "objaverse": {"rate": 10.0, "burst": 10, "max_concurrency": 4},
+    },
+    "retry": {"max_retries": 5, "backoff": 1.0, "max_backoff": 30.0},
+}
+
+## Concurrent embed_query calls are sent as embed_documents batches of up to max_batch texts, waiting at most max_wait seconds.
+## 'cache' is the persistent per-model embedding store consulted before any request, max_entries rows per model (LRU).
+EMBEDDING_CONFIG = {
+    "max_batch": 64,
+    "max_wait": 0.01,
+    "cache": {"enabled": True, "path": "assets/embedding_cache", "max_entries": 20000, "float16": True},
+}
+
+## bentoml services. Every endpoint has a deadline in seconds; the SCENEPROG_<SERVICE>_URL environment variable overrides url
+## (e.g. a local stand-in server). Hedged endpoints send one duplicate request once the primary exceeds the 'quantile'
+## latency of the last 'window' calls, provided at least 'min_samples' calls were observed.
+SERVICE_CONFIG = {
+    "services": {
+        "clip": {"url": "http://chetak.ucsd.edu:3002", "endpoints": {"encode_image": {"timeout": 30, "hedge": True}, "encode_text": {"timeout": 10, "hedge": True}, "rank": {"timeout": 30, "hedge": True}}},
+        "text2img": {"url": "http://chetak.ucsd.edu:3003", "endpoints": {"txt2img": {"timeout": 60, "hedge": False}}},
+        "objaverse": {"url": "http://chetak.ucsd.edu:3001", "endpoints": {"retrieve": {"timeout": 30, "hedge": True}}},
+    },
+    "hedge": {"quantile": 0.95, "min_samples": 20, "window": 200},
+}
+
+## Dimension priors consulted before the scale agent. A description is matched to the nearest earlier description or
+## 3D-FUTURE category embedded with embedding_model when their cosine similarity reaches similarity_threshold. The
+## threshold is raised above the similarity of any two categories whose sizes differ by more than size_ratio in some
+## dimension (plus margin), so that the model cannot confuse such categories at the configured threshold.
+DIMENSION_PRIORS_CONFIG = {
+    "path": "assets/dimension_priors.json",
+    "embedding_model": "text-embedding-3-large",
+    "similarity_threshold": 0.9,
+    "size_ratio": 1.25,
+    "margin": 0.02,
+}
@@ -11,12 +11,14 @@ scene.place_window(name='window1', wall='left_wall', type='standard', position='
 scene.place_door(name='door1', wall='front_wall', position='middle')
 
 # Add furniture
-scene.add(name='bed', desc='A twin bed')
-scene.add(name='nightstand', desc='A small nightstand')
-scene.add(name='dresser', desc='A compact dresser')
-scene.add(name='desk', desc='A small writing desk')
-scene.add(name='chair', desc='A lightweight chair')
-scene.add(name='rug1', desc='A decorative rug')
+scene.add_many([
+    ('bed', 'A twin bed'),
+    ('nightstand', 'A small nightstand'),
+    ('dresser', 'A compact dresser'),
+    ('desk', 'A small writing desk'),
+    ('chair', 'A lightweight chair'),
+    ('rug1', 'A decorative rug'),
+])
 
 # Place the bed against the back wall at the center
 scene.bed.place_global(x='center', y='floor', z='back_wall', delta_x=0.0, delta_y=0.0, delta_z=0.0)
@@ -11,6 +11,8 @@ from modules.utils.codegen import CodeExecutor
 from pydantic import BaseModel, Field
 from typing import Optional
 
+MAX_CONCURRENCY = 8
+
 class FunctionResult(BaseModel):
     status: str = Field(..., description="Summary of the function's execution outcome.")
     details: Optional[str] = Field(None, description="Additional details or issues, if any.")
@@ -99,20 +101,27 @@ def resolve_relative_scale() -> FunctionResult:
     dims = tool.dims
     scene_size = tool.weights['scene']
     
-    resolver_llm = LLM(system_desc="""You are responsible for ensuring that the relative scale of objects in the scene is appropriate and realistic, adhearing to factors such as funcionality, ergonomics, asthetics and relative placement of objects.""")
-    rel_placement_llm = LLM(system_desc="""Given the scene program, briefly describe the relative placement of the objects mentioned in the input. For example, a lamp placed on a table, a nightstand placed left adjacent to a bed, etc.""")
+    resolver_llm = LLM(system_desc="""You are responsible for ensuring that the relative scale of objects in the scene is appropriate and realistic, adhearing to factors such as funcionality, ergonomics, asthetics and relative placement of objects.""", name="resolver_llm")
+    rel_placement_llm = LLM(system_desc="""Given the scene program, briefly describe the relative placement of the objects mentioned in the input. For example, a lamp placed on a table, a nightstand placed left adjacent to a bed, etc.""", name="rel_placement_llm")
     scale_determination_llm = LLM(system_desc="""Given the suggested dimensions, output the updated dimensions for all the objects in the order of (width, depth, height) present in the scene program. You can do this by creating a list such as the following:
 Your response:
 1. chair: 0.5m x 0.5m x 0.5m  (width, depth, height)
 2. table: 1m x 1m x 1m
 ...
-""")
-    resolutions = ""
+""", name="scale_determination_llm")
     print("Resolving relative scale...")
+    groups = []
     for parent in scene_graph.children:
         children = parent.get_all_children()[1]
         if len(children) == 0:
             continue
+        groups.append((parent, children))
+    
+    ## the groups are independent of each other, so both rounds of queries are issued as batches
+    rel_placements = rel_placement_llm.run_many([f"Derive the relative placements for {parent}, {children} from the scene program: " + program for parent, children in groups], max_concurrency=MAX_CONCURRENCY)
+    
+    prompts = []
+    for (parent, children), rel_placement in zip(groups, rel_placements):
         prompt = f"""
 We are creating a scene for the input: {input}. Whose dimensions (width x depth in meters) are: {scene_size}. 
 Following objects along with their dimensions (in meters, in the order width, height, depth) have been identified: 
@@ -122,16 +131,19 @@ Parent Object: {parent}. Dimensions: {dims[parent.name]}.
             prompt += f"""
 Child Object: {child}. Dimensions: {dims[child]}.
 """
-        prompt += f"""The relative placement of the objects is as follows:{rel_placement_llm.run("Derive the relative placements for {parent}, {children} from the scene program: " + program)}"""
+        prompt += f"""The relative placement of the objects is as follows:{rel_placement}"""
         prompt += f"""\nDo you think the relative scale of the objects: {parent}, {children} is appropriate? If you think the scales need to be adjusted by a lot, then you should suggest the new dimensions. If you think the scales are already reasonable or maybe only slightly off, then don't suggest any changes for that (you can skip that object).
 Moreover, I want you to try to maintain the aspect original aspect ratio as much as possible. Think step by step."""
-        resolution = resolver_llm.run(prompt)
+        prompts.append(prompt)
+    
+    resolutions = ""
+    for resolution in resolver_llm.run_many(prompts, max_concurrency=MAX_CONCURRENCY):
         resolutions += resolution + "\n"
     
     prompt = f"Based on the following suggestions: {resolutions}\nPlease generated the updated dimensions for the objects in the scene."
     updated_dims = scale_determination_llm.run(prompt)
     with open('tmp/object_scale.txt', 'a') as f:
-        f.write(updated_dims)
+        f.write(updated_dims.strip() + '\n')
         
     return FunctionResult(status="Solved")
 
@@ -250,7 +262,7 @@ Some example outputs are:
 om.conversation_area(['chair1', 'chair2', 'chair3'])
 om.face_towards('chair1', 'table1')
 om.face_towards('tv', 'sofa1')
-""", response_format='code')
+""", response_format='code', name="orientation_coder")
     
     prompt = f"""
 Input description: {input}
@@ -1,8 +1,7 @@
 import numpy as np
-import trimesh
 import json
-from modules.sdl.object import Object3D
 from modules.sdl.scene import SceneHelper
+from modules.sdl.proxy import ProxyBox
 
 class CorrectionComputer:
     def __init__(self, scene, obj1, obj2, buffer, fix_obj2=False):
@@ -194,7 +193,9 @@ class CorrectionComputer:
         def compute_free_space_around_obj_sg(obj):
             obj1_posx_0, obj1_negx_0, obj1_posz_0, obj1_negz_0 = compute_free_space_around_obj(obj)
             
-            parent = self.helper.sg.get_object(obj.name).parent
+            ## proxies are not part of the scene graph and have no parents
+            node = self.helper.sg.get_object(obj.name)
+            parent = node.parent if node is not None else 'root'
             
             anchor = [obj.name]
             free_space = [[obj1_posx_0, obj1_negx_0, obj1_posz_0, obj1_negz_0]]
@@ -215,6 +216,9 @@ class CorrectionComputer:
         def compute_mass(obj):
             if obj == 'root':
                 return 10**6
+            if self.helper.sg.get_object(obj) is None:
+                w,h,d = [o for o in [self.obj1, self.obj2] if o.name == obj][0].get_whd()
+                return w*d
             _, children = self.helper.sg.get_object(obj).get_all_children()
             total_mass = self.scene.get_object(obj).get_whd()[0]*self.scene.get_object(obj).get_whd()[2]
             for child in children:
@@ -441,26 +445,8 @@ class Constraints:
             v22 = front_side[1]+dist*vec
             v21 = front_side[0]+dist*vec
             
-            v110 = np.array([v11[0], 0, v11[1]])            
-            v120 = np.array([v12[0], 0, v12[1]])
-            
-            v210 = np.array([v21[0], 0, v21[1]])
-            v220 = np.array([v22[0], 0, v22[1]])
-            
-            v111 = np.array([v11[0], 2, v11[1]])
-            v121 = np.array([v12[0], 2, v12[1]])
-            
-            v211 = np.array([v21[0], 2, v21[1]])
-            v221 = np.array([v22[0], 2, v22[1]])
-            
-            ## Create a triangular mesh with the eight vertices
-            vertices = np.array([v110, v120, v210, v220, v111, v121, v211, v221])
-            faces = np.array([[0,1,2], [1,3,2], [4,5,6], [5,6,7], [0,1,4], [1,5,4], [2,3,6], [3,6,7], [0,2,4], [2,4,6], [1,5,3], [3,5,7]])
-            mesh = trimesh.Trimesh(vertices, faces, process=False)
-            # mesh.export('test.obj')
-             
             rand_id = np.random.randint(1000)
-            clearance_obj = Object3D(f'clearance_{rand_id}', desc=None, scene=self.scene, use_mesh=mesh)
+            clearance_obj = ProxyBox.around(f'clearance_{rand_id}', self.scene, [v11, v21, v12, v22], ymin=0, ymax=2)
 
         elif type == 'sides':
             
@@ -476,43 +462,26 @@ class Constraints:
             v12 = right_side[0]+dist*vec
             v22 = right_side[1]+dist*vec
             
-            v110 = np.array([v11[0], 0, v11[1]])
-            v120 = np.array([v12[0], 0, v12[1]])
-            
-            v210 = np.array([v21[0], 0, v21[1]])
-            v220 = np.array([v22[0], 0, v22[1]])
-            
-            v111 = np.array([v11[0], 2, v11[1]])
-            v121 = np.array([v12[0], 2, v12[1]])
-            
-            v211 = np.array([v21[0], 2, v21[1]])
-            v221 = np.array([v22[0], 2, v22[1]])
-            
-            ## Create a triangular mesh with the eight vertices
-            vertices = np.array([v110, v120, v210, v220, v111, v121, v211, v221])
-            faces = np.array([[0,1,2], [1,2,3], [4,5,6], [5,6,7], [0,1,4], [1,4,5], [2,3,6], [3,6,7], [0,2,4], [2,4,6], [1,3,5], [3,5,7]])
-            
-            mesh = trimesh.Trimesh(vertices, faces, process=False)
             rand_id = np.random.randint(1000)
-            clearance_obj = Object3D(f'clearance_{rand_id}', desc=None, scene=self.scene, use_mesh=mesh)
+            clearance_obj = ProxyBox.around(f'clearance_{rand_id}', self.scene, [v11, v21, v12, v22], ymin=0, ymax=2)
             
-        clearance_obj.init()
+        ## the clearance region is an obstacle for the free space and scene graph queries of the corrections
         org_obj_list = self.scene.objects.copy()
         self.scene.objects.append(clearance_obj)
-        
-        for o in self.scene.objects:
-            if o in [obj, clearance_obj] or o in obj.support_objs or o in self.scene.overlap_exceptions or o in omit_objs:
-                continue
-        
-            if self.are_boxes_intersecting(o, clearance_obj):
-                computer = CorrectionComputer(self.scene, o, clearance_obj, self.BUFFER, fix_obj2=True)
-                feedback = computer.compute_overlap_correction()
-                
-                if feedback is not None:
-                    anchor, direction, magnitude = feedback
-                    self.grads[anchor] += magnitude*direction*self.weights['clearance']
-        
-        self.scene.objects = org_obj_list.copy()
+        try:
+            for o in self.scene.objects:
+                if o in [obj, clearance_obj] or o in obj.support_objs or o in self.scene.overlap_exceptions or o in omit_objs:
+                    continue
+            
+                if self.are_boxes_intersecting(o, clearance_obj):
+                    computer = CorrectionComputer(self.scene, o, clearance_obj, self.BUFFER, fix_obj2=True)
+                    feedback = computer.compute_overlap_correction()
+                    
+                    if feedback is not None:
+                        anchor, direction, magnitude = feedback
+                        self.grads[anchor] += magnitude*direction*self.weights['clearance']
+        finally:
+            self.scene.objects = org_obj_list.copy()
     
     def access(self, obj1, obj2, min_dist, max_dist):
         computer = CorrectionComputer(self.scene, obj1, obj2, self.BUFFER)
@@ -593,11 +562,13 @@ class Constraints:
         for obj in self.scene.objects:
             before_locs[obj.name] = obj.get_loc()
         
-        for obj in self.grads:
-            step = self.lr*self.grads[obj]
-            self.displacement[obj] += step
-            self.scene.get_object(obj).displace(delta_x=step[0], delta_y=step[1], delta_z=step[2])
-            obj_steps[obj] = step
+        ## dependent objects are recomputed once after all the displacements
+        with self.scene.deps.batch():
+            for obj in self.grads:
+                step = self.lr*self.grads[obj]
+                self.displacement[obj] += step
+                self.scene.get_object(obj).displace(delta_x=step[0], delta_y=step[1], delta_z=step[2])
+                obj_steps[obj] = step
             
         step_sizes = [np.max(np.abs(obj_steps[obj])) for obj in self.grads]
         if np.max(step_sizes) < 0.05:
@@ -4,7 +4,8 @@ class SQA:
         self.llm = LLM(
             system_desc="Your task is to examine the images rendered from different corners of the room and answer the user's query. You must use relevant context provided by the user and the images to generate a helpful response.",
             image_input=True, 
-            num_images=4)
+            num_images=4,
+            name="sqa")
         
     def render(self):
         import subprocess
@@ -1,13 +1,17 @@
 from modules.progsyn import ProgramSynthesizer  
 from modules.optimizer import SceneOptimizer
 from modules.utils.codegen import CodeExecutor
+from modules.utils.dimensions import OVERRIDES_HEADER
+from tools.metrics import METRICS_DIR, collect_report
 import os
+import json
 
 class SceneProg:
     def __init__(self):
         self.scene_pickle_path = 'cache/scene.pkl'
         self.program_path = 'cache/program.py'
         self.input_path = 'cache/input.txt'
+        self.metrics_path = 'cache/metrics.json'
         
         self.clean()
         self.proggen = ProgramSynthesizer()
@@ -31,8 +35,9 @@ class SceneProg:
             os.system('rm -r output')
             
         os.makedirs('tmp/')
+        os.makedirs(METRICS_DIR)
         with open('tmp/object_scale.txt', 'w') as f:
-            f.write('Irrespective of what you think, you must use the following scales for the below mentioned objects')
+            f.write(OVERRIDES_HEADER + '\n')
         os.makedirs('cache')
         
     def run(self, input, output_path='output'):
@@ -45,4 +50,7 @@ class SceneProg:
         with open(self.program_path, 'r') as f:
             program = f.read()
         print("Exporting scene...")
-        self.exec.run(program+"\nscene.export()")
\ No newline at end of file
+        self.exec.run(program+"\nscene.export()")
+        
+        with open(self.metrics_path, 'w') as f:
+            json.dump(collect_report(), f, indent=4)
@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+
+class DependencyGraph:
+    def __init__(self):
+        '''
+        Placement dependencies between the objects of a scene: an object placed relative to another one, or facing it,
+        depends on it. Objects whose dependencies moved are marked dirty and recomputed with their update() once per
+        flush, in topological order over the affected subgraph. Flushes happen when the outermost batch() exits, or
+        right away outside of a batch. Objects on a cycle are recomputed once each in the order they were linked.
+        '''
+        self.dependents = {}
+        self.dirty = {}
+        self.depth = 0
+        self.flushing = False
+        self.planned = {}
+        self.recomputes = 0
+        self.flushes = 0
+        self.cycles = 0
+
+    def link(self, obj, dependent):
+        self.dependents.setdefault(obj, {})[dependent] = None
+
+    def unlink(self, obj, dependent):
+        self.dependents.get(obj, {}).pop(dependent, None)
+
+    def get_dependents(self, obj):
+        return list(self.dependents.get(obj, {}))
+
+    def changed(self, obj):
+        '''
+        Marks everything that depends on obj dirty.
+        '''
+        for dependent in self.get_dependents(obj):
+            self.mark(dependent)
+        self.flush_if_idle()
+
+    def moved(self, objs):
+        '''
+        Marks the dependents of a group of objects that moved together dirty, except the ones inside the group.
+        '''
+        for obj in objs:
+            for dependent in self.get_dependents(obj):
+                if dependent not in objs:
+                    self.mark(dependent)
+        self.flush_if_idle()
+
+    def mark(self, obj):
+        ## objects that are already part of the running flush are recomputed anyway
+        if obj not in self.planned:
+            self.dirty[obj] = None
+
+    @contextmanager
+    def batch(self):
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            self.flush_if_idle()
+
+    def flush_if_idle(self):
+        if self.depth == 0 and not self.flushing:
+            self.flush()
+
+    def _plan(self, dirty):
+        ## the dirty objects and everything depending on them that has not been recomputed in this flush yet
+        plan = {}
+        stack = list(reversed(dirty))
+        while len(stack) > 0:
+            obj = stack.pop()
+            if obj in plan or obj in self.planned:
+                continue
+            plan[obj] = None
+            stack.extend(reversed(self.get_dependents(obj)))
+        return list(plan)
+
+    def _order(self, plan):
+        ## Kahn's algorithm restricted to the planned objects, leftovers are on a cycle
+        members = set(plan)
+        indegree = {obj: 0 for obj in plan}
+        for obj in plan:
+            for dependent in self.get_dependents(obj):
+                if dependent in members:
+                    indegree[dependent] += 1
+        ready = [obj for obj in plan if indegree[obj] == 0]
+        order = []
+        while len(ready) > 0:
+            obj = ready.pop(0)
+            order.append(obj)
+            for dependent in self.get_dependents(obj):
+                if dependent in members:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        ready.append(dependent)
+        cyclic = [obj for obj in plan if indegree[obj] > 0]
+        if len(cyclic) > 0:
+            self.cycles += 1
+            print(f"Warning: placement dependencies form a cycle, {', '.join(obj.name for obj in cyclic)} are updated once each in the order they were linked.")
+        return order + cyclic
+
+    def flush(self):
+        '''
+        Recomputes every dirty object and its dependents once. Marks raised while recomputing add the objects that
+        were not planned yet to another round of the same flush.
+        '''
+        if len(self.dirty) == 0:
+            return
+        self.flushing = True
+        self.flushes += 1
+        try:
+            while len(self.dirty) > 0:
+                dirty = list(self.dirty)
+                self.dirty = {}
+                plan = self._plan(dirty)
+                for obj in plan:
+                    self.planned[obj] = None
+                for obj in self._order(plan):
+                    obj.update()
+                    self.recomputes += 1
+        finally:
+            self.flushing = False
+            self.planned = {}
+            self.dirty = {}
+
+    def stats(self):
+        return {'links': sum(len(dependents) for dependents in self.dependents.values()), 'flushes': self.flushes, 'recomputes': self.recomputes, 'cycles': self.cycles}
@@ -1,6 +1,7 @@
 from modules.sdl.object import Object3D
 import numpy as np
 import trimesh
+from modules.sdl.geometry import GEOMETRY_REGISTRY
 from tools.llm import LLM
 
 class Door(Object3D):
@@ -15,7 +16,7 @@ class Door(Object3D):
         # height_llm = LLM(system_desc="Given the height of the walls, what's a reasonable height for a door? Respond in meters following the JSON format like height:2.0", response_format='json')
         # height = float(height_llm.run(self.scene.MAX_HEIGHT)['height'])
         height = np.clip(self.scene.MAX_HEIGHT-1.0, 2.0, 3.5)
-        self.mesh = trimesh.load(self.door_path, process=False, force='mesh')
+        self.mesh = GEOMETRY_REGISTRY.get(self.door_path, lambda: trimesh.load(self.door_path, process=False, force='mesh'))
         self.visual = self.mesh.visual
         self.normalize()
         self.scale(width=wall.max_window_width(), height=height, depth=0.03)
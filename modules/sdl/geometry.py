@@ -0,0 +1,66 @@
+import threading
+import numpy as np
+import trimesh
+
+def float2int(x):
+    return (1000*x).astype(int)/1000
+
+def freeze(mesh):
+    ## shared meshes are read-only, transforms must build new arrays instead of writing into them
+    mesh.vertices.flags.writeable = False
+    mesh.faces.flags.writeable = False
+    return mesh
+
+def is_canonical(mesh):
+    return mesh.metadata.get('canonical', False)
+
+def canonicalize(mesh):
+    '''
+    Returns the mesh scaled so that its largest extent is 1 and centered on the center of its bounding box,
+    as a new read-only mesh that keeps the visual. Canonical meshes are returned as they are.
+    '''
+    if is_canonical(mesh):
+        return mesh
+    vertices = np.array(mesh.vertices, dtype=float)
+    vertices = vertices - vertices.min(axis=0)
+    vertices = float2int(vertices/vertices.max())
+    vertices = float2int(vertices - (vertices.min(axis=0)+vertices.max(axis=0))/2)
+    canonical = trimesh.Trimesh(vertices=vertices, faces=np.array(mesh.faces), process=False)
+    try:
+        canonical.visual = mesh.visual
+    except:
+        pass
+    canonical.metadata['canonical'] = True
+    return freeze(canonical)
+
+class GeometryRegistry:
+    def __init__(self):
+        '''
+        Canonical meshes of the assets in use, keyed by asset path. Objects built from the same asset share one
+        read-only mesh and its visual; an object's geometry is only copied once it is transformed.
+        '''
+        self.meshes = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, key, load):
+        '''
+        Returns the canonical mesh for key, building it from load() the first time.
+        '''
+        with self.lock:
+            if key in self.meshes:
+                self.hits += 1
+                return self.meshes[key]
+        mesh = canonicalize(load())
+        with self.lock:
+            if key not in self.meshes:
+                self.loads += 1
+                self.meshes[key] = mesh
+            return self.meshes[key]
+
+    def stats(self):
+        with self.lock:
+            return {'assets': len(self.meshes), 'hits': self.hits, 'loads': self.loads}
+
+GEOMETRY_REGISTRY = GeometryRegistry()
@@ -4,8 +4,107 @@ from scipy.spatial.transform import Rotation as R
 from tools.llm import LLM
 from tools.simpleagent import SimpleAgent
 from modules.sdl.wall import PlaneMesh
+from modules.sdl.geometry import GEOMETRY_REGISTRY, canonicalize, freeze
+from modules.utils.overlap import get_overlap_classifier
+from modules.utils.dimensions import get_dimension_priors
 import os
 import json
+import threading
+from contextlib import contextmanager
+from pydantic import BaseModel, Field
+
+class ObjectDims(BaseModel):
+    width: float = Field(..., description="Width of the object in meters")
+    depth: float = Field(..., description="Depth of the object in meters")
+    height: float = Field(..., description="Height of the object in meters")
+
+SCALE_AGENT_DESCRIPTION = """
+Given the description of the object, output the realistic wdith, depth and height of the object in meters. 
+You must respond in JSON format as follows: {{'width': 1.0, 'depth': 0.5, 'height': 1.5}}.
+    For example:
+    Input: A dining chair
+    Your Response: {{'width': 0.5, 'depth': 0.5, 'height': 1.0}}
+    Input: A king-size bed
+    Your Response: {{'width': 2.0, 'depth': 2.1, 'height': 1.5}}
+    Input: A armchair
+    Your Response: {{'width': 0.9, 'depth': 0.95, 'height': 1.0}}
+    Input: A coffee table
+    Your Response: {{'width': 1.0, 'depth': 1.0, 'height': 0.6}}
+    Input: A really long dining table
+    Your Response: {{'width': 8.0, 'depth': 3.0, 'height': 0.7}}
+    Input: A tall bookcase
+    Your Response: {{'width': 1.0, 'depth': 0.5, 'height': 2.5}}
+    Input: A small nightstand
+    Your Response: {{'width': 0.5, 'depth': 0.5, 'height': 0.5}}
+    Input: A large Chandelier
+    Your Response: {{'width': 0.5, 'depth': 0.5, 'height': 0.8}}
+    Input: Wall mounted shelves
+    Your Response: {{'width': 1.0, 'depth': 0.5, 'height': 1.0}}
+    """
+SCALE_CONTEXT_PATH = "tmp/object_scale.txt"
+
+class ScaleAgentPool:
+    def __init__(self):
+        '''
+        Process-wide pool of scale agents shared by all objects. Agents are only built when an object actually
+        needs its scale estimated, and are handed to one caller at a time since their chats are stateful.
+        Idle agents are grouped by the contents of the scale overrides file, which grows during a run; agents built
+        for earlier contents are dropped once the file changes.
+        '''
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def _evict(self, context):
+        ## called with the lock held
+        for key in [key for key in self.idle if key != context]:
+            self.evicted += len(self.idle.pop(key))
+
+    def _context(self):
+        if not os.path.exists(SCALE_CONTEXT_PATH):
+            return None
+        with open(SCALE_CONTEXT_PATH, 'r') as f:
+            return f.read()
+
+    def _create(self, has_context):
+        self.created += 1
+        return SimpleAgent(
+            name="scale_agent",
+            role="Scale the object to the correct dimensions.",
+            description=SCALE_AGENT_DESCRIPTION,
+            concluding_llm=LLM(system_desc="Go through the chat and the realistic width, depth and height of the object in meters. Respond in JSON format!", schema=ObjectDims, name="scale_agent.concluding_llm"),
+            additional_context=SCALE_CONTEXT_PATH if has_context else None,
+        )
+
+    @contextmanager
+    def acquire(self):
+        context = self._context()
+        with self.lock:
+            self._evict(context)
+            idle = self.idle.setdefault(context, [])
+            agent = idle.pop() if len(idle) > 0 else None
+        if agent is None:
+            agent = self._create(context is not None)
+        try:
+            yield agent
+        finally:
+            current = self._context()
+            with self.lock:
+                self._evict(current)
+                if current == context:
+                    self.idle.setdefault(context, []).append(agent)
+                else:
+                    self.evicted += 1
+
+    def stats(self):
+        with self.lock:
+            return {'created': self.created, 'evicted': self.evicted, 'idle': sum(len(agents) for agents in self.idle.values())}
+
+_SCALE_AGENTS = ScaleAgentPool()
+
+def get_scale_agent_pool():
+    return _SCALE_AGENTS
 
 class Object3DBase:
     def __init__(self, name, desc, scene, use_mesh=None):
@@ -36,50 +135,43 @@ class Object3DBase:
         self.on_floor = None
         self.placed_on_wall = False
         
+        ## geometry is a shared base mesh plus a pose: per-axis scale in the object's frame, rotation about y
+        ## (self.rot) and translation; the world-space mesh is only built when it is needed
+        self.base = None
+        self.scale_factors = np.ones(3)
+        self.translation = np.zeros(3)
+        self._mesh = None
+        self._local_bounds_cache = None
+        self._aabb_cache = None
         
-        self.ignore_overlap_llm = LLM(system_desc="You should return a boolean value in JSON format indicating whether the object should be ignored for overlap checks or not. Objects belonging to the following categories need to be ignored for overlap checks: 'windows', 'doors', 'curtains', 'rugs', 'paintings', 'mirrors', 'clocks'. Example output can be like (ignore_overlap:False)", response_format="json", json_keys=['ignore_overlap'])
-        self.ignore_overlap=self.ignore_overlap_llm.run(self.desc)['ignore_overlap']
-        if self.ignore_overlap:
-            self.scene.overlap_exceptions.append(self)
-            
-        self.scale_agent = SimpleAgent(
-            name="scale_agent",
-            role="Scale the object to the correct dimensions.",
-            description="""
-Given the description of the object, output the realistic wdith, depth and height of the object in meters. 
-You must respond in JSON format as follows: {{'width': 1.0, 'depth': 0.5, 'height': 1.5}}.
-    For example:
-    Input: A dining chair
-    Your Response: {{'width': 0.5, 'depth': 0.5, 'height': 1.0}}
-    Input: A king-size bed
-    Your Response: {{'width': 2.0, 'depth': 2.1, 'height': 1.5}}
-    Input: A armchair
-    Your Response: {{'width': 0.9, 'depth': 0.95, 'height': 1.0}}
-    Input: A coffee table
-    Your Response: {{'width': 1.0, 'depth': 1.0, 'height': 0.6}}
-    Input: A really long dining table
-    Your Response: {{'width': 8.0, 'depth': 3.0, 'height': 0.7}}
-    Input: A tall bookcase
-    Your Response: {{'width': 1.0, 'depth': 0.5, 'height': 2.5}}
-    Input: A small nightstand
-    Your Response: {{'width': 0.5, 'depth': 0.5, 'height': 0.5}}
-    Input: A large Chandelier
-    Your Response: {{'width': 0.5, 'depth': 0.5, 'height': 0.8}}
-    Input: Wall mounted shelves
-    Your Response: {{'width': 1.0, 'depth': 0.5, 'height': 1.0}}
-    """,
-            concluding_llm=LLM(system_desc="Go through the chat and the realistic width, depth and height of the object in meters. Respond in JSON format!", response_format="json", json_keys=['width', 'depth', 'height']),
-            additional_context="tmp/object_scale.txt" if os.path.exists("tmp/object_scale.txt") else None,
-        )
+        ## resolved lazily, see the ignore_overlap property
+        self._ignore_overlap = None
+
+    @property
+    def ignore_overlap(self):
+        if self._ignore_overlap is None:
+            self._ignore_overlap = get_overlap_classifier().classify(self.desc)
+        return self._ignore_overlap
+
+    @ignore_overlap.setter
+    def ignore_overlap(self, value):
+        self._ignore_overlap = value
 
     def copy(self, new_name):
         new_obj = Object3D(name=new_name, desc=self.desc, scene=self.scene)
-        new_obj.mesh = self.mesh.copy()
+        new_obj._ignore_overlap = self._ignore_overlap
+        ## the base mesh is shared, only the pose is copied
+        new_obj.base = self.base
+        new_obj.scale_factors = self.scale_factors.copy()
+        new_obj.rot = self.rot
+        new_obj.translation = self.translation.copy()
+        new_obj._mesh = self._mesh
+        new_obj._local_bounds_cache = self._local_bounds_cache
+        new_obj._aabb_cache = self._aabb_cache
         new_obj.visual = self.visual
         new_obj.width = self.width
         new_obj.height = self.height
         new_obj.depth = self.depth
-        new_obj.proj_vertices = self.proj_vertices.copy()
         new_obj.place_relative_params = None
         new_obj.face_towards_obj = None
         new_obj.child_of = None
@@ -117,20 +209,12 @@ You must respond in JSON format as follows: {{'width': 1.0, 'depth': 0.5, 'heigh
             self.width = width
             self.height = height
             self.depth = depth
-            self.set_proj_vertices()
             
         elif self.desc is None:
-            self.mesh = trimesh.creation.box((1,1,1),np.array([[1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1]]))
+            self.mesh = GEOMETRY_REGISTRY.get('box', lambda: trimesh.creation.box((1,1,1),np.array([[1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1]])))
             self.normalize()
         else:
-            if self.desc in self.scene.object_hash:
-                path = self.scene.object_hash[self.desc]
-            else:
-                path = self.scene.retriever.run(self.desc)
-                self.scene.object_hash[self.desc] = path
-                with open('tmp/object_hash.json', 'w') as f:
-                    json.dump(self.scene.object_hash, f)
-                    
+            path = self.scene.retrieve(self.desc)
             self.load_mesh(path)
             self.normalize()
             
@@ -139,14 +223,109 @@ You must respond in JSON format as follows: {{'width': 1.0, 'depth': 0.5, 'heigh
             self.scale(dims[0], dims[1], dims[2])
         else:
             # dims = self.scale_llm.run(self.desc)
-            dims = self.scale_agent.respond(self.desc)
+            priors = get_dimension_priors()
+            dims = priors.lookup(self.name, self.desc)
+            if dims is None:
+                with get_scale_agent_pool().acquire() as scale_agent:
+                    dims = scale_agent.respond(self.desc)
+                priors.record(self.name, self.desc, dims)
             self.scale(dims['width'], dims['depth'], dims['height'])
 
     def float2int(self, x):
         return (1000*x).astype(int)/1000
+
+    @property
+    def mesh(self):
+        ## world-space geometry, built from the base mesh and the pose for export, ray casts and surface sampling
+        if self._mesh is None and self.is_identity():
+            self._mesh = self.base
+        elif self._mesh is None:
+            vertices = self.local_vertices() + self.translation
+            self._mesh = freeze(trimesh.Trimesh(vertices=vertices, faces=self.base.faces, process=False))
+        return self._mesh
+
+    @mesh.setter
+    def mesh(self, mesh):
+        ## the given world-space geometry becomes the base with an identity pose
+        self.base = mesh
+        self.scale_factors = np.ones(3)
+        self.rot = 0
+        self.translation = np.zeros(3)
+        self.invalidate()
+
+    def invalidate(self):
+        '''
+        Drops everything derived from the pose, called whenever the base mesh or the pose changes.
+        '''
+        self._mesh = None
+        self._local_bounds_cache = None
+        self._aabb_cache = None
+
+    def is_identity(self):
+        return self.rot%360 == 0 and np.all(self.scale_factors == 1) and np.all(self.translation == 0)
+
+    def rotation_matrix(self):
+        matrix = R.from_euler('y', self.rot, degrees=True).as_matrix()
+        ## exact at multiples of 90 degrees so that bounds are not truncated by rounding errors
+        if self.rot%90 == 0:
+            matrix = np.round(matrix)
+        return matrix
+
+    def base_corners(self):
+        '''
+        The eight corners of the scaled base bounding box, in the object's frame.
+        '''
+        bounds = self.base.bounds*self.scale_factors
+        return np.array([[x, y, z] for x in bounds[:,0] for y in bounds[:,1] for z in bounds[:,2]])
+
+    def local_vertices(self):
+        '''
+        Vertices of the base mesh scaled and rotated, but not translated.
+        '''
+        return (self.rotation_matrix()@(self.base.vertices*self.scale_factors).T).T
+
+    def local_bounds(self):
+        '''
+        Bounds of the scaled and rotated base mesh. Derived from the base bounds at multiples of 90 degrees, otherwise
+        recomputed from the vertices when the scale or rotation changes.
+        '''
+        if self._local_bounds_cache is None:
+            if self.rot%90 == 0:
+                ## a quarter turn maps the base box onto an axis aligned box, no need to visit the vertices
+                vertices = (self.rotation_matrix()@self.base_corners().T).T
+            else:
+                vertices = self.local_vertices()
+            self._local_bounds_cache = np.array([vertices.min(axis=0), vertices.max(axis=0)])
+        return self._local_bounds_cache
+
+    def get_center(self):
+        return self.local_bounds().mean(axis=0) + self.translation
+
+    def set_center(self, center):
+        '''
+        Translates the object so that the center of its bounding box is at center.
+        '''
+        self.translation = np.array(center, dtype=float) - self.local_bounds().mean(axis=0)
+        self._mesh = None
+        self._aabb_cache = None
     
     def get_aabb(self):
-        return self.float2int(self.mesh.bounds)
+        ## cached until the pose changes, copies since callers modify the results
+        if self._aabb_cache is None:
+            aabb = self.float2int(self.local_bounds() + self.translation)
+            self._aabb_cache = (aabb, self.float2int((aabb[0]+aabb[1])/2))
+        return self._aabb_cache[0].copy()
+
+    def get_obb(self):
+        '''
+        Returns the oriented bounding box as (transform, extents): the 4x4 transform of the box center and rotation,
+        and the extents along the object's own axes.
+        '''
+        bounds = self.base.bounds*self.scale_factors
+        transform = np.eye(4)
+        transform[:3,:3] = self.rotation_matrix()
+        transform[:3,3] = self.rotation_matrix()@bounds.mean(axis=0) + self.translation
+        return transform, bounds[1]-bounds[0]
 
     def get_whd(self, force=False):
         '''
@@ -164,8 +343,22 @@ You must respond in JSON format as follows: {{'width': 1.0, 'depth': 0.5, 'heigh
         return width, height, depth
 
     def get_loc(self):
-        bounds = self.get_aabb()
-        return self.float2int((bounds[0]+bounds[1])/2)
+        self.get_aabb()
+        return self._aabb_cache[1].copy()
+
+    @property
+    def proj_vertices(self):
+        '''
+        Bottom corners of the base bounding box under the pose: the object's footprint.
+        '''
+        bounds = self.base.bounds*self.scale_factors
+        corners = np.array([
+            [bounds[1,0], bounds[0,1], bounds[1,2]],
+            [bounds[1,0], bounds[0,1], bounds[0,2]],
+            [bounds[0,0], bounds[0,1], bounds[1,2]],
+            [bounds[0,0], bounds[0,1], bounds[0,2]],
+        ])
+        return (self.rotation_matrix()@corners.T).T + self.translation
 
     def get_proj2D(self):
         '''
@@ -189,46 +382,30 @@ You must respond in JSON format as follows: {{'width': 1.0, 'depth': 0.5, 'heigh
         xmin,ymin,zmin = bounds[0]
         xmax,ymax,zmax = bounds[1]
         return xmin,ymin,zmin,xmax,ymax,zmax    
-
-    def reinit(self, vertices):
-        # vertices = self.float2int(vertices)
-        self.mesh = trimesh.Trimesh(vertices=vertices, faces=self.mesh.faces, process=False)
-
-    def set_proj_vertices(self):
-        bounds = self.get_aabb()
-        v4 = np.array([[bounds[1,0], bounds[0,1], bounds[1,2]]])
-        v5 = np.array([[bounds[1,0], bounds[0,1], bounds[0,2]]])
-        v6 = np.array([[bounds[0,0], bounds[0,1], bounds[1,2]]])
-        v7 = np.array([[bounds[0,0], bounds[0,1], bounds[0,2]]])
-        self.proj_vertices = np.vstack((v4,v5,v6,v7))
         
     def normalize_translation(self):
-        x,y,z = self.get_loc()
-        T = np.array([[1,0,0,-x],[0,1,0,-y],[0,0,1,-z],[0,0,0,1]])
-        vertices = self.mesh.vertices
-        vertices = vertices@T[:3,:3].T + T[:3,3]
-        self.reinit(vertices)
-        self.proj_vertices = self.proj_vertices@T[:3,:3].T + T[:3,3]
-        self.proj_vertices = self.float2int(self.proj_vertices)
+        self.set_center(np.zeros(3))
     
     def normalize(self):
-        vertices = self.mesh.vertices
-        vertices -= vertices.min(axis=0)
-        vertices /= vertices.max()
-        
-        vertices = self.float2int(vertices)
-        self.reinit(vertices)
-        self.set_proj_vertices()
-        
+        '''
+        Uniformly rescales the object to a largest extent of 1 and moves it to the origin, keeping its rotation.
+        '''
+        ## meshes from the geometry registry are canonical already
+        self.base = canonicalize(self.base)
+        self.invalidate()
+        bounds = self.local_bounds()
+        self.scale_factors = self.scale_factors/(bounds[1]-bounds[0]).max()
+        self.invalidate()
         self.normalize_translation()
         self.width, self.height, self.depth = self.get_whd(force=True)
         
     def load_mesh(self, mesh_path):
-        if 'objaverse' in mesh_path:
-            from tools.objaverse import get_objaverse_local
-            self.mesh = get_objaverse_local(mesh_path.split('/')[-1])
-        else:
-            self.mesh = trimesh.load(mesh_path, process=False, force='mesh')
+        def load():
+            if 'objaverse' in mesh_path:
+                from tools.objaverse import get_objaverse_local
+                return get_objaverse_local(mesh_path.split('/')[-1])
+            return trimesh.load(mesh_path, process=False, force='mesh')
+        self.mesh = GEOMETRY_REGISTRY.get(mesh_path, load)
         self.visual = self.mesh.visual
 
     def export(self, output_path):
@@ -250,9 +427,13 @@ class Object3D(Object3DBase):
         scale_factor_h = height/ch
         scale_factor_d = depth/cl
 
-        vertices = self.mesh.vertices*np.array([scale_factor_w, scale_factor_h, scale_factor_d])
-        self.reinit(vertices)
-        self.proj_vertices = self.proj_vertices*np.array([scale_factor_w, scale_factor_h, scale_factor_d])
+        ## the factors are along the world axes, which are the object's axes swapped when it is turned sideways
+        factors = np.array([scale_factor_w, scale_factor_h, scale_factor_d])
+        if self.rot%180 == 90:
+            factors = factors[[2,1,0]]
+        self.scale_factors = self.scale_factors*factors
+        self.invalidate()
+        self.normalize_translation()
 
         width, height, depth = self.get_whd(force=True)
         ## sets the width, height and depth of the object in canonical orientation
@@ -261,12 +442,7 @@ class Object3D(Object3DBase):
         self.depth = depth
 
     def set_location(self, x, y, z):
-        ## first move to origin and then move to desired location
-        self.normalize_translation()
-        vertices = self.mesh.vertices
-        vertices = vertices + np.array([[x,y,z]])
-        self.reinit(vertices)
-        self.proj_vertices += np.array([[x,y,z]])
+        self.set_center([x,y,z])
         self.x, self.y, self.z = self.get_loc()
         self.placed = True
         
@@ -276,29 +452,54 @@ class Object3D(Object3DBase):
             self.delta_y += delta_y
             self.delta_z += delta_z
         
-        self.set_location(self.x+delta_x, self.y+delta_y, self.z+delta_z)
-        self.notify()
-        
-    def rotate_vertices_around_point(self, vertices, rot, point):
-        x,y,z = point
-        vertices -= np.array([[x,y,z]])
-        r = R.from_euler('y', rot, degrees=True).as_matrix()
-        vertices = (r@vertices.T).T
-        vertices += np.array([[x,y,z]])
-        return vertices
-    
+        ## the subtree follows rigidly, children are only placed again from their relations when those change
+        with self.scene.deps.batch():
+            with self.rigid_motion():
+                self.set_location(self.x+delta_x, self.y+delta_y, self.z+delta_z)
+            self.scene.deps.moved([self] + self.descendants())
+
+    def descendants(self):
+        ## objects placed relative to this one, directly or through other children
+        found = []
+        stack = list(self.children)
+        while len(stack) > 0:
+            obj = stack.pop()
+            if obj is self or obj in found:
+                continue
+            found.append(obj)
+            stack.extend(obj.children)
+        return found
+
+    @contextmanager
+    def rigid_motion(self):
+        '''
+        Keeps the pose of every descendant in the frame of this object while the body of the with statement moves it,
+        then applies the composed transform to the whole subtree at once.
+        '''
+        matrix, center = self.rotation_matrix(), self.get_center()
+        offsets = [(obj, matrix.T@(obj.get_center()-center), obj.rot-self.rot) for obj in self.descendants()]
+        yield
+        matrix, center = self.rotation_matrix(), self.get_center()
+        for obj, offset, rot in offsets:
+            rot = (self.rot+rot)%360
+            if rot != obj.rot:
+                obj.rot = rot
+                obj.invalidate()
+            obj.set_center(center + matrix@offset)
+            if obj.placed:
+                obj.x, obj.y, obj.z = obj.get_loc()
+
     def set_rotation(self, rot):
-        rot = rot%360
-        # assert rot in [0, 45, 90, 135, 180, 225, 270, 315]
-        tmp = rot
-        rot = rot-self.rot
-        vertices = self.mesh.vertices
-        loc = self.get_loc()
-        vertices = self.rotate_vertices_around_point(vertices, rot, loc)
-        self.reinit(vertices)
-        self.proj_vertices = self.rotate_vertices_around_point(self.proj_vertices, rot, loc)
-        self.rot = tmp
+        ## rotates in place around the center of the bounding box
+        center = self.get_center()
+        changed = rot%360 != self.rot
+        self.rot = rot%360
+        self.invalidate()
+        self.set_center(center)
         self.rotation_set=True
+        ## children are placed in the frame of this object, they are placed again from their relations
+        if changed:
+            self.notify()
         
         
     def face_towards(self, obj):
@@ -332,11 +533,14 @@ class Object3D(Object3DBase):
         self.set_rotation(rot)
         
         if isinstance(obj, Object3D):
+            if self.face_towards_obj is not None and self.face_towards_obj is not obj:
+                self.scene.deps.unlink(self.face_towards_obj, self)
+            self.scene.deps.link(obj, self)
             self.face_towards_obj = obj
             if self not in obj.children:
                 self.only_directional_child = True
             self.child_of = obj
-            self.notify()
+        self.notify()
 
     def update(self):
         if self.place_relative_params is not None:   ## If placed using relative
@@ -348,8 +552,8 @@ class Object3D(Object3DBase):
         self.notify()
             
     def notify(self):
-        for child in set(self.children):
-            child.update()
+        ## the objects depending on this one are recomputed by the scene's dependency graph, once per batch
+        self.scene.deps.changed(self)
 
     def place_support_objs_naive(self):
         N = len(self.support_objs)
@@ -362,6 +566,7 @@ class Object3D(Object3DBase):
         for i, obj in enumerate(self.support_objs):
             obj.normalize_translation()
             obj.set_location(locs[i][0], y+obj.height/2, locs[i][1])
+            obj.notify()
             
     def place_support_objs(self):
         def get_max_dims_of_supported_objs():
@@ -425,6 +630,7 @@ class Object3D(Object3DBase):
             self.place_relative_params = {'relation':relation, 'obj':obj.name, 'dist':dist, 'sideways_shift':sideways_shift, 'face_towards':face_towards, 'delta_x':self.delta_x, 'delta_y':self.delta_y, 'delta_z':self.delta_z}
             if self not in obj.children:
                 obj.children.append(self)
+            self.scene.deps.link(obj, self)
 
         width, height, depth = self.get_whd()
         w0, h0, l0 = obj.get_whd()
@@ -686,26 +892,26 @@ class Object3D(Object3DBase):
         if len(first_longer_side) > 0:
             sideways_coordinates_first_longer_side = compute_sideways_coordinates(total_length, len(first_longer_side), first_longer_side[0].get_whd()[0])
             for seat in first_longer_side:
-                seat.place_relative(relation='in_front_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_first_longer_side.pop(0))/100)
                 seat.set_rotation(self.rot-180)
+                seat.place_relative(relation='in_front_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_first_longer_side.pop(0))/100)
         
         if len(second_longer_side) > 0:
             sideways_coordinates_second_longer_side = compute_sideways_coordinates(total_length, len(second_longer_side), second_longer_side[0].get_whd()[0])
             for seat in second_longer_side:
-                seat.place_relative(relation='behind_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_second_longer_side.pop(0))/100)
                 seat.set_rotation(self.rot)
+                seat.place_relative(relation='behind_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_second_longer_side.pop(0))/100)
             
         if len(first_shorter_side) > 0:
             sideways_coordinates_first_shorter_side = compute_sideways_coordinates(total_width, len(first_shorter_side), first_shorter_side[0].get_whd()[0])
             for seat in first_shorter_side:
-                seat.place_relative(relation='right_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_first_shorter_side.pop(0))/100)
                 seat.set_rotation(self.rot-90)
+                seat.place_relative(relation='right_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_first_shorter_side.pop(0))/100)
             
         if len(second_shorter_side) > 0:
             sideways_coordinates_second_shorter_side = compute_sideways_coordinates(total_width, len(second_shorter_side), second_shorter_side[0].get_whd()[0])
             for seat in second_shorter_side:
-                seat.place_relative(relation='left_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_second_shorter_side.pop(0))/100)
                 seat.set_rotation(self.rot+90)
+                seat.place_relative(relation='left_of', obj=self, dist=dist_from_table, sideways_shift=int(100*sideways_coordinates_second_shorter_side.pop(0))/100)
               
     def displace_on_wall(self, wall):
         delta = self.get_whd()[2]/2 + 0.05
@@ -0,0 +1,72 @@
+import numpy as np
+
+class ProxyBox:
+    def __init__(self, name, scene, footprint, ymin=0, ymax=2):
+        '''
+        Geometry-only stand-in for an Object3D, e.g. the clearance region in front of an object.
+        A prism over a polygon footprint of (x, z) corners between heights ymin and ymax, with no mesh, visuals or LLM helpers.
+        For a four-sided footprint the corners follow the order of Object3D.proj_vertices: the left side is (0, 1),
+        the right side (2, 3), the front side (0, 2) and the back side (1, 3).
+        Callers that want the proxy to count as an obstacle add it to scene.objects for the duration of their queries,
+        where it is a root of the scene graph.
+        '''
+        self.name = name
+        self.desc = None
+        self.scene = scene
+        self.footprint = np.array(footprint, dtype=float)
+        self.ymin = ymin
+        self.ymax = ymax
+
+        self.ignore_overlap = False
+        self.on_floor = ymin == 0
+        self.placed_on_wall = False
+        self.child_of = None
+        self.only_directional_child = False
+        self.children = []
+        self.support_objs = []
+        self.rot = 0
+
+        xmin, zmin = self.footprint.min(axis=0)
+        xmax, zmax = self.footprint.max(axis=0)
+        self.bounds = self.float2int(np.array([[xmin, ymin, zmin], [xmax, ymax, zmax]]))
+
+    @classmethod
+    def around(cls, name, scene, points, ymin=0, ymax=2):
+        '''
+        Axis-aligned proxy around (x, z) points, the footprint is their bounding rectangle with the corners in the
+        order of Object3D.proj_vertices at rotation 0.
+        '''
+        points = np.array(points, dtype=float)
+        xmin, zmin = points.min(axis=0)
+        xmax, zmax = points.max(axis=0)
+        footprint = [[xmax, zmax], [xmax, zmin], [xmin, zmax], [xmin, zmin]]
+        return cls(name, scene, footprint, ymin=ymin, ymax=ymax)
+
+    def float2int(self, x):
+        return (1000*x).astype(int)/1000
+
+    def get_aabb(self):
+        return self.bounds
+
+    def get_min_max(self):
+        xmin, ymin, zmin = self.bounds[0]
+        xmax, ymax, zmax = self.bounds[1]
+        return xmin, ymin, zmin, xmax, ymax, zmax
+
+    def get_whd(self, force=False):
+        width, height, depth = self.bounds[1] - self.bounds[0]
+        return width, height, depth
+
+    def get_loc(self):
+        return self.float2int((self.bounds[0]+self.bounds[1])/2)
+
+    def get_proj2D(self):
+        return self.footprint
+
+    def get_sides(self):
+        proj_vertices = self.get_proj2D()
+        left_side = (proj_vertices[0], proj_vertices[1])
+        right_side = (proj_vertices[2], proj_vertices[3])
+        front_side = (proj_vertices[0], proj_vertices[2])
+        back_side = (proj_vertices[1], proj_vertices[3])
+        return left_side, right_side, front_side, back_side
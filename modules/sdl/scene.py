@@ -3,12 +3,18 @@ from modules.sdl.wall import *
 from modules.sdl.object import Object3D
 from modules.sdl.window import Window
 from modules.sdl.door import Door
+from modules.sdl.dependencies import DependencyGraph
 from modules.utils.retriever import Object3DRetriever
 from tools.llm import LLM
 import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 
+MAX_WORKERS = 8
+
 class SceneGraph:
     def __init__(self, name, depth=0):
         self.name = name
@@ -76,15 +82,16 @@ class SceneHelper:
         
     def get_obj_min_max_sg(self, obj):
         sg_obj = self.sg.get_object(obj.name)
-        _, children = sg_obj.get_all_children()
+        ## proxies are not part of the scene graph and have no children
+        children = sg_obj.get_all_children()[1] if sg_obj is not None else []
         
         xmins=[]
         xmaxs=[]
         zmins=[]
         zmaxs=[]
         
-        for child in [obj.name, *children]:
-            xmin,_,zmin,xmax,_,zmax = self.scene.get_object(child).get_min_max()
+        for o in [obj, *[self.scene.get_object(child) for child in children]]:
+            xmin,_,zmin,xmax,_,zmax = o.get_min_max()
             
             xmins.append(xmin)
             xmaxs.append(xmax)
@@ -134,17 +141,16 @@ class SceneHelper:
         assert dir in ['+x','-x','+z','-z']
         
         scene_minus_obj = self.scene.objects.copy()
-        scene_minus_obj.remove(obj)
+        if obj in scene_minus_obj:
+            scene_minus_obj.remove(obj)
         for o in self.scene.overlap_exceptions:
             try:
                 scene_minus_obj.remove(o)
             except:
                 continue
         
-        try:
-            _, children = self.sg.get_object(obj.name).get_all_children()
-        except:
-            breakpoint()
+        sg_obj = self.sg.get_object(obj.name)
+        children = sg_obj.get_all_children()[1] if sg_obj is not None else []
         for child in children:
             try:
                 scene_minus_obj.remove(self.scene.get_object(child))
@@ -223,8 +229,13 @@ class Scene:
         self.auxilary_objects = []
         self.overlap_exceptions = []
         self.cache={}
+        self.colors = {}
         self.object_hash = {}
         self.retriever = Object3DRetriever()
+        ## idle retrievers, kept across add_many calls
+        self.retrievers = [self.retriever]
+        self.lock = threading.Lock()
+        self.deps = DependencyGraph()
         
         if os.path.exists('tmp/object_hash.json'):
             with open('tmp/object_hash.json', 'r') as f:
@@ -279,15 +290,76 @@ class Scene:
         '''
         if desc in self.cache:
             obj = self.cache[desc].copy(name)
-            setattr(self, name, obj)
-            self.objects.append(getattr(self, name))
         else:
-            obj = Object3D(name, desc=desc, scene=self)
-            obj.init()
-            obj.set_scale(dims)
-            setattr(self, name, obj)
-            self.objects.append(getattr(self, name))
-            self.cache[desc] = getattr(self, name)
+            obj = self._resolve(name, desc, dims)
+            self.cache[desc] = obj
+        self._register(name, obj)
+
+    def add_many(self, objects, max_workers=MAX_WORKERS):
+        '''
+        Add several objects given as (name, desc) or (name, desc, dims) tuples. Retrieval, mesh loading and scaling of the
+        distinct descriptions run concurrently; the result is the same as calling add for each object in order.
+        '''
+        objects = [tuple(obj) + (None,)*(3-len(obj)) for obj in objects]
+        ## as with add, the first object of a description is resolved and the rest are copies of it
+        pending = {}
+        for name, desc, dims in objects:
+            if desc not in self.cache and desc not in pending:
+                pending[desc] = (name, dims)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            futures = {desc: executor.submit(self._resolve, name, desc, dims) for desc, (name, dims) in pending.items()}
+        resolved = {desc: future.result() for desc, future in futures.items()}
+
+        for name, desc, dims in objects:
+            if desc in resolved:
+                obj = self.cache[desc] = resolved.pop(desc)
+            else:
+                obj = self.cache[desc].copy(name)
+            self._register(name, obj)
+
+    def _resolve(self, name, desc, dims):
+        obj = Object3D(name, desc=desc, scene=self)
+        obj.init()
+        obj.set_scale(dims)
+        ## classify here as well so that add_many runs it in the worker
+        obj.ignore_overlap
+        return obj
+
+    def _register(self, name, obj):
+        setattr(self, name, obj)
+        self.objects.append(obj)
+        if obj.ignore_overlap:
+            self.overlap_exceptions.append(obj)
+
+    @contextmanager
+    def _get_retriever(self):
+        ## the retriever's agents keep chat state, so each one serves one caller at a time; concurrent retrievals
+        ## of add_many take idle ones from the pool and only build a new one when all are busy
+        with self.lock:
+            retriever = self.retrievers.pop() if len(self.retrievers) > 0 else None
+        if retriever is None:
+            retriever = Object3DRetriever()
+        try:
+            yield retriever
+        finally:
+            with self.lock:
+                self.retrievers.append(retriever)
+
+    def retrieve(self, desc):
+        '''
+        Returns the path of the asset for a description, retrieving it if it is not in the object hash yet.
+        '''
+        with self.lock:
+            if desc in self.object_hash:
+                return self.object_hash[desc]
+        with self._get_retriever() as retriever:
+            path = retriever.run(desc)
+        with self.lock:
+            self.object_hash[desc] = path
+            with open('tmp/object_hash.json', 'w') as f:
+                json.dump(self.object_hash, f)
+        return path
         
     def get_object(self, name: str):
         '''
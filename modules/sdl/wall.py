@@ -1,7 +1,7 @@
 import numpy as np
 import trimesh
 from scipy.spatial.transform import Rotation as R
-from tools.llm import LLM
+from tools.colors import resolve_color
 from tqdm import tqdm
 import os
 from tools.clip import clip_image_embedding, clip_text_embedding
@@ -20,15 +20,18 @@ class PlaneMesh:
     def get_wh(self):
         return self.width/self.res, self.height/self.res
     
+    def get_rgb(self):
+        ## resolved locally, once per scene and color phrase
+        cache = getattr(getattr(self, 'scene', None), 'colors', None)
+        return resolve_color(self.color, cache=cache)
+    
     def get_face_color(self, faces):
-        color = LLM(system_desc="Given a color description, your task is to return the RGB values of the color in the format (R, G, B) as a JSON object. Example: 'red' -> 'R': 255, 'G': 0, 'B': 0", response_format="json", json_keys=['R','G','B']).run(self.color)
-        color = [int(color['R']), int(color['G']), int(color['B']), 255]
+        color = [*self.get_rgb(), 255]
         face_colors = np.ones((len(faces), 4))*color
         return face_colors
         
     def get_texture(self):
-        color = LLM(system_desc="Given a color description, your task is to return the RGB values of the color in the format (R, G, B) as a JSON object. Example: 'red' -> 'R': 255, 'G': 0, 'B': 0", response_format="json", json_keys=['R','G','B']).run(self.color)
-        color = [int(color['R']), int(color['G']), int(color['B']), 255]
+        color = [*self.get_rgb(), 255]
         image = np.ones((1024, 1024, 4), dtype=np.uint8)
         image *= np.array(color, dtype=np.uint8)
         texture_image = Image.fromarray(image)
@@ -1,6 +1,7 @@
 from modules.sdl.object import Object3D
 import numpy as np
 import trimesh
+from modules.sdl.geometry import GEOMETRY_REGISTRY
 
 class Window(Object3D):
     def __init__(self, name, scene):
@@ -75,7 +76,7 @@ class Window(Object3D):
             wall = self.scene.get_object(wall)
         wall_width, wall_height = wall.get_wh()
         
-        self.mesh = trimesh.load(self.picture_window_path, process=False)
+        self.mesh = GEOMETRY_REGISTRY.get(self.picture_window_path, lambda: trimesh.load(self.picture_window_path, process=False))
         self.normalize()
         self.scale(width=wall_width-1.5, height=wall_height-1, depth=0.1)
         self.rotate_window(wall)
@@ -94,7 +95,7 @@ class Window(Object3D):
         wall_width, wall_height = wall.get_wh()
         height = wall_height - self.header_buffer - self.furniture_clearance
         
-        self.mesh = trimesh.load(self.standard_window_path, process=False)
+        self.mesh = GEOMETRY_REGISTRY.get(self.standard_window_path, lambda: trimesh.load(self.standard_window_path, process=False))
         self.normalize()
         self.scale(width=wall.max_window_width(), height=height, depth=0.03)
         self.rotate_window(wall)
@@ -116,7 +117,7 @@ class Window(Object3D):
     def add_curtain(self):
         id = np.random.randint(0, 1000)
         curtain = Object3D(f'curtain_{id}', None, self.scene)
-        curtain.mesh = trimesh.load(self.curtain_path, process=False, force='mesh')
+        curtain.mesh = GEOMETRY_REGISTRY.get(self.curtain_path, lambda: trimesh.load(self.curtain_path, process=False, force='mesh'))
         curtain.visual = curtain.mesh.visual
         curtain.normalize()
         self.scene.overlap_exceptions.append(curtain)
@@ -2,6 +2,11 @@ import os
 import random
 from tqdm import tqdm
 from tools.llm import LLM
+from tools.prompt import PromptBuilder
+from pydantic import BaseModel, Field
+
+class CheckResult(BaseModel):
+    errors: bool = Field(..., description="Whether the stdout contains any errors")
 
 class CodeExecutor:
     def __init__(self):
@@ -47,16 +52,21 @@ You should go through the code and find syntax errors including those caused by
 First identify the errors and then respond with the corrected code. You should also pay attention to the exteptions raised while running the code and find ways to fix them. 
 You are not supposed to change placement values or settings in the code, but only watch out for reasons due to which the code may crash! Lastly, do not save or export the scene, I will do that myself later.
 Also, you don't have to worry about importing modules. They are already imported for you.
-""", response_format='code')
+""", response_format='code', name="llm_debugger")
         self.debugger = LLM(system_desc=f"""You are a large language model based assistant, expert at designing layouts for indoor scenes. At the same time, you are also expert at debugging codes related to layout designs.
 You should only respond with code that is correct and does not have any errors. Feel free to fix any other issues that you think may exist in the code by refering to API documentation:\n{self.apis}.  You should also pay attention to the exteptions raised while running the code and find ways to fix them. Think step by step. You are not supposed to change placement values or settings in the code, but only watch out for reasons due to which the code may crash!
 Lastly, do not save or export the scene, I will do that myself later.
 Also, you don't have to worry about importing modules. They are already imported for you.
-""", response_format='code')
-        self.checker = LLM(system_desc="You are supposed to go through the stdout and respond whether there are any errors or not. In case you don't see any errors (ignore warnings!) respond in a JSON format with 'errors': False. Else, respond with 'errors': True.", response_format='json')
+""", response_format='code', name="debugger")
+        self.checker = LLM(system_desc="You are supposed to go through the stdout and respond whether there are any errors or not. In case you don't see any errors (ignore warnings!) respond in a JSON format with 'errors': False. Else, respond with 'errors': True.", schema=CheckResult, name="checker")
 
-    def run(self, code, save_string=""):
+    def run(self, code, save_string="", before_exec=None):
+        '''
+        before_exec is called once before the code is first executed, e.g. to wait for assets that are still being retrieved.
+        '''
         code = self.llm_debugger.run(code)
+        if before_exec is not None:
+            before_exec()
         errors = self.exec(code+save_string)
         import time
         print("Debugging code...")
@@ -67,9 +77,9 @@ Also, you don't have to worry about importing modules. They are already imported
                     print(f"\rAttempt {attempt + 1}/5{frame}", end="")
                     time.sleep(0.2)
                 
-                if self.checker.run(errors)['errors']:
+                if self.checker.run(PromptBuilder("checker").add_dynamic(errors, section="errors", keep='tail').build())['errors']:
                     breakpoint()
-                    prompt = f"Input: {code}.\nErrors: {errors}.\nDebugged code:"
+                    prompt = PromptBuilder("debugger").add_dynamic(f"Input: {code}.").add_dynamic(f"Errors: {errors}.", section="errors", keep='tail').add_dynamic("Debugged code:").build()
                     code = self.debugger.run(prompt)
                     code = self.llm_debugger.run(code)
                     errors = self.exec(code+save_string)
@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+from assets.llm_config import DIMENSION_PRIORS_CONFIG
+
+## words that make an object bigger or smaller than usual, a prior only applies to a description with the same ones
+SIZE_WORDS = ['small', 'large', 'big', 'tiny', 'huge', 'long', 'short', 'tall', 'low', 'high', 'wide', 'narrow', 'compact',
+              'oversized', 'mini', 'giant', 'massive', 'slim', 'thin', 'deep', 'shallow', 'king', 'queen', 'twin', 'single', 'double']
+
+## the instruction SceneProg.clean starts the overrides file with
+OVERRIDES_HEADER = 'Irrespective of what you think, you must use the following scales for the below mentioned objects'
+
+## an override line such as "2. dining_chair: 0.5m x 0.5m x 0.9m", in the order (width, depth, height)
+OVERRIDE_PATTERN = re.compile(r"^\W*(?:\d+[.)]\s*)?\W*([A-Za-z][\w \-]*?)\W*\s*[:=-]\s*([\d.]+)\s*m?\s*[x×*]\s*([\d.]+)\s*m?\s*[x×*]\s*([\d.]+)")
+
+class DimensionPriors:
+    def __init__(self, path=None, overrides_path='tmp/object_scale.txt', model=None, threshold=None):
+        '''
+        Realistic width, depth and height of objects without asking the scale agent.
+        Overrides in overrides_path (written by the optimizer for named objects) come first, then scales the agent
+        gave earlier for the same description, then the nearest earlier description or 3D-FUTURE category by embedding.
+        Once the overrides file holds any override, objects whose override cannot be found by name are left to the
+        agent, which reads the whole file. Descriptions with dimensions or size words of their own are only matched to
+        earlier descriptions sharing them. Scales accepted from the agent are persisted to path.
+        Defaults come from DIMENSION_PRIORS_CONFIG.
+        '''
+        self.path = path or DIMENSION_PRIORS_CONFIG['path']
+        self.overrides_path = overrides_path
+        self.model = model or DIMENSION_PRIORS_CONFIG['embedding_model']
+        self.threshold = DIMENSION_PRIORS_CONFIG['similarity_threshold'] if threshold is None else threshold
+        self.validated = False
+        self.lock = threading.Lock()
+        self.accepted = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.accepted = json.load(f)
+        self.categories = None
+        self.embeddings = None
+        self.text_embds = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, name):
+        return re.sub(r"[\s\-]+", "_", name.strip().lower())
+
+    def _words(self, desc):
+        return set(re.findall(r"[a-z]+", desc.lower()))
+
+    def _dims(self, width, depth, height):
+        return {'width': float(width), 'depth': float(depth), 'height': float(height)}
+
+    def _categories(self):
+        if self.categories is None:
+            from tools.dataset import CATEGORY_DIMS
+            self.categories = {category: self._dims(*dims) for category, dims in CATEGORY_DIMS.items()}
+        return self.categories
+
+    def _override_lines(self):
+        if not os.path.exists(self.overrides_path):
+            return []
+        with open(self.overrides_path, 'r') as f:
+            text = f.read().lstrip()
+        ## older runs appended the first override on the line of the header
+        if text.startswith(OVERRIDES_HEADER):
+            text = text[len(OVERRIDES_HEADER):]
+        return [line for line in text.splitlines() if len(line.strip()) > 0]
+
+    def has_overrides(self):
+        return len(self._override_lines()) > 0
+
+    def lookup_override(self, name):
+        '''
+        Returns the override dims for the object, False if the object is mentioned but its line cannot be parsed
+        (the agent reads the overrides itself) and None if it is not mentioned.
+        '''
+        if name is None:
+            return None
+        key = self._key(name)
+        mentioned = False
+        for line in self._override_lines():
+            match = OVERRIDE_PATTERN.match(line)
+            if match is not None and self._key(match.group(1)) == key:
+                try:
+                    return self._dims(*match.groups()[1:])
+                except ValueError:
+                    return False
+            if re.search(r"(?<![a-z0-9_])" + re.escape(key).replace("_", r"[\s_\-]+") + r"(?![a-z0-9_])", line.lower()):
+                mentioned = True
+        return False if mentioned else None
+
+    def _embed(self, texts):
+        if self.embeddings is None:
+            from tools.embeddings import Embeddings
+            self.embeddings = Embeddings(model=self.model)
+        return np.array(self.embeddings.embed_documents(texts))
+
+    def _validate_threshold(self):
+        '''
+        Raises the threshold above the similarity of the most similar pair of categories with clearly different sizes.
+        '''
+        categories = self._categories()
+        names = list(categories)
+        missing = [name for name in names if name not in self.text_embds]
+        if len(missing) > 0:
+            for name, embd in zip(missing, self._embed(missing)):
+                self.text_embds[name] = embd
+        embds = np.array([self.text_embds[name] for name in names])
+        embds = embds/np.linalg.norm(embds, axis=1, keepdims=True)
+        similarities = embds @ embds.T
+        dims = np.array([[categories[name]['width'], categories[name]['depth'], categories[name]['height']] for name in names])
+        ratios = np.max(np.maximum(dims[:, None]/dims[None], dims[None]/dims[:, None]), axis=2)
+        different = ratios > DIMENSION_PRIORS_CONFIG['size_ratio']
+        if np.any(different):
+            worst = np.max(similarities[different])
+            if worst + DIMENSION_PRIORS_CONFIG['margin'] > self.threshold:
+                i, j = np.argwhere(different & (similarities == worst))[0]
+                threshold = min(1.0, worst + DIMENSION_PRIORS_CONFIG['margin'])
+                print(f"Warning: {self.model} embeds '{names[i]}' and '{names[j]}' with similarity {worst:.3f}, raising the dimension prior threshold from {self.threshold} to {threshold:.3f}.")
+                self.threshold = threshold
+        self.validated = True
+
+    def lookup_neighbour(self, desc):
+        '''
+        Dims of the most similar earlier description or category, None when nothing is similar enough.
+        '''
+        if not self.validated:
+            self._validate_threshold()
+        words = self._words(desc) & set(SIZE_WORDS)
+        with self.lock:
+            candidates = {**self._categories(), **self.accepted}
+        candidates = {text: dims for text, dims in candidates.items() if self._words(text) & set(SIZE_WORDS) == words and not re.search(r"\d", text)}
+        if len(candidates) == 0:
+            return None
+        missing = [text for text in candidates if text not in self.text_embds]
+        if len(missing) > 0:
+            for text, embd in zip(missing, self._embed(missing)):
+                self.text_embds[text] = embd
+        texts = list(candidates)
+        embds = np.array([self.text_embds[text] for text in texts])
+        query = self._embed([desc])[0]
+        similarities = embds @ query/(np.linalg.norm(embds, axis=1)*np.linalg.norm(query))
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return dict(candidates[texts[best]])
+
+    def lookup(self, name, desc):
+        '''
+        Returns {'width', 'depth', 'height'} in meters, or None if the scale agent has to be consulted.
+        '''
+        override = self.lookup_override(name)
+        if override is not None:
+            if override is False:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return override
+        if self.has_overrides():
+            ## the override may name the object differently, the agent reads the whole file
+            self.misses += 1
+            return None
+        with self.lock:
+            if desc in self.accepted:
+                self.hits += 1
+                return dict(self.accepted[desc])
+        ## explicit dimensions in the description are left to the agent
+        dims = None if re.search(r"\d", desc) else self.lookup_neighbour(desc)
+        if dims is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return dims
+
+    def record(self, name, desc, dims):
+        '''
+        Keeps the scale the agent gave for a description, unless overrides specific to the scene may have shaped it.
+        '''
+        if self.has_overrides():
+            return
+        dims = self._dims(dims['width'], dims['depth'], dims['height'])
+        with self.lock:
+            self.accepted[desc] = dims
+            stored = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+            stored[desc] = dims
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.path)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'accepted': len(self.accepted)}
+
+_PRIORS = None
+
+def get_dimension_priors():
+    global _PRIORS
+    if _PRIORS is None:
+        _PRIORS = DimensionPriors()
+    return _PRIORS
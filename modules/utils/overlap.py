@@ -0,0 +1,143 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+
+## categories of objects that are exempt from overlap checks, and the words that identify them
+EXEMPT_KEYWORDS = {
+    'window': ['window', 'windows', 'windowpane', 'skylight'],
+    'door': ['door', 'doors', 'doorway'],
+    'curtain': ['curtain', 'curtains', 'drape', 'drapes', 'drapery', 'blind', 'blinds', 'valance'],
+    'rug': ['rug', 'rugs', 'carpet', 'carpets', 'mat', 'runner'],
+    'painting': ['painting', 'paintings', 'artwork', 'art', 'poster', 'canvas', 'print', 'portrait', 'picture', 'photo', 'photograph', 'tapestry'],
+    'mirror': ['mirror', 'mirrors'],
+    'clock': ['clock', 'clocks'],
+}
+
+## keywords that also occur in unrelated descriptions ("a leopard print cushion", "an art deco lamp", "a yoga mat"),
+## on their own they leave the decision to the neighbour vote
+AMBIGUOUS_KEYWORDS = ['art', 'print', 'mat', 'runner', 'picture', 'blind', 'blinds', 'canvas']
+
+## words naming regular furniture, a description that also contains one of these is ambiguous ("a cabinet with mirror doors")
+FURNITURE_KEYWORDS = ['table', 'desk', 'chair', 'armchair', 'sofa', 'couch', 'bed', 'cabinet', 'wardrobe', 'dresser', 'closet',
+                      'shelf', 'shelves', 'bookcase', 'bookshelf', 'nightstand', 'stool', 'bench', 'ottoman', 'lamp', 'chandelier',
+                      'plant', 'vase', 'tv', 'television', 'console', 'sideboard', 'vanity', 'stand', 'chest', 'cupboard', 'hutch']
+
+## labelled seed descriptions for the nearest-neighbour fallback
+SEED_LABELS = {
+    'A large window': True, 'A wooden door': True, 'Sheer white curtains': True, 'A round area rug': True,
+    'A framed landscape painting': True, 'A full-length wall mirror': True, 'A round wall clock': True,
+    'A two-seater sofa': False, 'A dining chair': False, 'A king-size bed': False, 'A small end table': False,
+    'A tall bookcase': False, 'A tall indoor plant': False, 'A floor lamp': False, 'A wooden wardrobe': False,
+}
+
+class OverlapClassifier:
+    SIMILARITY_THRESHOLD = 0.8
+    NEIGHBOURS = 3
+
+    def __init__(self, path='assets/overlap_labels.json'):
+        '''
+        Decides whether an object is exempt from overlap checks (windows, doors, curtains, rugs, paintings, mirrors, clocks).
+        A keyword table settles unambiguous descriptions, an embedding nearest-neighbour vote over labelled descriptions
+        settles close matches, and only the remaining ones are sent to the LLM. Decisions are memoized per description
+        and persisted to path, where they also serve as labelled neighbours.
+        '''
+        self.path = path
+        self.lock = threading.Lock()
+        self.labels = dict(SEED_LABELS)
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.labels.update(json.load(f))
+        self.memo = {}
+        self.embeddings = None
+        self.llm = None
+        self.label_embds = {}
+
+    def _words(self, desc):
+        ## whole words only, "smart" or "blueprint" do not contain the keyword "art" or "print"
+        return set(re.findall(r"\b[a-z]+\b", desc.lower()))
+
+    def classify_keywords(self, desc):
+        '''
+        Returns True/False for unambiguous descriptions, None when unsure.
+        '''
+        words = self._words(desc)
+        exempt = any(words & (set(keywords) - set(AMBIGUOUS_KEYWORDS)) for keywords in EXEMPT_KEYWORDS.values())
+        ambiguous = len(words & set(AMBIGUOUS_KEYWORDS)) > 0
+        furniture = len(words & set(FURNITURE_KEYWORDS)) > 0
+        if exempt and not furniture:
+            return True
+        if furniture and not exempt and not ambiguous:
+            return False
+        return None
+
+    def _embed(self, texts):
+        if self.embeddings is None:
+            from tools.embeddings import Embeddings
+            self.embeddings = Embeddings()
+        return np.array(self.embeddings.embed_documents(texts))
+
+    def classify_neighbours(self, desc):
+        '''
+        Majority vote of the nearest labelled descriptions, None when they are not similar enough or disagree.
+        '''
+        missing = [text for text in self.labels if text not in self.label_embds]
+        if len(missing) > 0:
+            for text, embd in zip(missing, self._embed(missing)):
+                self.label_embds[text] = embd
+        texts = list(self.labels)
+        embds = np.array([self.label_embds[text] for text in texts])
+        query = self._embed([desc])[0]
+        similarities = embds @ query/(np.linalg.norm(embds, axis=1)*np.linalg.norm(query))
+        nearest = np.argsort(similarities)[::-1][:self.NEIGHBOURS]
+        nearest = [idx for idx in nearest if similarities[idx] >= self.SIMILARITY_THRESHOLD]
+        votes = set(self.labels[texts[idx]] for idx in nearest)
+        if len(votes) == 1:
+            return votes.pop()
+        return None
+
+    def classify_llm(self, desc):
+        if self.llm is None:
+            from tools.llm import LLM
+            self.llm = LLM(system_desc="You should return a boolean value in JSON format indicating whether the object should be ignored for overlap checks or not. Objects belonging to the following categories need to be ignored for overlap checks: 'windows', 'doors', 'curtains', 'rugs', 'paintings', 'mirrors', 'clocks'. Example output can be like (ignore_overlap:False)", response_format="json", json_keys=['ignore_overlap'], name="ignore_overlap")
+        return bool(self.llm.run(desc)['ignore_overlap'])
+
+    def _save(self, desc, label):
+        with self.lock:
+            self.labels[desc] = label
+            stored = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+            stored[desc] = label
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.path)
+
+    def classify(self, desc):
+        if desc is None:
+            ## windows, doors, curtains and proxies register their exemption themselves
+            return False
+        if desc in self.memo:
+            return self.memo[desc]
+        if desc in self.labels:
+            label = self.labels[desc]
+        else:
+            label = self.classify_keywords(desc)
+            if label is None:
+                label = self.classify_neighbours(desc)
+            if label is None:
+                label = self.classify_llm(desc)
+                self._save(desc, label)
+        self.memo[desc] = label
+        return label
+
+_CLASSIFIER = None
+
+def get_overlap_classifier():
+    global _CLASSIFIER
+    if _CLASSIFIER is None:
+        _CLASSIFIER = OverlapClassifier()
+    return _CLASSIFIER
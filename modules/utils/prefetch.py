@@ -0,0 +1,96 @@
+import os
+import ast
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+MAX_WORKERS = 4
+
+class AssetPrefetcher:
+    def __init__(self, hash_path='tmp/object_hash.json', max_workers=MAX_WORKERS):
+        '''
+        Retrieves the assets of scene.add and scene.add_many calls while the scene program is still being generated.
+        Retrieved paths are written to the object hash that Scene loads, so the program run by the debugger finds them there.
+        '''
+        self.hash_path = hash_path
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.futures = {}
+
+    def _retriever(self):
+        ## SimpleAgent keeps its chat state on the agent, every worker thread gets its own
+        if not hasattr(self.local, 'retriever'):
+            from modules.utils.retriever import Object3DRetriever
+            self.local.retriever = Object3DRetriever()
+        return self.local.retriever
+
+    def _load(self):
+        if os.path.exists(self.hash_path):
+            with open(self.hash_path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _retrieve(self, desc):
+        with self.lock:
+            if desc in self._load():
+                return
+        path = self._retriever().run(desc)
+        with self.lock:
+            object_hash = self._load()
+            object_hash[desc] = path
+            with open(self.hash_path, 'w') as f:
+                json.dump(object_hash, f)
+
+    def get_descs(self, node):
+        '''
+        Returns the constant descriptions passed to scene.add(name, desc) or scene.add_many([(name, desc), ...]) anywhere
+        in the statement.
+        '''
+        descs = []
+        for call in ast.walk(node):
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr in ['add', 'add_many']):
+                continue
+            if not (isinstance(call.func.value, ast.Name) and call.func.value.id == 'scene'):
+                continue
+            if call.func.attr == 'add_many':
+                objects = call.args[0] if len(call.args) > 0 else None
+                for keyword in call.keywords:
+                    if keyword.arg == 'objects':
+                        objects = keyword.value
+                if not isinstance(objects, (ast.List, ast.Tuple)):
+                    continue
+                candidates = [obj.elts[1] for obj in objects.elts if isinstance(obj, (ast.List, ast.Tuple)) and len(obj.elts) > 1]
+            else:
+                desc = call.args[1] if len(call.args) > 1 else None
+                for keyword in call.keywords:
+                    if keyword.arg == 'desc':
+                        desc = keyword.value
+                candidates = [desc]
+            for desc in candidates:
+                if isinstance(desc, ast.Constant) and isinstance(desc.value, str):
+                    descs.append(desc.value)
+        return descs
+
+    def visit(self, node, source=None):
+        '''
+        Statement callback for LLM.run_stream.
+        '''
+        for desc in self.get_descs(node):
+            with self.lock:
+                if desc in self.futures:
+                    continue
+                self.futures[desc] = self.executor.submit(self._retrieve, desc)
+
+    def wait(self):
+        '''
+        Blocks until all submitted retrievals are done. Failed retrievals are left to Object3D.init.
+        '''
+        with self.lock:
+            futures = list(self.futures.values())
+        wait(futures)
+        for future in futures:
+            if future.exception() is not None:
+                print(f"Asset prefetch failed: {future.exception()}")
+        with self.lock:
+            self.futures = {}
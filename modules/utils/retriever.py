@@ -3,12 +3,14 @@ from tools.simpleagent import SimpleAgent
 import trimesh
 import numpy as np
 from tools.dataset import AssetRetriever
-import bentoml
 from tools.llm import LLM
 import os
 import random
 import json
 from tools.text2img import text2img
+from tools.backend import BACKEND
+from tools.ratelimit import get_limiter
+from tools.bento import get_service
 from PIL import Image, ImageEnhance, ImageDraw
 
 from pydantic import BaseModel, Field
@@ -39,9 +41,12 @@ def retrieve_3dfront(desc: Annotated[ModelDescription, "Description of the 3D as
     dataset_path = FUTURE_MODEL_PATH
     return RetrievedModelPath(path=dataset_path + obj + '/normalized_model.obj')
 
+def _retrieve_objaverse(desc):
+    result: str = get_service('objaverse').call('retrieve', [desc])[0]
+    return result
+
 def retrieve_objaverse(desc: Annotated[ModelDescription, "Description of the 3D asset"]) -> RetrievedModelPath:
-    with bentoml.SyncHTTPClient('http://chetak.ucsd.edu:3001') as client:
-        result: str = client.retrieve([desc.desc])[0]
+    result = BACKEND.call('objaverse', {'desc': desc.desc}, lambda: get_limiter('objaverse').call(lambda: _retrieve_objaverse(desc.desc)))
     
     if result == '**':
         return RetrievedModelPath(path="Not found")
@@ -78,7 +83,7 @@ class Painting:
         vertices[:,0] *= 1.0
         vertices[:,1] *= 1.0
         
-        desc = LLM(system_desc="Given the request prompt, you are supposed to give a one line desciption to be fed to a text to image generator model. DO NOT write lengthy descriptions!", response_format="text", single_use=True).run(desc)
+        desc = LLM(system_desc="Given the request prompt, you are supposed to give a one line desciption to be fed to a text to image generator model. DO NOT write lengthy descriptions!", response_format="text", single_use=True, name="painting_prompt").run(desc)
         texture = text2img(desc)
         texture = texture.transpose(Image.ROTATE_90)
         texture = texture.transpose(Image.ROTATE_90)
@@ -158,7 +163,7 @@ class ObjectDatabase:
             For specific assets like area rugs and wall clocks, you can use the respective functions.
             Note that you should call the tool seperately for each object, the tools cannot output multiple objects at once.
             """,
-            concluding_llm = LLM(single_use=True, system_desc="You should go through the chat and return a JSON file for each object mentioning whether the said object is available or not. Example response can be like objname:No, objname:Yes", response_format="json",),
+            concluding_llm = LLM(single_use=True, system_desc="You should go through the chat and return a JSON file for each object mentioning whether the said object is available or not. Example response can be like objname:No, objname:Yes", response_format="json", name="object_database.concluding_llm"),
             context=None)
 
         self.retriever.add_tool(retrieve_3dfront, "retrieve_3dfront", "Retrieve 3D models of items, primarily indoor furniture")
@@ -190,7 +195,7 @@ class Object3DRetriever:
     'A beautiful painting of a horse'
     'A gaming laptop'
     """, 
-    concluding_llm = LLM(single_use=True, system_desc="You should go through the chat and return the path of the 3D object as a JSON object. example response can be like path:<put path here>", response_format="json",json_keys=['path']),
+    concluding_llm = LLM(single_use=True, system_desc="You should go through the chat and return the path of the 3D object as a JSON object. example response can be like path:<put path here>", schema=RetrievedModelPath, name="object3d_retriever.concluding_llm"),
     context=None)
         self.retriever.add_tool(retrieve_3dfront, "retrieve_3dfront", "Retrieve 3D models of items, primarily indoor furniture")
         self.retriever.add_tool(retrieve_painting, "retrieve_painting", "Retrieve 3D models of wall art/paintings/2D images")
@@ -12,11 +12,13 @@ scene.add_walls('cream white', 'wooden', 'plain')  # wall color, floor texture,
 scene.place_window('window1', wall='left_wall', position='full', type='picture', place_curtain=False)
 scene.place_door('door1', wall='front_wall', position='middle')
 ## Add furniture
-scene.add('sofa1', desc='A two-seater sofa')
-scene.add('sofa2', desc='A two-seater sofa')
-scene.add('coffee_table', desc='A low-profile, rectangular, glass coffee table')
-scene.add('armchair', desc='A single armchair')
-scene.add('end_table', desc='A small end table')
+scene.add_many([
+    ('sofa1', 'A two-seater sofa'),
+    ('sofa2', 'A two-seater sofa'),
+    ('coffee_table', 'A low-profile, rectangular, glass coffee table'),
+    ('armchair', 'A single armchair'),
+    ('end_table', 'A small end table'),
+])
 ## Place furniture
 # Place sofa1 along the back wall
 scene.sofa1.place_global(x=2.5, y='floor', z='back_wall')
@@ -75,10 +77,12 @@ scene.add_walls('cream white', 'wooden', 'plain')  # wall color, floor texture,
 scene.place_window('window1', wall='right_wall', position='full',type='picture', place_curtain=False)
 scene.place_door('door1', wall='front_wall', position='middle')
 ## Add furniture
-scene.add('sofa',desc='A two seater sofa')
-scene.add('end_table', desc='Wooden, round, end table')
-scene.add('coffee_table', desc='Black coffee table')
-scene.add('armchair', desc='Modern armchair in a light cream color')
+scene.add_many([
+    ('sofa', 'A two seater sofa'),
+    ('end_table', 'Wooden, round, end table'),
+    ('coffee_table', 'Black coffee table'),
+    ('armchair', 'Modern armchair in a light cream color'),
+])
 
 ## Place the sofa against the center of back wall. We will set the x coordinate to be 2.0 given that the room is 4 meters wide.
 scene.sofa.place_global(x=2.5, y='floor', z='back_wall')
@@ -134,12 +138,14 @@ scene.place_window('window1', wall='back_wall', position='middle',type='standard
 scene.place_window('window2', wall="right_wall", position='middle', type='standard', place_curtain=True)
 scene.place_door('door1', wall='left_wall', position='left')
 ## Add furniture
-scene.add('sofa1', desc='A blue sofa')
-scene.add('sofa2', desc='A grey sofa')
-scene.add('coffee_table',desc='A rectangular coffee table')
-scene.add('armchair',desc='A single armchair')
-scene.add('side_table1',desc='A side table')
-scene.add('side_table2',desc='A side table')
+scene.add_many([
+    ('sofa1', 'A blue sofa'),
+    ('sofa2', 'A grey sofa'),
+    ('coffee_table', 'A rectangular coffee table'),
+    ('armchair', 'A single armchair'),
+    ('side_table1', 'A side table'),
+    ('side_table2', 'A side table'),
+])
 ## Let's begin by placing the grey sofa against the back wall. We can place it against the center of the back wall and have it face the front wall.
 scene.sofa2.place_global(x='center', y='floor', z='back_wall', face_towards='front_wall')
 ## Next, place the coffee table in front of the grey sofa. Typically, the gap should be between 0.4 to 0.5 meters. We can face the table towards the grey sofa.
@@ -205,11 +211,13 @@ scene.place_window('window1', wall='right_wall', position='left',type='standard'
 scene.place_window('window2', wall='front_wall', position='full',type='floor_to_ceiling', place_curtain=False)
 scene.place_door('door1', wall='left_wall', position='left')
 ## Add furniture
-scene.add("sofa", desc="A white three-seater sofa")
-scene.add("armchair1", desc="An armchair")
-scene.add("armchair2", desc="An armchair")
-scene.add("end_table", desc="Round end table")
-scene.add("coffee_table", desc="A square coffee table")
+scene.add_many([
+    ('sofa', 'A white three-seater sofa'),
+    ('armchair1', 'An armchair'),
+    ('armchair2', 'An armchair'),
+    ('end_table', 'Round end table'),
+    ('coffee_table', 'A square coffee table'),
+])
 # Place the sofa against the center of back wall. We will set the x coordinate to be 2.0 given that the room is 4 meters wide.
 scene.sofa.place_global(x='center', y='floor', z='back_wall')
 # Place the coffee table in front of the sofa. Typically, the gap should be between 0.4 to 0.5 meters
@@ -229,8 +237,10 @@ scene.add('plant3', desc='A small indoor plant')
 scene.plant3.place_relative(relation='on_top_of', obj=scene.coffee_table)
 scene.add('decor1', desc='An elegant decor item')
 scene.decor1.place_relative(relation='on_top_of', obj=scene.coffee_table)
-scene.add('painting1', desc='A beautiful painting of a couple sitting in a garden')
-scene.add('painting2', desc='A beautiful painting of a dog')
+scene.add_many([
+    ('painting1', 'A beautiful painting of a couple sitting in a garden'),
+    ('painting2', 'A beautiful painting of a dog'),
+])
 scene.painting1.place_on_wall('back_wall', horizontal_position='middle', vertical_position='middle')
 scene.painting2.place_on_wall('right_wall', horizontal_position='middle', vertical_position='middle')
 scene.add('rug1', desc='A beautiful area rug')
@@ -320,11 +330,13 @@ scene.add_walls('soft gray', 'wooden', 'white')
 scene.place_door('door1', wall='right_wall', position='right')
 scene.place_window('window1', wall='left_wall', position='full',type='picture', place_curtain=True)
 ## Add furniture
-scene.add('bed', desc='A double bed')
-scene.add('bedside_table1', desc='A round bedside table')
-scene.add('bedside_table2', desc='A round bedside table')
-scene.add('armchair', desc='A leather armchair')
-scene.add('dresser', desc='A wooden dresser')
+scene.add_many([
+    ('bed', 'A double bed'),
+    ('bedside_table1', 'A round bedside table'),
+    ('bedside_table2', 'A round bedside table'),
+    ('armchair', 'A leather armchair'),
+    ('dresser', 'A wooden dresser'),
+])
 # Place the bed against the back wall. Since the bed is placed in the center of the back wall and face it towards the front wall
 scene.bed.place_global(x='center', y='floor', z='back_wall', face_towards='front_wall')
 # Place each beside table along the back wall, on either side of the bed. The gap between the bed and bedside table should be around 0.1 meters.
@@ -339,8 +351,10 @@ scene.add('plant1', desc='A tall indoor plant')
 scene.plant1.place_global(x='left_wall', y='floor', z='front_wall')
 scene.add('clock1', desc='A wall clock')
 scene.clock1.place_on_wall('right_wall', horizontal_position='left', vertical_position='top')
-scene.add('painting1', desc='A beautiful painting of an ocean wave')
-scene.add('painting2', desc='A beautiful painting of sea animals') 
+scene.add_many([
+    ('painting1', 'A beautiful painting of an ocean wave'),
+    ('painting2', 'A beautiful painting of sea animals'),
+])
 scene.painting1.place_on_wall('back_wall', horizontal_position='middle', vertical_position='middle')
 scene.painting2.place_on_wall('front_wall', horizontal_position='left', vertical_position='middle')
 # Place a decor item on top of the wardrobe
@@ -382,10 +396,12 @@ scene.add_walls(wall_color='Light Lavender', floor_texture='wooden', ceiling_tex
 scene.place_window('window1', wall='back_wall', position='full', type='floor_to_ceiling', place_curtain=False)
 scene.place_door('door1', wall='front_wall', position='middle')
 ## Add furniture
-scene.add('bed', desc='Bed featuring a navy blue comforter with a nautical theme, including illustrations of boats and sea life')
-scene.add('nightstand1', desc='Dark brown, rectangular nightstand')
-scene.add('nightstand2', desc='Dark brown, rectangular nightstand')
-scene.add('dresser', desc='Tall, dark brown dresser with multicolored drawers')
+scene.add_many([
+    ('bed', 'Bed featuring a navy blue comforter with a nautical theme, including illustrations of boats and sea life'),
+    ('nightstand1', 'Dark brown, rectangular nightstand'),
+    ('nightstand2', 'Dark brown, rectangular nightstand'),
+    ('dresser', 'Tall, dark brown dresser with multicolored drawers'),
+])
 # Place the bed against the right wall in the center and facing the left wall
 scene.bed.place_global(x='right_wall', y='floor', z='center', face_towards='left_wall')
 # Place nightstands adjacent to the left and right of the bed
@@ -446,11 +462,13 @@ scene.place_window('window1', wall='left_wall', position='full', type='standard'
 scene.place_window('window1', wall='left_wall', position='full',type='standard', place_curtain=True)
 scene.place_door('door1', wall='front_wall', position='middle')
 ## Add furniture
-scene.add('desk', desc='Rectangular desk')
-scene.add('chair', desc='Wooden chair with a slatted back and a brown cushion')
-scene.add('cabinet', desc='Tall wooden cabinet with a simple design')
-scene.add('credenza', desc='Wooden credenza with sliding glass doors')
-scene.add('sideboard', desc='A wooden sideboard with a simple design')
+scene.add_many([
+    ('desk', 'Rectangular desk'),
+    ('chair', 'Wooden chair with a slatted back and a brown cushion'),
+    ('cabinet', 'Tall wooden cabinet with a simple design'),
+    ('credenza', 'Wooden credenza with sliding glass doors'),
+    ('sideboard', 'A wooden sideboard with a simple design'),
+])
 
 # Place the desk against the left wall. We will set the z coordinate to be 2.0 given that the room is 4 meters long.
 scene.desk.place_global(x='left_wall', y='floor', z=2)
@@ -477,9 +495,11 @@ scene.painting2.place_on_wall('right_wall', horizontal_position='middle', vertic
 scene.add('clock1', desc='A modern wall clock')
 scene.clock1.place_on_wall('front_wall', horizontal_position='right', vertical_position='top')
 
-scene.add('white_vase', desc='A small white vase')
-scene.add('glass_vase1', desc='small glass vase')
-scene.add('glass_vase2', desc='Tall glass vase with red flowers')
+scene.add_many([
+    ('white_vase', 'A small white vase'),
+    ('glass_vase1', 'small glass vase'),
+    ('glass_vase2', 'Tall glass vase with red flowers'),
+])
 
 for i in range(3):
     if i == 0:
@@ -666,11 +686,13 @@ scene.place_door('door1', wall='right_wall', position='right')
 scene.place_door('door2', wall='left_wall', position='left')
 
 ## Add objects (furniture) to the scene
-scene.add('sofa', desc='A wide three-seater sofa')
-scene.add('coffee_table', desc='A round coffee table')
-scene.add('armchair', desc='A comfortable armchair')
-scene.add('cabinet', desc='A short but wide cabinet')
-scene.add('dining_table', desc='A rectangular dining table')
+scene.add_many([
+    ('sofa', 'A wide three-seater sofa'),
+    ('coffee_table', 'A round coffee table'),
+    ('armchair', 'A comfortable armchair'),
+    ('cabinet', 'A short but wide cabinet'),
+    ('dining_table', 'A rectangular dining table'),
+])
 for i in range(4):
     scene.add(f'chair{i+1}', desc='A dining chair')
 
@@ -749,12 +771,14 @@ scene.place_window('window1', wall='right_wall', position='full', type='picture'
 scene.place_door('door1', wall='left_wall', position='left')
 
 ## Add furniture
-scene.add('sofa1', desc='L-shaped sofa')
-scene.add('armchair', desc='A comfortable armchair')
-scene.add('coffee_table', desc='A square coffee table')
-scene.add('end_table', desc='A small end table')
-scene.add('tv_cabinet', desc='A small but wide TV cabinet')
-scene.add('tv', desc='A large TV')
+scene.add_many([
+    ('sofa1', 'L-shaped sofa'),
+    ('armchair', 'A comfortable armchair'),
+    ('coffee_table', 'A square coffee table'),
+    ('end_table', 'A small end table'),
+    ('tv_cabinet', 'A small but wide TV cabinet'),
+    ('tv', 'A large TV'),
+])
 
 # Place the sofa against the back wall at x=2, centered
 scene.sofa1.place_global(x=2, y='floor', z='back_wall')
@@ -814,12 +838,14 @@ scene.place_window('window1', wall='left_wall', position='full', type='picture',
 scene.place_door('door1', wall='front_wall', position='left')
 
 ## Add furniture
-scene.add('bed', desc='A king-sized bed')
-scene.add('bedside_table1', desc='A bedside table')
-scene.add('bedside_table2', desc='A bedside table')
-scene.add('wardrobe', desc='A wardrobe')
-scene.add('desk', desc='A desk')
-scene.add('chair', desc='A chair')
+scene.add_many([
+    ('bed', 'A king-sized bed'),
+    ('bedside_table1', 'A bedside table'),
+    ('bedside_table2', 'A bedside table'),
+    ('wardrobe', 'A wardrobe'),
+    ('desk', 'A desk'),
+    ('chair', 'A chair'),
+])
 
 # Place the bed against the back wall at x=2, centered
 scene.bed.place_global(x=2, y='floor', z='back_wall')
@@ -878,10 +904,12 @@ scene.place_window('window1', wall='right_wall', position='full', type='picture'
 scene.place_door('door1', wall='left_wall', position='left')
 
 ## Add furniture
-scene.add('sofa', desc='A sofa with a curved back')
-scene.add('coffee_table', desc='A coffee table')
-scene.add('tv_cabinet', desc='A TV cabinet')
-scene.add('tv', desc='A TV')
+scene.add_many([
+    ('sofa', 'A sofa with a curved back'),
+    ('coffee_table', 'A coffee table'),
+    ('tv_cabinet', 'A TV cabinet'),
+    ('tv', 'A TV'),
+])
 
 for i in range(2):
     scene.add(f'end_table{i+1}', desc='A small end table')
@@ -966,11 +994,13 @@ scene.place_window('window1', wall='right_wall', position='full', type='picture'
 scene.place_door('door1', wall='left_wall', position='left')
 
 ## Add objects (furniture) to the scene
-scene.add('bed', desc='A double bed')
-scene.add('bedside_table', desc='A bedside table')
-scene.add('cabinet', desc='A cabinet')
-scene.add('desk', desc='A desk')
-scene.add('chair', desc='A chair')
+scene.add_many([
+    ('bed', 'A double bed'),
+    ('bedside_table', 'A bedside table'),
+    ('cabinet', 'A cabinet'),
+    ('desk', 'A desk'),
+    ('chair', 'A chair'),
+])
 
 # Place the bed against the back wall at x=2.5
 scene.bed.place_global(x=2.5, y='floor', z='back_wall')
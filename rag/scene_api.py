@@ -13,6 +13,7 @@ For the following set variables wall ∈ {{'left_wall', 'right_wall', 'front_wal
 
 Adding Objects:
 - scene.add(name, desc, dims=(width,depth,height)): Add object with a description. dims is optional for objects where particular dimensions can be specified.
+- scene.add_many([(name, desc), (name, desc, (width,depth,height)), ...]): Add several objects at once, each given as a tuple of the arguments of scene.add. Prefer it over consecutive scene.add calls, e.g. scene.add_many([('sofa', 'A three-seater sofa'), ('coffee_table', 'A glass coffee table', (1.2, 0.6, 0.45))]).
 
 Object Access:
 - Direct scene.<object_name> or via scene.get_object('name') for Object3D instances.
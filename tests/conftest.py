@@ -0,0 +1,32 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from assets.llm_config import LLM_CONFIG, RETRY_CONFIG
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    ## clients are built with the configured key, no request ever reaches the provider
+    monkeypatch.setitem(LLM_CONFIG, 'api_key', LLM_CONFIG.get('api_key') or 'sk-test')
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    ## modules write tmp/ and assets/ relative to the working directory
+    os.makedirs(tmp_path/'tmp', exist_ok=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setitem(RETRY_CONFIG, 'backoff', 0.0)
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    from tools.backend import BACKEND
+    monkeypatch.setattr(BACKEND, 'path', str(tmp_path/'recordings'))
+    monkeypatch.setattr(BACKEND, 'occurrences', {})
+    return BACKEND
@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from tools.backend import Backend, encode_array, decode_array
+
+def test_live_calls_through(tmp_path):
+    backend = Backend('live', path=str(tmp_path))
+    assert backend.call('svc', {'q': 1}, lambda: 'live') == 'live'
+    assert list(tmp_path.iterdir()) == []
+
+def test_record_then_replay(tmp_path):
+    recorder = Backend('record', path=str(tmp_path))
+    assert recorder.call('svc', {'q': 1}, lambda: 'first') == 'first'
+    assert recorder.call('svc', {'q': 1}, lambda: 'second') == 'second'
+    recorder.call('svc', {'q': 2}, lambda: np.arange(3), encode=encode_array)
+
+    player = Backend('replay', path=str(tmp_path))
+    def fail():
+        raise AssertionError('replay made a live call')
+    ## identical requests replay in the order they were recorded
+    assert player.call('svc', {'q': 1}, fail) == 'first'
+    assert player.call('svc', {'q': 1}, fail) == 'second'
+    assert np.array_equal(player.call('svc', {'q': 2}, fail, decode=decode_array), np.arange(3))
+    with pytest.raises(KeyError):
+        player.call('svc', {'q': 3}, fail)
+
+def test_call_many_records_every_item(tmp_path):
+    recorder = Backend('record', path=str(tmp_path))
+    batches = []
+    fn = lambda requests: batches.append(requests) or [request['q']*10 for request in requests]
+    assert recorder.call_many('svc', [{'q': 1}, {'q': 2}], fn) == [10, 20]
+    assert len(batches) == 1
+    player = Backend('replay', path=str(tmp_path))
+    assert player.call_many('svc', [{'q': 2}, {'q': 1}], None) == [20, 10]
+    assert player.call('svc', {'q': 1}, None) == 10
+
+def test_local_stand_ins(tmp_path):
+    backend = Backend('local', path=str(tmp_path))
+    backend.register_stand_in('svc', lambda request: request['q']+1)
+    assert backend.call('svc', {'q': 1}, None) == 2
+    with pytest.raises(KeyError):
+        backend.call('other', {'q': 1}, None)
+
+def test_default_stand_ins_need_no_network():
+    from tools.backend import BACKEND, _llm_stand_in
+    assert _llm_stand_in({'response_format': 'json', 'json_keys': ['a'], 'schema': None}) == {'a': None}
+    assert _llm_stand_in({'response_format': 'code', 'schema': None}).startswith("```python")
+    first = BACKEND._stand_in('embeddings', {'model': 'text-embedding-3-large', 'text': 'chair'})
+    assert len(first) == 3072 and first == BACKEND._stand_in('embeddings', {'model': 'text-embedding-3-large', 'text': 'chair'})
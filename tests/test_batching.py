@@ -0,0 +1,39 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from tools.batching import MicroBatcher
+
+def test_concurrent_items_share_a_batch():
+    batches = []
+    def fn(items):
+        batches.append(list(items))
+        return [item*2 for item in items]
+
+    batcher = MicroBatcher(fn, max_batch=8, max_wait=0.2)
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [future.result(5) for future in futures] == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert batcher.stats() == {'batches': 1, 'items': 5}
+
+def test_max_batch():
+    sizes = []
+    def fn(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(fn, max_batch=3, max_wait=0.2)
+    with ThreadPoolExecutor(7) as pool:
+        assert sorted(pool.map(batcher, range(7))) == list(range(7))
+    assert max(sizes) <= 3 and sum(sizes) == 7
+
+def test_errors_reach_every_caller():
+    def fn(items):
+        raise RuntimeError('down')
+
+    batcher = MicroBatcher(fn, max_batch=4, max_wait=0.05)
+    futures = [batcher.submit(i) for i in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(5)
+    ## the worker survives a failed batch
+    batcher.fn = lambda items: items
+    assert batcher(1) == 1
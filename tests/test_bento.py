@@ -0,0 +1,62 @@
+import time
+import threading
+import pytest
+from tools.bento import ServiceClient, LatencyHistogram
+from tools.ratelimit import RateLimiter
+
+def test_histogram():
+    histogram = LatencyHistogram(window=3)
+    assert histogram.quantile(0.5) is None
+    for latency in [0.01, 0.2, 0.3, 0.4]:
+        histogram.add(latency)
+    assert histogram.quantile(0.0) == 0.2
+    assert histogram.quantile(0.99, min_samples=5) is None
+    assert histogram.snapshot()['<=0.05'] == 1
+
+def make_client(monkeypatch, latencies, limiter):
+    ## rank is hedged; the primary of the slow call is slower than its hedge
+    client = ServiceClient('clip')
+    client.limiter = limiter
+    for _ in range(client.hedge_config['min_samples']):
+        client.histograms['rank'].add(0.01)
+    calls = []
+    lock = threading.Lock()
+    def call_once(endpoint, args, kwargs):
+        with lock:
+            calls.append(endpoint)
+            latency = latencies[min(len(calls), len(latencies))-1]
+        time.sleep(latency)
+        return latency
+    monkeypatch.setattr(client, '_call_once', call_once)
+    return client, calls
+
+def test_slow_calls_are_hedged(monkeypatch):
+    limiter = RateLimiter('test', rate=1000.0, burst=10, max_concurrency=4)
+    client, calls = make_client(monkeypatch, [0.5, 0.02], limiter)
+    assert client.call('rank') == 0.02
+    assert len(calls) == 2
+    assert client.stats()['hedges'] == 1 and client.stats()['hedge_wins'] == 1
+    ## the hedge gives its slot back when it finishes
+    time.sleep(0.05)
+    assert limiter.stats()['in_flight'] == 0
+
+def test_hedges_respect_the_limiter(monkeypatch):
+    limiter = RateLimiter('test', rate=1000.0, burst=10, max_concurrency=1)
+    client, calls = make_client(monkeypatch, [0.2, 0.02], limiter)
+    ## the caller holds the only slot for the primary
+    with limiter.slot():
+        assert client.call('rank') == 0.2
+    assert len(calls) == 1
+    assert client.stats()['hedges'] == 0 and client.stats()['hedges_skipped'] == 1
+
+def test_fast_calls_are_not_hedged(monkeypatch):
+    client, calls = make_client(monkeypatch, [0.0], None)
+    client.histograms['rank'] = LatencyHistogram()
+    assert client.call('rank') == 0.0
+    assert len(calls) == 1 and client.stats()['hedges'] == 0
+
+def test_deadline(monkeypatch):
+    client, calls = make_client(monkeypatch, [0.5, 0.5], None)
+    monkeypatch.setitem(client.endpoints, 'rank', {'timeout': 0.1, 'hedge': True})
+    with pytest.raises(TimeoutError):
+        client.call('rank')
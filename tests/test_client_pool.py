@@ -0,0 +1,28 @@
+import asyncio
+from tools.client_pool import ClientPool
+
+FORMAT = {"type": "text"}
+
+def test_clients_are_shared():
+    pool = ClientPool()
+    client = pool.get('gpt-4o', 'sk-test', FORMAT, timeout=30)
+    assert pool.get('gpt-4o', 'sk-test', FORMAT, timeout=30) is client
+    assert pool.get('gpt-4o', 'sk-test', FORMAT, timeout=60) is not client
+    assert pool.get('gpt-4o', 'sk-test', {"type": "json_object"}, timeout=30) is not client
+    assert pool.stats()['constructed'] == 3 and pool.stats()['reused'] == 1
+    ## streamed responses report their usage, retries are left to the rate limiter
+    assert client.stream_usage and client.max_retries == 0
+    pool.clear()
+
+def test_async_clients_are_bound_to_their_loop():
+    pool = ClientPool()
+    async def get_twice():
+        return pool.get('gpt-4o', 'sk-test', FORMAT, asynchronous=True), pool.get('gpt-4o', 'sk-test', FORMAT, asynchronous=True)
+
+    first, again = asyncio.run(get_twice())
+    assert first is again
+    second, _ = asyncio.run(get_twice())
+    assert second is not first
+    ## the client of the first, closed loop was dropped
+    assert pool.stats()['async_clients'] == 1 and pool.stats()['loops'] == 1
+    pool.clear()
@@ -0,0 +1,46 @@
+import pytest
+from tools.codestream import CodeStream, CodeSyntaxError, CodeFenceError
+
+def feed(stream, text, size=3):
+    for i in range(0, len(text), size):
+        if stream.feed(text[i:i+size]):
+            return True
+    stream.close()
+    return False
+
+def test_statements_are_handed_over_as_they_complete():
+    seen = []
+    stream = CodeStream(on_statement=lambda node, source: seen.append((source, len(stream.text))))
+    response = "Here you go:\n```python\nx = 1\nif x:\n    y = 2\nelse:\n    y = 3\nz = [1,\n2]\n```\ntrailing text"
+    assert feed(stream, response)
+    stream.check()
+    assert [source for source, _ in seen] == ["x = 1", "if x:\n    y = 2\nelse:\n    y = 3", "z = [1,\n2]"]
+    ## the first statement was parsed before the response was complete
+    assert seen[0][1] < response.index("```\n")
+    assert stream.code == "\nx = 1\nif x:\n    y = 2\nelse:\n    y = 3\nz = [1,\n2]\n"
+
+def test_decorators_stay_with_their_definition():
+    nodes = []
+    stream = CodeStream(on_statement=lambda node, source: nodes.append(node))
+    feed(stream, "```python\n@decorator\ndef f():\n    return 1\n```")
+    assert len(nodes) == 1
+    assert nodes[0].name == 'f' and nodes[0].decorator_list[0].id == 'decorator'
+
+def test_syntax_error_raises_before_the_end():
+    stream = CodeStream()
+    with pytest.raises(CodeSyntaxError) as error:
+        feed(stream, "```python\nx = 1\ny = = 2\nz = 3\nw = 4\n" + "a = 1\n"*50 + "```")
+    assert error.value.error.lineno == 3
+    ## the closing fence was never read
+    assert stream.text.count("```") == 1
+
+def test_missing_or_unterminated_fence():
+    stream = CodeStream()
+    feed(stream, "no code here")
+    with pytest.raises(CodeFenceError):
+        stream.check()
+    stream = CodeStream()
+    feed(stream, "```python\nx = 1\n")
+    with pytest.raises(CodeFenceError):
+        stream.check()
+    assert stream.statements == ["x = 1"]
@@ -0,0 +1,37 @@
+from tools.colors import NAMED_COLORS, parse_color, resolve_color
+
+def test_named_and_compound_colors():
+    assert parse_color("red") == (255, 0, 0)
+    assert parse_color("Sky Blue") == NAMED_COLORS['skyblue']
+    assert parse_color("a light gray wall") == NAMED_COLORS['lightgray']
+
+def test_grey_spellings():
+    for name in ['grey', 'dark grey', 'light grey', 'dim grey', 'slate grey', 'light slate grey', 'dark slate grey']:
+        assert parse_color(name) == parse_color(name.replace('grey', 'gray')), name
+
+def test_specific_names_win_over_basic_hues():
+    assert parse_color("sage green") == NAMED_COLORS['sage']
+    assert parse_color("cream white") == NAMED_COLORS['cream']
+    assert parse_color("blue green") == (0, 64, 128)
+
+def test_modifiers():
+    assert parse_color("soft sage green") != NAMED_COLORS['sage']
+    light = parse_color("pale blue")
+    assert light[2] == 255 and light[0] > 0
+
+def test_misspellings_of_long_names_only():
+    assert parse_color("turqoise") == NAMED_COLORS['turquoise']
+    ## short everyday words are not mistaken for color names
+    assert parse_color("stand") is None
+    assert parse_color("tam") is None
+
+def test_unknown_names_are_left_to_the_llm():
+    assert parse_color("baby blue") is None
+    assert parse_color("burnt orange") is None
+    assert parse_color("") is None
+
+def test_resolve_without_llm():
+    cache = {}
+    assert resolve_color("navy", cache=cache, use_llm=False) == NAMED_COLORS['navy']
+    assert resolve_color("baby blue", cache=cache, use_llm=False, default=(1, 2, 3)) == (1, 2, 3)
+    assert cache == {"navy": NAMED_COLORS['navy'], "baby blue": (1, 2, 3)}
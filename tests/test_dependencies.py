@@ -0,0 +1,61 @@
+from modules.sdl.dependencies import DependencyGraph
+
+class Node:
+    def __init__(self, name, graph, log):
+        self.name = name
+        self.graph = graph
+        self.log = log
+
+    def update(self):
+        self.log.append(self.name)
+        ## objects notify their dependents after being recomputed, as Object3D.update does
+        self.graph.changed(self)
+
+def make_nodes(names):
+    graph, log = DependencyGraph(), []
+    return graph, log, {name: Node(name, graph, log) for name in names}
+
+def test_dependents_are_recomputed_once_in_order():
+    graph, log, n = make_nodes('abcd')
+    graph.link(n['a'], n['c'])
+    graph.link(n['a'], n['b'])
+    graph.link(n['b'], n['c'])
+    graph.link(n['c'], n['d'])
+    graph.changed(n['a'])
+    assert log == ['b', 'c', 'd']
+    assert graph.stats() == {'links': 4, 'flushes': 1, 'recomputes': 3, 'cycles': 0}
+
+def test_batch_defers_the_flush():
+    graph, log, n = make_nodes('abc')
+    graph.link(n['a'], n['c'])
+    graph.link(n['b'], n['c'])
+    with graph.batch():
+        graph.changed(n['a'])
+        with graph.batch():
+            graph.changed(n['b'])
+        assert log == []
+    assert log == ['c']
+    assert graph.stats()['flushes'] == 1
+
+def test_moved_skips_the_group():
+    graph, log, n = make_nodes('abc')
+    graph.link(n['a'], n['b'])
+    graph.link(n['a'], n['c'])
+    graph.moved([n['a'], n['b']])
+    assert log == ['c']
+
+def test_unlink():
+    graph, log, n = make_nodes('ab')
+    graph.link(n['a'], n['b'])
+    graph.unlink(n['a'], n['b'])
+    graph.changed(n['a'])
+    assert log == [] and graph.get_dependents(n['a']) == []
+
+def test_cycles_are_recomputed_once_each():
+    graph, log, n = make_nodes('abc')
+    graph.link(n['a'], n['b'])
+    graph.link(n['b'], n['c'])
+    graph.link(n['c'], n['b'])
+    graph.changed(n['a'])
+    assert log == ['b', 'c']
+    assert graph.stats()['cycles'] == 1
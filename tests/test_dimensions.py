@@ -0,0 +1,65 @@
+import json
+import numpy as np
+from modules.utils.dimensions import DimensionPriors, OVERRIDES_HEADER
+
+CATEGORIES = {'Dining Table': (1.6, 0.9, 0.75), 'Dining Chair': (0.5, 0.5, 0.9), 'Bunk Bed': (2.0, 1.0, 1.6)}
+
+def embed_by_words(texts, vocabulary=('dining', 'table', 'chair', 'bunk', 'bed')):
+    return np.array([[float(word in text.lower()) for word in vocabulary] + [0.01] for text in texts])
+
+def make_priors(tmp_path, overrides=None, categories=CATEGORIES, embed=embed_by_words):
+    overrides_path = tmp_path/'object_scale.txt'
+    if overrides is not None:
+        overrides_path.write_text(overrides)
+    priors = DimensionPriors(path=str(tmp_path/'priors.json'), overrides_path=str(overrides_path), model='test', threshold=0.9)
+    priors.categories = {category: priors._dims(*dims) for category, dims in categories.items()}
+    priors._embed = embed
+    return priors
+
+def test_overrides(tmp_path):
+    priors = make_priors(tmp_path, OVERRIDES_HEADER + "\n1. dining_chair: 0.5m x 0.45m x 0.95m\n- sofa = 2 x 0.9 x 0.8\nthe lamp should be tall\n")
+    assert priors.lookup('dining chair', 'a chair') == {'width': 0.5, 'depth': 0.45, 'height': 0.95}
+    assert priors.lookup('sofa', 'a sofa') == {'width': 2.0, 'depth': 0.9, 'height': 0.8}
+    ## mentioned without dims, or not mentioned while overrides exist: the agent reads the file
+    assert priors.lookup_override('lamp') is False
+    assert priors.lookup('lamp', 'a lamp') is None
+    assert priors.lookup('bunk_bed', 'Bunk Bed') is None
+
+def test_single_override_on_the_header_line(tmp_path):
+    priors = make_priors(tmp_path, OVERRIDES_HEADER + " dining_table: 1.2m x 0.8m x 0.75m\n")
+    assert priors.has_overrides()
+    assert priors.lookup('dining_table', 'a table') == {'width': 1.2, 'depth': 0.8, 'height': 0.75}
+
+def test_header_alone_is_not_an_override(tmp_path):
+    priors = make_priors(tmp_path, OVERRIDES_HEADER + "\n")
+    assert not priors.has_overrides()
+    assert priors.lookup('dining_table', 'Dining Table') == {'width': 1.6, 'depth': 0.9, 'height': 0.75}
+
+def test_neighbours(tmp_path):
+    priors = make_priors(tmp_path)
+    assert priors.lookup('table', 'A wooden dining table') == {'width': 1.6, 'depth': 0.9, 'height': 0.75}
+    ## size words and explicit dimensions have to match
+    assert priors.lookup('table', 'A small dining table') is None
+    assert priors.lookup('table', 'A 2m dining table') is None
+    assert priors.lookup('sofa', 'A sofa') is None
+    assert priors.stats()['hits'] == 1 and priors.stats()['misses'] == 3
+
+def test_threshold_is_raised_for_confusable_categories(tmp_path):
+    categories = {'Coffee Table': (1.1, 0.6, 0.45), 'Dining Table': (1.6, 0.9, 0.75)}
+    embed = lambda texts: np.array([[1.0, 0.3*('coffee' in text.lower()), 0.3*('side' in text.lower())] for text in texts])
+    priors = make_priors(tmp_path, categories=categories, embed=embed)
+    ## 0.958 would pass the configured threshold, but the two tables are that similar as well
+    assert priors.lookup_neighbour('A side table') is None
+    assert 0.97 < priors.threshold < 0.99
+    assert priors.lookup_neighbour('A dining table') == {'width': 1.6, 'depth': 0.9, 'height': 0.75}
+
+def test_record(tmp_path):
+    priors = make_priors(tmp_path)
+    priors.record('sofa', 'A green sofa', {'width': 2, 'depth': 0.9, 'height': 0.8})
+    assert priors.lookup('sofa', 'A green sofa') == {'width': 2.0, 'depth': 0.9, 'height': 0.8}
+    with open(tmp_path/'priors.json') as f:
+        assert json.load(f) == {'A green sofa': {'width': 2.0, 'depth': 0.9, 'height': 0.8}}
+    ## scales given while overrides are in place are specific to that scene
+    (tmp_path/'object_scale.txt').write_text(OVERRIDES_HEADER + "\nsofa: 1 x 1 x 1\n")
+    priors.record('chair', 'A chair', {'width': 1, 'depth': 1, 'height': 1})
+    assert 'A chair' not in priors.accepted
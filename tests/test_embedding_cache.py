@@ -0,0 +1,44 @@
+import numpy as np
+from tools.embedding_cache import EmbeddingCache
+
+def test_put_get(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'text-embedding-3-large', max_entries=4)
+    assert cache.get('chair') is None
+    cache.put_many(['chair', 'table'], [[1.0, 0.0, 0.5], [0.0, 1.0, 0.25]])
+    assert cache.get('chair') == [1.0, 0.0, 0.5]
+    ## whitespace is normalized, casing is not
+    assert cache.get('  chair ') == [1.0, 0.0, 0.5]
+    assert cache.get('Chair') is None
+    assert cache.stats()['entries'] == 2
+
+def test_float32(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'm', max_entries=2, float16=False)
+    cache.put('a', [0.1, 0.2])
+    assert np.allclose(cache.get('a'), [0.1, 0.2], atol=1e-7)
+
+def test_persists_across_instances(tmp_path):
+    EmbeddingCache(str(tmp_path), 'm', max_entries=4).put('chair', [1.0, 2.0])
+    assert EmbeddingCache(str(tmp_path), 'm', max_entries=4).get('chair') == [1.0, 2.0]
+
+def test_least_recently_used_row_is_reused(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'm', max_entries=2)
+    cache.put('a', [1.0])
+    cache.put('b', [2.0])
+    cache.get('a')
+    cache.put('c', [3.0])
+    assert cache.get('b') is None
+    assert cache.get('a') == [1.0] and cache.get('c') == [3.0]
+    assert cache.stats()['evictions'] == 1
+
+def test_rows_rewritten_by_another_process_are_not_served(tmp_path):
+    first = EmbeddingCache(str(tmp_path), 'm', max_entries=1)
+    second = EmbeddingCache(str(tmp_path), 'm', max_entries=1)
+    first.put('a', [1.0])
+    assert second.get('a') == [1.0]
+    second.put('b', [2.0])
+    ## the index of the first process still maps 'a' to the reused row until it is refreshed
+    first.index_mtime = None
+    assert first.get('a') is None
+    assert first.get('b') == [2.0]
+    first.index['a'] = {'row': 0, 'used': 0}
+    assert not first._owns(0, EmbeddingCache.make_key('a'))
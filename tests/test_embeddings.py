@@ -0,0 +1,37 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tools.embeddings import Embeddings
+
+class FakeClient:
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+def test_queries_are_batched_and_cached(workdir, backend, monkeypatch):
+    monkeypatch.setattr(backend, 'mode', 'live')
+    embeddings = Embeddings(model='test-batched')
+    embeddings.client = FakeClient()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(embeddings.embed_query, ['a', 'bb', 'ccc', 'dddd']))
+    assert results == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0], [4.0, 1.0]]
+    assert sum(len(batch) for batch in embeddings.client.batches) == 4
+    assert len(embeddings.client.batches) < 4
+
+    ## served from the persistent cache, only the new text is sent
+    assert embeddings.embed_documents(['bb', 'eeeee']) == [[2.0, 1.0], [5.0, 1.0]]
+    assert embeddings.client.batches[-1] == ['eeeee']
+    assert embeddings.embed_query('a') == [1.0, 1.0]
+    assert sum(len(batch) for batch in embeddings.client.batches) == 5
+
+def test_local_stand_ins(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'mode', 'local')
+    embeddings = Embeddings(model='text-embedding-3-large')
+    assert embeddings.cache is None
+    vector = embeddings.embed_query('chair')
+    assert len(vector) == 3072
+    assert embeddings.embed_documents(['chair', 'table'])[0] == vector
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+import trimesh
+from modules.sdl.geometry import GeometryRegistry, canonicalize
+
+def test_canonicalize():
+    mesh = trimesh.creation.box((2, 1, 4))
+    mesh.apply_translation([3, 1, -2])
+    canonical = canonicalize(mesh)
+    assert np.allclose(canonical.extents, [0.5, 0.25, 1.0])
+    assert np.allclose(canonical.bounds.mean(axis=0), 0)
+    assert canonicalize(canonical) is canonical
+    ## the input is left alone, the result is read-only
+    assert np.allclose(mesh.bounds.mean(axis=0), [3, 1, -2])
+    with pytest.raises(ValueError):
+        canonical.vertices[0, 0] = 1.0
+
+def test_registry_loads_each_asset_once():
+    registry = GeometryRegistry()
+    loads = []
+    def load():
+        loads.append(1)
+        return trimesh.creation.box((1, 2, 1))
+    first = registry.get('box.obj', load)
+    assert registry.get('box.obj', load) is first
+    assert len(loads) == 1
+    assert registry.get('other.obj', load) is not first
+    assert registry.stats() == {'assets': 2, 'hits': 1, 'loads': 2}
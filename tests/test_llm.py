@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from pydantic import BaseModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.language_models import FakeListChatModel, GenericFakeChatModel
+from tools.llm import LLM
+from tools.llm_cache import ResponseCache
+from tools.metrics import METRICS
+
+class Recorder:
+    '''
+    Chain wrapper recording the model tier and batch configs the LLM asks for.
+    '''
+    def __init__(self, llm, model):
+        self.llm = llm
+        self.model = model
+        self.tiers = []
+        self.configs = []
+
+    def __call__(self, tier=None, asynchronous=False):
+        self.tiers.append(tier)
+        self.chain = self.llm.prompt_template | self.model
+        return self
+
+    def invoke(self, inputs):
+        return self.chain.invoke(inputs)
+
+    async def ainvoke(self, inputs):
+        return await self.chain.ainvoke(inputs)
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.configs.append(config)
+        return self.chain.batch(inputs, config=config, return_exceptions=return_exceptions)
+
+    def stream(self, inputs):
+        return self.chain.stream(inputs)
+
+def make_llm(model, **kwargs):
+    kwargs.setdefault('use_cache', False)
+    llm = LLM(**kwargs)
+    llm._get_chain = Recorder(llm, model)
+    return llm
+
+def test_run_json():
+    METRICS.reset()
+    llm = make_llm(FakeListChatModel(responses=['{"a": 1}']), response_format='json', json_keys=['a'], name='test.json')
+    assert llm.run('q') == {'a': 1}
+    assert METRICS.get('test.json')['calls'] == 1
+
+def test_invalid_responses_are_reasked_on_stronger_tiers(no_backoff):
+    METRICS.reset()
+    llm = make_llm(FakeListChatModel(responses=['{"b": 1}', '{"a": 2}']), response_format='json', json_keys=['a'], name='test.retry')
+    assert llm.run('q') == {'a': 2}
+    assert llm._get_chain.tiers == [None, 'strong']
+    assert METRICS.get('test.retry')['retries'] == 1
+
+def test_retries_are_bounded(no_backoff):
+    llm = make_llm(FakeListChatModel(responses=['{"b": 1}']), response_format='json', json_keys=['a'], name='test.bounded')
+    with pytest.raises(ValueError, match="missing keys"):
+        llm.run('q')
+    assert len(llm._get_chain.tiers) == 4
+
+class Dims(BaseModel):
+    width: float
+    height: float
+
+def test_schema_violations_are_reasked(no_backoff):
+    ## stands in for with_structured_output(include_raw=True)
+    responses = [{'width': 'wide', 'height': 1}, {'width': 2, 'height': 1}]
+    def structured(inputs):
+        args = responses.pop(0)
+        return {'raw': AIMessage(content='', tool_calls=[{'name': 'Dims', 'args': args, 'id': '1'}]), 'parsed': None}
+    llm = LLM(schema=Dims, name='test.schema', use_cache=False)
+    llm._get_chain = lambda tier=None, asynchronous=False: RunnableLambda(structured)
+    assert llm.json_keys == ['width', 'height']
+    assert llm.run('q') == {'width': 2.0, 'height': 1.0}
+    assert responses == []
+
+def test_arun():
+    llm = make_llm(FakeListChatModel(responses=['{"a": 3}']), response_format='json', json_keys=['a'], name='test.async')
+    assert asyncio.run(llm.arun('q')) == {'a': 3}
+
+def test_run_many_keeps_order_and_clamps_concurrency():
+    from tools.ratelimit import get_limiter
+    llm = make_llm(FakeListChatModel(responses=['{"a": 1}', '{"a": 2}', '{"a": 3}']), response_format='json', json_keys=['a'], name='test.many')
+    results = llm.run_many(['q1', 'q2', 'q3'], max_concurrency=1000)
+    assert sorted(result['a'] for result in results) == [1, 2, 3]
+    assert all(config['max_concurrency'] == get_limiter('openai').max_concurrency for config in llm._get_chain.configs)
+
+def test_response_cache(tmp_path):
+    llm = make_llm(FakeListChatModel(responses=['first', 'second']), name='test.cache')
+    llm.cache = ResponseCache(str(tmp_path))
+    assert llm.run('q') == 'first'
+    assert llm.run('q') == 'first'
+    assert llm.run('other') == 'second'
+    assert llm.cache.stats()['hits'] == 1
+
+def test_record_and_replay(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'mode', 'record')
+    llm = make_llm(FakeListChatModel(responses=['recorded']), name='test.replay')
+    assert llm.run('q') == 'recorded'
+    monkeypatch.setattr(backend, 'mode', 'replay')
+    llm = make_llm(FakeListChatModel(responses=['live']), name='test.replay')
+    assert llm.run('q') == 'recorded'
+
+def test_history():
+    llm = make_llm(FakeListChatModel(responses=['one', 'two']), single_use=False, name='test.history')
+    llm.run('first')
+    assert llm._build_prompt('second').startswith("system: You are a helpful assistant.\nhuman: first\nassistant: one\nhuman: second")
+
+def test_streamed_calls_record_usage():
+    METRICS.reset()
+    seen = []
+    response = "Sure:\n```python\nx = 1\ny = 2\n```\nA long explanation that is never read."
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=response)]))
+    llm = make_llm(model, response_format='code', name='test.stream')
+    assert llm.run_stream('q', on_statement=lambda node, source: seen.append(source)) == "\nx = 1\ny = 2\n"
+    assert seen == ["x = 1", "y = 2"]
+    counters = METRICS.get('test.stream')
+    assert counters['calls'] == 1
+    assert counters['prompt_tokens'] > 0 and counters['completion_tokens'] > 0
+
+def test_invalid_streamed_programs_are_reissued():
+    responses = iter([AIMessage(content="```python\nx = = 1\n```"), AIMessage(content="```python\nx = 1\n```")])
+    llm = make_llm(GenericFakeChatModel(messages=responses), response_format='code', name='test.stream_retry')
+    assert llm.run_stream('q') == "\nx = 1\n"
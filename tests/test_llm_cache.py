@@ -0,0 +1,43 @@
+import os
+import time
+from tools.llm_cache import ResponseCache
+
+def test_key_ignores_argument_order():
+    assert ResponseCache.make_key(model='m', prompt='p') == ResponseCache.make_key(prompt='p', model='m')
+    assert ResponseCache.make_key(model='m', prompt='p') != ResponseCache.make_key(model='m', prompt='q')
+
+def test_get_put(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    assert cache.get('a') is None
+    cache.put('a', {'x': 1})
+    assert cache.get('a') == {'x': 1}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert ResponseCache(str(tmp_path)).get('a') == {'x': 1}
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    ## mtimes are the LRU clock, make the order explicit
+    os.utime(cache._file('a'), (time.time()-10, time.time()-10))
+    os.utime(cache._file('b'), (time.time()-20, time.time()-20))
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 2
+
+def test_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    cache.ttl = -1
+    assert cache.get('a') is None
+    assert cache.stats()['expired'] == 1 and cache.stats()['entries'] == 0
+
+def test_clear(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('a', 1)
+    cache.clear()
+    assert cache.get('a') is None and cache.stats()['entries'] == 0
@@ -0,0 +1,39 @@
+import os
+import json
+from tools.metrics import CallMetrics
+
+def test_record_and_report():
+    metrics = CallMetrics()
+    metrics.record('a', prompt_tokens=10, completion_tokens=5, latency=2.0)
+    metrics.record('a', latency=1.0, cached=True)
+    metrics.record('b', prompt_tokens=1, latency=0.5)
+    metrics.retry('a')
+    metrics.throttle('ratelimit.openai', 0.5, 3)
+
+    a = metrics.get('a')
+    assert (a['calls'], a['cached'], a['retries'], a['prompt_tokens'], a['completion_tokens']) == (2, 1, 1, 10, 5)
+    assert a['max_latency'] == 2.0
+    assert metrics.get('unknown')['calls'] == 0
+
+    report = metrics.report()
+    assert report['totals']['calls'] == 3 and report['totals']['prompt_tokens'] == 11
+    assert list(report['sites'])[0] == 'a'
+    assert report['sites']['a']['mean_latency'] == 1.5
+    assert report['sites']['ratelimit.openai']['max_queue_depth'] == 3
+
+def test_merge_sums_counters_and_keeps_maxima():
+    metrics = CallMetrics()
+    metrics.record('a', latency=1.0)
+    metrics.merge({'a': {'calls': 2, 'latency': 3.0, 'max_latency': 2.5}, 'b': {'calls': 1}})
+    a = metrics.get('a')
+    assert (a['calls'], a['latency'], a['max_latency']) == (3, 4.0, 2.5)
+    assert metrics.get('b')['calls'] == 1
+
+def test_dump(tmp_path):
+    metrics = CallMetrics()
+    metrics.dump(str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    metrics.record('a', latency=1.0)
+    metrics.dump(str(tmp_path))
+    with open(tmp_path/f'{os.getpid()}.json') as f:
+        assert json.load(f)['a']['calls'] == 1
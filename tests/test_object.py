@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+import trimesh
+from modules.sdl.scene import Scene
+
+MESHES = {
+    'table': lambda: trimesh.creation.box((2, 1, 1)),
+    'chair': lambda: trimesh.creation.cone(0.5, 1.2, sections=32),
+    'lamp': lambda: trimesh.creation.cylinder(0.2, 1.0, sections=32),
+    'stool': lambda: trimesh.creation.box((1, 1, 1)),
+}
+
+@pytest.fixture
+def make_scene(workdir):
+    ## assets are exported once and mapped from their descriptions, the retriever is never asked
+    paths = {}
+    for name, build in MESHES.items():
+        paths[name] = str(workdir/f'{name}.obj')
+        build().export(paths[name])
+
+    def make_scene():
+        scene = Scene(dims=(6, 6, 3))
+        scene.object_hash.update(paths)
+        scene.add('table', 'table', dims=(1.8, 0.9, 0.75))
+        scene.add('chair', 'chair', dims=(0.5, 0.5, 0.9))
+        scene.add('lamp', 'lamp', dims=(0.3, 0.3, 0.5))
+        scene.table.place_global(x='center', y='floor', z='center')
+        return scene
+    return make_scene
+
+def test_scaled_dims(make_scene):
+    scene = make_scene()
+    assert np.allclose(scene.table.get_whd(force=True), (1.8, 0.75, 0.9), atol=0.002)
+    assert not scene.table.ignore_overlap
+
+def test_bounds_are_cached_until_the_pose_changes(make_scene):
+    table = make_scene().table
+    aabb = table.get_aabb()
+    aabb[0, 0] = 100
+    assert table.get_aabb()[0, 0] != 100
+    assert np.allclose(table.mesh.bounds, table.get_aabb(), atol=0.002)
+
+    table.set_rotation(90)
+    extents = table.get_aabb()[1] - table.get_aabb()[0]
+    assert np.allclose(extents, (0.9, 0.75, 1.8), atol=0.002)
+    assert np.allclose(table.mesh.bounds, table.get_aabb(), atol=0.002)
+
+    ## off the quarter turns the bounds come from the vertices
+    table.set_rotation(45)
+    assert np.allclose(table.mesh.bounds, table.get_aabb(), atol=0.002)
+
+def test_copies_share_the_base_mesh(make_scene):
+    scene = make_scene()
+    copy = scene.table.copy('table2')
+    assert copy.base is scene.table.base
+    copy.set_location(1, 0.375, 1)
+    assert not np.allclose(copy.get_loc(), scene.table.get_loc())
+
+def test_displacing_a_parent_moves_its_subtree(make_scene):
+    scene = make_scene()
+    scene.lamp.place_relative('on_top_of', scene.table)
+    before = scene.lamp.get_loc()
+    scene.table.displace(-0.2, 0, 0.3)
+    assert np.allclose(scene.lamp.get_loc() - before, (-0.2, 0, 0.3), atol=0.002)
+    assert scene.lamp.get_loc()[1] >= scene.table.get_aabb()[1, 1] - 0.002
+
+def test_rigid_motion_keeps_poses_in_the_parent_frame(make_scene):
+    scene = make_scene()
+    scene.chair.place_relative('in_front_of', scene.table)
+    offset = scene.chair.get_center() - scene.table.get_center()
+    with scene.table.rigid_motion():
+        scene.table.rot = 90
+        scene.table.invalidate()
+    assert scene.chair.rot == 90
+    ## a quarter turn about y maps (x, z) to (z, -x)
+    rotated = scene.chair.get_center() - scene.table.get_center()
+    assert np.allclose(rotated, (offset[2], offset[1], -offset[0]), atol=0.002)
+
+@pytest.mark.parametrize('relation', ['in_front_of', 'left_of', 'behind_of'])
+def test_rotating_a_parent_places_its_children_again(make_scene, relation):
+    ## placed after the rotation
+    expected = make_scene()
+    expected.table.face_towards('left_wall')
+    expected.chair.place_relative(relation, expected.table)
+
+    ## placed before the rotation
+    scene = make_scene()
+    scene.chair.place_relative(relation, scene.table)
+    scene.table.face_towards('left_wall')
+    assert scene.table.rot == expected.table.rot
+    assert np.allclose(scene.chair.get_loc(), expected.chair.get_loc(), atol=0.005)
+
+def test_children_follow_rotation_and_displacement(make_scene):
+    scene = make_scene()
+    scene.chair.place_relative('in_front_of', scene.table)
+    scene.lamp.place_relative('on_top_of', scene.table)
+    scene.table.set_rotation(180)
+    scene.table.displace(0.3, 0, 0)
+
+    expected = make_scene()
+    expected.table.set_rotation(180)
+    expected.table.displace(0.3, 0, 0)
+    expected.chair.place_relative('in_front_of', expected.table)
+    assert np.allclose(scene.chair.get_loc(), expected.chair.get_loc(), atol=0.005)
+    ## the lamp stays on the table
+    table = scene.table.get_aabb()
+    lamp = scene.lamp.get_loc()
+    assert table[0, 0] <= lamp[0] <= table[1, 0] and table[0, 2] <= lamp[2] <= table[1, 2]
+
+def test_facing_objects_turn_when_their_target_moves(make_scene):
+    scene = make_scene()
+    scene.chair.place_global(x=1, y='floor', z=3)
+    scene.chair.face_towards(scene.table)
+    rot = scene.chair.rot
+    scene.table.displace(-2, 0, 0)
+    assert scene.chair.rot != rot
+    assert scene.deps.stats()['recomputes'] > 0
+
+def test_add_many_matches_add(make_scene):
+    scene = make_scene()
+    scene.add_many([('stool1', 'stool', (0.4, 0.4, 0.45)), ('chair1', 'chair'), ('stool2', 'stool')])
+    assert [obj.name for obj in scene.objects[-3:]] == ['stool1', 'chair1', 'stool2']
+    ## as with add, later objects of a description are copies sharing its mesh
+    assert scene.chair1.base is scene.chair.base and scene.stool2.base is scene.stool1.base
+    assert np.allclose(scene.stool1.get_whd(force=True), (0.4, 0.45, 0.4), atol=0.002)
+    assert np.allclose(scene.stool2.get_whd(force=True), scene.stool1.get_whd(force=True))
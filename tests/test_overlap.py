@@ -0,0 +1,48 @@
+import json
+import numpy as np
+from modules.utils.overlap import OverlapClassifier
+
+class FakeLLM:
+    def __init__(self, label):
+        self.label = label
+        self.queries = []
+
+    def run(self, query):
+        self.queries.append(query)
+        return {'ignore_overlap': self.label}
+
+def embed_by_words(texts):
+    ## descriptions sharing words are similar, enough for the neighbour vote
+    vocabulary = ['window', 'door', 'rug', 'sofa', 'chair', 'lamp', 'woven', 'jute']
+    vectors = [[float(word in text.lower()) for word in vocabulary] + [0.01] for text in texts]
+    return np.array(vectors)
+
+def test_keywords():
+    classifier = OverlapClassifier(path='missing.json')
+    assert classifier.classify_keywords("A large bay window") is True
+    assert classifier.classify_keywords("A leather armchair") is False
+    ## whole words only, and furniture with exempt parts is left to the other stages
+    assert classifier.classify_keywords("A smart speaker") is None
+    assert classifier.classify_keywords("A cabinet with mirror doors") is None
+    assert classifier.classify_keywords("A yoga mat") is None
+
+def test_neighbours_then_llm(tmp_path):
+    path = tmp_path/'labels.json'
+    classifier = OverlapClassifier(path=str(path))
+    classifier._embed = embed_by_words
+    classifier.llm = FakeLLM(True)
+
+    ## close to the seed rug, no call needed
+    assert classifier.classify_neighbours("A plush rug") is True
+    ## nothing similar enough, the LLM decides and the decision is persisted
+    assert classifier.classify("A woven jute runner") is True
+    assert classifier.llm.queries == ["A woven jute runner"]
+    with open(path) as f:
+        assert json.load(f) == {"A woven jute runner": True}
+
+    classifier.classify("A woven jute runner")
+    assert len(classifier.llm.queries) == 1
+    assert OverlapClassifier(path=str(path)).classify("A woven jute runner") is True
+
+def test_no_description():
+    assert OverlapClassifier(path='missing.json').classify(None) is False
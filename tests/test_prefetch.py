@@ -0,0 +1,36 @@
+import ast
+import json
+from modules.utils.prefetch import AssetPrefetcher
+
+class FakeRetriever:
+    def __init__(self):
+        self.descs = []
+
+    def run(self, desc):
+        self.descs.append(desc)
+        return 'assets/' + desc.replace(' ', '_') + '.glb'
+
+def test_descriptions_of_add_and_add_many(tmp_path):
+    prefetcher = AssetPrefetcher(hash_path=str(tmp_path/'object_hash.json'))
+    code = """
+scene.add('bed', 'A queen bed', dims=(1.6, 2.0, 1.0))
+scene.add(name='lamp', desc='A floor lamp')
+scene.add_many([('chair1', 'A dining chair'), ['chair2', 'A dining chair'], ('rug', desc)])
+for i in range(2):
+    scene.add(f'plant{i}', 'A tall plant')
+other.add('x', 'Not an asset')
+"""
+    descs = [prefetcher.get_descs(node) for node in ast.parse(code).body]
+    assert descs == [['A queen bed'], ['A floor lamp'], ['A dining chair', 'A dining chair'], ['A tall plant'], []]
+
+def test_retrieved_paths_are_written_to_the_object_hash(tmp_path):
+    path = tmp_path/'object_hash.json'
+    path.write_text(json.dumps({'A queen bed': 'assets/bed.glb'}))
+    prefetcher = AssetPrefetcher(hash_path=str(path))
+    retriever = FakeRetriever()
+    prefetcher._retriever = lambda: retriever
+    for node in ast.parse("scene.add('bed', 'A queen bed')\nscene.add_many([('a', 'A floor lamp'), ('b', 'A floor lamp')])").body:
+        prefetcher.visit(node)
+    prefetcher.wait()
+    assert retriever.descs == ['A floor lamp']
+    assert json.loads(path.read_text()) == {'A queen bed': 'assets/bed.glb', 'A floor lamp': 'assets/A_floor_lamp.glb'}
@@ -0,0 +1,37 @@
+from assets.llm_config import PROMPT_CONFIG
+from tools.prompt import PromptBuilder, count_tokens, truncate
+
+def test_truncate_keeps_head_or_tail():
+    text = " ".join(f"word{i}" for i in range(200))
+    assert truncate(text, None) == text
+    assert truncate(text, 10000) == text
+    head, tail = truncate(text, 10), truncate(text, 10, keep='tail')
+    assert head.startswith("word0") and head.endswith("...[truncated]...\n")
+    assert tail.endswith("word199") and tail.startswith("\n...[truncated]...")
+    assert count_tokens(head) < count_tokens(text)
+
+def test_static_content_forms_the_prefix(monkeypatch):
+    monkeypatch.setitem(PROMPT_CONFIG['budgets'], 'test', {'examples': 1000, 'errors': 5})
+    prompt = PromptBuilder('test').add_static("API").add_dynamic("query").add_examples("Examples:", ["one", "two"]).build()
+    assert prompt == "API\nExamples:\none\ntwo\nquery"
+
+def test_examples_are_dropped_from_the_least_relevant(monkeypatch):
+    examples = [name + "\n" + "x = 1\n"*20 for name in ["first", "second", "third"]]
+    budget = count_tokens("Examples:") + count_tokens(examples[0]) + count_tokens(examples[1])
+    monkeypatch.setitem(PROMPT_CONFIG['budgets'], 'test', {'examples': budget})
+    prompt = PromptBuilder('test').add_examples("Examples:", examples).build()
+    assert "first" in prompt and "second" in prompt and "third" not in prompt
+
+def test_most_relevant_example_is_kept_when_over_budget(monkeypatch):
+    monkeypatch.setitem(PROMPT_CONFIG['budgets'], 'test', {'examples': 20})
+    prompt = PromptBuilder('test').add_examples("Examples:", ["long example " * 100, "another"]).build()
+    assert "long example" in prompt and "another" not in prompt
+    assert "...[truncated]..." in prompt
+
+def test_dynamic_sections_are_trimmed(monkeypatch):
+    monkeypatch.setitem(PROMPT_CONFIG['budgets'], 'test', {'errors': 5})
+    errors = "\n".join(f"line {i}" for i in range(100))
+    prompt = PromptBuilder('test').add_dynamic(errors, section='errors', keep='tail').build()
+    assert prompt.endswith("line 99") and "line 0\n" not in prompt
+    ## sections without a budget are kept whole
+    assert PromptBuilder('test').add_dynamic(errors, section='context').build() == errors
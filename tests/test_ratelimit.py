@@ -0,0 +1,100 @@
+import time
+import threading
+import pytest
+from tools.ratelimit import RateLimiter, is_retryable
+
+class RateLimitError(Exception):
+    pass
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+def test_is_retryable():
+    assert is_retryable(RateLimitError())
+    assert is_retryable(StatusError(429)) and is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400)) and not is_retryable(ValueError())
+
+def test_burst_then_rate():
+    limiter = RateLimiter('test', rate=20.0, burst=2, max_concurrency=10)
+    start = time.monotonic()
+    for _ in range(4):
+        with limiter.slot():
+            pass
+    ## two requests from the burst, two more at 20 per second
+    assert 0.08 <= time.monotonic()-start < 1.0
+
+def test_try_acquire_does_not_wait():
+    limiter = RateLimiter('test', rate=0.001, burst=1, max_concurrency=1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    ## the slot is free again but the bucket is empty
+    assert not limiter.try_acquire()
+    assert limiter.stats()['in_flight'] == 0
+
+def test_max_concurrency():
+    limiter = RateLimiter('test', rate=1000.0, burst=100, max_concurrency=2)
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def fn():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(fn,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+def test_call_retries_retryable_errors(monkeypatch):
+    limiter = RateLimiter('test', rate=1000.0, burst=10, max_concurrency=10, max_retries=2, backoff=0.0)
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise StatusError(429)
+        return 'ok'
+    assert limiter.call(flaky) == 'ok' and len(attempts) == 3
+
+    def bad():
+        attempts.append(1)
+        raise StatusError(400)
+    attempts.clear()
+    with pytest.raises(StatusError):
+        limiter.call(bad)
+    assert len(attempts) == 1
+
+def test_call_many_takes_one_token_per_item():
+    limiter = RateLimiter('test', rate=50.0, burst=2, max_concurrency=10)
+    chunks = []
+    start = time.monotonic()
+    results = limiter.call_many(lambda items: chunks.append(list(items)) or [item*2 for item in items], list(range(6)))
+    assert results == [0, 2, 4, 6, 8, 10]
+    ## chunks never exceed the burst, the four items after it wait for their tokens
+    assert chunks == [[0, 1], [2, 3], [4, 5]]
+    assert time.monotonic()-start >= 4/50 - 0.01
+
+def test_call_many_chunks_respect_max_concurrency():
+    limiter = RateLimiter('test', rate=1000.0, burst=100, max_concurrency=4)
+    sizes = []
+    limiter.call_many(lambda items: sizes.append(len(items)) or items, list(range(10)), max_concurrency=3)
+    assert sizes == [3, 3, 3, 1]
+
+def test_call_many_retries_only_failed_items():
+    limiter = RateLimiter('test', rate=1000.0, burst=100, max_concurrency=10, max_retries=2, backoff=0.0)
+    sent = []
+    def fn(items):
+        sent.append(list(items))
+        return [RateLimitError() if item == 1 and len(sent) == 1 else item for item in items]
+    assert limiter.call_many(fn, [0, 1, 2]) == [0, 1, 2]
+    assert sent == [[0, 1, 2], [1]]
+
+    with pytest.raises(StatusError):
+        limiter.call_many(lambda items: [StatusError(400) for _ in items], [0])
@@ -0,0 +1,14 @@
+from assets.llm_config import ROUTING_CONFIG
+from tools.routing import get_tier, get_tier_config, stronger_tier
+
+def test_routes():
+    assert get_tier('checker') == 'fast'
+    assert get_tier('unrouted') == ROUTING_CONFIG['default_tier']
+    assert get_tier('checker', force_accurate=True) == ROUTING_CONFIG['force_accurate_tier']
+    assert get_tier_config('fast')['model'] == ROUTING_CONFIG['tiers']['fast']['model']
+
+def test_escalation_stops_at_the_strongest_tier():
+    assert stronger_tier('fast') == 'default'
+    assert stronger_tier('default') == 'strong'
+    assert stronger_tier('strong') == 'strong'
+    assert stronger_tier('unknown') == 'unknown'
@@ -0,0 +1,42 @@
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from tools.singleflight import SingleFlight
+
+def test_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'value': [1]}
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(flight.do, 'k', fn)
+        started.wait(5)
+        waiters = [pool.submit(flight.do, 'k', fn) for _ in range(3)]
+        while flight.stats()['coalesced'] < 3:
+            pass
+        release.set()
+        results = [leader.result()] + [waiter.result() for waiter in waiters]
+
+    assert len(calls) == 1
+    assert all(result == {'value': [1]} for result in results)
+    ## waiters get copies
+    results[1]['value'].append(2)
+    assert results[0] == {'value': [1]}
+    assert flight.stats() == {'executed': 1, 'coalesced': 3, 'in_flight': 0}
+
+def test_errors_are_shared_and_not_kept():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('k', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert flight.do('k', lambda: 1) == 1
+    assert flight.stats()['executed'] == 2
+
+def test_key_depends_on_namespace_and_request():
+    assert SingleFlight.make_key('llm', {'a': 1, 'b': 2}) == SingleFlight.make_key('llm', {'b': 2, 'a': 1})
+    assert SingleFlight.make_key('llm', {'a': 1}) != SingleFlight.make_key('embeddings', {'a': 1})
@@ -0,0 +1,208 @@
+import os
+import io
+import json
+import time
+import base64
+import hashlib
+import threading
+import numpy as np
+from assets.llm_config import BACKEND_CONFIG
+
+class Backend:
+    MODES = ['live', 'record', 'replay', 'local']
+
+    def __init__(self, mode='live', path='assets/recordings', latency_scale=0.0):
+        '''
+        Routes remote calls (LLM, embeddings, bentoml services) through one of four modes:
+        live - issue the real request.
+        record - issue the real request and store the response along with its latency.
+        replay - serve the stored responses, sleeping latency_scale times the recorded latency.
+        local - serve from a registered stand-in function, no network at all.
+        '''
+        assert mode in self.MODES, f'mode should be one of {self.MODES}'
+        self.mode = mode
+        self.path = path
+        self.latency_scale = latency_scale
+        self.stand_ins = {}
+        self.occurrences = {}
+        self.lock = threading.Lock()
+
+    def register_stand_in(self, service, fn):
+        '''
+        fn receives the request dict and returns a response in the same form as the live call.
+        '''
+        self.stand_ins[service] = fn
+
+    def make_key(self, request):
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _file(self, service, key):
+        return os.path.join(self.path, service, key + '.json')
+
+    def _load(self, service, key):
+        try:
+            with open(self._file(service, key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _record(self, service, key, request, response, latency, encode):
+        path = self._file(service, key)
+        with self.lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            entries = self._load(service, key) or []
+            entries.append({'request': request, 'response': encode(response), 'latency': latency})
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+
+    def _replay(self, service, key, decode):
+        entries = self._load(service, key)
+        if not entries:
+            raise KeyError(f"No recorded response for the {service} request {key} in {self.path}.")
+        ## identical requests replay their recordings in the order they were recorded
+        with self.lock:
+            idx = self.occurrences.get((service, key), 0)
+            self.occurrences[(service, key)] = idx + 1
+        entry = entries[idx % len(entries)]
+        return decode(entry['response']), entry['latency']*self.latency_scale
+
+    def _stand_in(self, service, request):
+        if service not in self.stand_ins:
+            raise KeyError(f"No local stand-in registered for {service}.")
+        return self.stand_ins[service](request)
+
+    def call(self, service, request, fn, encode=None, decode=None):
+        '''
+        Performs the request described by the JSON-serializable request dict. fn issues the live call.
+        encode/decode convert the response to and from its JSON form for the store.
+        '''
+        if self.mode == 'live':
+            return fn()
+        if self.mode == 'local':
+            return self._stand_in(service, request)
+
+        encode = encode or (lambda x: x)
+        decode = decode or (lambda x: x)
+        key = self.make_key(request)
+        if self.mode == 'replay':
+            response, delay = self._replay(service, key, decode)
+            if delay > 0:
+                time.sleep(delay)
+            return response
+
+        start = time.time()
+        response = fn()
+        self._record(service, key, request, response, time.time()-start, encode)
+        return response
+
+    async def acall(self, service, request, afn, encode=None, decode=None):
+        import asyncio
+        if self.mode == 'live':
+            return await afn()
+        if self.mode == 'local':
+            return self._stand_in(service, request)
+
+        encode = encode or (lambda x: x)
+        decode = decode or (lambda x: x)
+        key = self.make_key(request)
+        if self.mode == 'replay':
+            response, delay = self._replay(service, key, decode)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return response
+
+        start = time.time()
+        response = await afn()
+        self._record(service, key, request, response, time.time()-start, encode)
+        return response
+
+    def call_many(self, service, requests, fn, encode=None, decode=None):
+        '''
+        Batched variant of call. fn issues one live call for a list of requests and returns a list of responses.
+        In record mode every response is stored with the latency of the whole batch.
+        '''
+        if len(requests) == 0:
+            return []
+        if self.mode == 'live':
+            return fn(requests)
+        if self.mode in ['local', 'replay']:
+            return [self.call(service, request, None, encode=encode, decode=decode) for request in requests]
+
+        encode = encode or (lambda x: x)
+        start = time.time()
+        responses = fn(requests)
+        latency = time.time()-start
+        for request, response in zip(requests, responses):
+            self._record(service, self.make_key(request), request, response, latency, encode)
+        return responses
+
+def encode_array(x):
+    return np.asarray(x).tolist()
+
+def decode_array(x):
+    return np.array(x)
+
+def encode_image(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def decode_image(data):
+    from PIL import Image
+    return Image.open(io.BytesIO(base64.b64decode(data)))
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _unit_vector(seed_text, dim):
+    ## deterministic pseudo-random unit vector so that equal inputs map to equal embeddings
+    seed = int(hashlib.sha256(seed_text.encode('utf-8')).hexdigest()[:8], 16)
+    vec = np.random.default_rng(seed).standard_normal(dim)
+    return vec/np.linalg.norm(vec)
+
+## placeholder values for the JSON schema types of structured responses
+SCHEMA_DEFAULTS = {'number': 1.0, 'integer': 1, 'boolean': False, 'string': ''}
+
+def _llm_stand_in(request):
+    if request.get('schema'):
+        properties = request['schema'].get('properties', {})
+        return {key: SCHEMA_DEFAULTS.get(prop.get('type')) for key, prop in properties.items()}
+    if request['response_format'] == 'json':
+        return {key: None for key in (request['json_keys'] or [])}
+    if request['response_format'] == 'code':
+        return "```python\n\n```"
+    return ""
+
+def _embedding_stand_in(request):
+    dim = 3072 if 'large' in request['model'] else 1536
+    return _unit_vector(request['text'], dim).tolist()
+
+def _clip_stand_in(request):
+    return _unit_vector(str(request.get('text') or request.get('image')), 512)
+
+def _clip_rank_stand_in(request):
+    ## similarity of the stand-in embeddings of the text and the image, in the (queries x candidates) form of rank
+    similarity = _clip_stand_in({'text': request['text']}) @ _clip_stand_in({'image': request['image']})
+    return np.array([[similarity]])
+
+def _text2img_stand_in(request):
+    from PIL import Image
+    return Image.new('RGB', (512, 512), (128, 128, 128))
+
+BACKEND = Backend(
+    mode=os.environ.get('SCENEPROG_BACKEND', BACKEND_CONFIG['mode']),
+    path=BACKEND_CONFIG['path'],
+    latency_scale=BACKEND_CONFIG['latency_scale'],
+)
+BACKEND.register_stand_in('llm', _llm_stand_in)
+BACKEND.register_stand_in('agent', _llm_stand_in)
+BACKEND.register_stand_in('embeddings', _embedding_stand_in)
+BACKEND.register_stand_in('clip_text', _clip_stand_in)
+BACKEND.register_stand_in('clip_image', _clip_stand_in)
+BACKEND.register_stand_in('clip_rank', _clip_rank_stand_in)
+BACKEND.register_stand_in('text2img', _text2img_stand_in)
+BACKEND.register_stand_in('objaverse', lambda request: '**')
@@ -0,0 +1,61 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+class MicroBatcher:
+    def __init__(self, fn, max_batch=64, max_wait=0.01):
+        '''
+        Collects items submitted concurrently into batches for fn, which maps a list of items to a list of results.
+        A batch is sent once it holds max_batch items or max_wait seconds after its first item arrived.
+        '''
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item):
+        future = Future()
+        self.queue.put((item, future))
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, daemon=True)
+                self.thread.start()
+        return future
+
+    def __call__(self, item):
+        return self.submit(item).result()
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = self.fn([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {'batches': self.batches, 'items': self.items}
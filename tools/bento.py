@@ -0,0 +1,131 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from assets.llm_config import SERVICE_CONFIG
+from tools.metrics import METRICS
+from tools.ratelimit import RATE_LIMITERS
+
+## requests run here when hedging so that the caller can wait on the first one to finish
+_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+
+class LatencyHistogram:
+    BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf')]
+
+    def __init__(self, window=200):
+        '''
+        Bucketed counts of all latencies plus a sliding window of recent ones for quantiles.
+        '''
+        self.counts = [0]*len(self.BUCKETS)
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def add(self, latency):
+        with self.lock:
+            self.samples.append(latency)
+            for i, bound in enumerate(self.BUCKETS):
+                if latency <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def quantile(self, q, min_samples=1):
+        with self.lock:
+            if len(self.samples) < min_samples:
+                return None
+            samples = sorted(self.samples)
+        return samples[min(int(q*len(samples)), len(samples)-1)]
+
+    def snapshot(self):
+        with self.lock:
+            return {f"<={bound}": count for bound, count in zip(self.BUCKETS, self.counts)}
+
+class ServiceClient:
+    def __init__(self, service):
+        '''
+        Client of a bentoml service with per-endpoint deadlines, latency histograms and hedged requests.
+        SyncHTTPClients are kept per thread and deadline instead of being opened for every call.
+        Callers hold a slot of the service's rate limiter for the primary request; a hedge takes one more from the same
+        limiter and is skipped when none is free right away.
+        '''
+        config = SERVICE_CONFIG['services'][service]
+        self.service = service
+        self.url = os.environ.get(f"SCENEPROG_{service.upper()}_URL", config['url'])
+        self.endpoints = config['endpoints']
+        self.hedge_config = SERVICE_CONFIG['hedge']
+        self.histograms = {endpoint: LatencyHistogram(self.hedge_config['window']) for endpoint in self.endpoints}
+        self.local = threading.local()
+        self.limiter = RATE_LIMITERS.get(service)
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+
+    def _client(self, timeout):
+        import bentoml
+        if not hasattr(self.local, 'clients'):
+            self.local.clients = {}
+        if timeout not in self.local.clients:
+            self.local.clients[timeout] = bentoml.SyncHTTPClient(self.url, timeout=timeout)
+        return self.local.clients[timeout]
+
+    def _call_once(self, endpoint, args, kwargs):
+        start = time.time()
+        result = getattr(self._client(self.endpoints[endpoint]['timeout']), endpoint)(*args, **kwargs)
+        latency = time.time()-start
+        self.histograms[endpoint].add(latency)
+        METRICS.record(f"bento.{self.service}.{endpoint}", latency=latency)
+        return result
+
+    def call(self, endpoint, *args, **kwargs):
+        config = self.endpoints[endpoint]
+        threshold = None
+        if config['hedge']:
+            threshold = self.histograms[endpoint].quantile(self.hedge_config['quantile'], self.hedge_config['min_samples'])
+        if threshold is None:
+            return self._call_once(endpoint, args, kwargs)
+
+        deadline = time.time() + config['timeout']
+        primary = _EXECUTOR.submit(self._call_once, endpoint, args, kwargs)
+        done, _ = wait([primary], timeout=threshold)
+        if primary in done:
+            return primary.result()
+
+        ## the primary is slower than usual, race a duplicate against it if the provider has room for one more request
+        hedge = None
+        if self.limiter is None or self.limiter.try_acquire():
+            self.hedges += 1
+            hedge = _EXECUTOR.submit(self._call_once, endpoint, args, kwargs)
+            if self.limiter is not None:
+                hedge.add_done_callback(lambda _: self.limiter.release())
+        else:
+            self.hedges_skipped += 1
+        pending = [primary] if hedge is None else [primary, hedge]
+        error = None
+        while len(pending) > 0:
+            done, _ = wait(pending, timeout=max(deadline-time.time(), 0), return_when=FIRST_COMPLETED)
+            if len(done) == 0:
+                raise TimeoutError(f"{self.service}.{endpoint} did not respond within {config['timeout']}s.")
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None:
+                    self.hedge_wins += int(future is hedge)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self):
+        return {
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'hedges_skipped': self.hedges_skipped,
+            'histograms': {endpoint: histogram.snapshot() for endpoint, histogram in self.histograms.items()},
+        }
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def get_service(service):
+    with _CLIENTS_LOCK:
+        if service not in _CLIENTS:
+            _CLIENTS[service] = ServiceClient(service)
+    return _CLIENTS[service]
@@ -0,0 +1,84 @@
+import json
+import asyncio
+import threading
+import httpx
+from langchain_openai import ChatOpenAI
+
+class ClientPool:
+    def __init__(self):
+        '''
+        Process-wide registry of chat model clients keyed by (model, api_key, response_format, client options).
+        All clients share one sync HTTP connection pool. An async HTTP client is bound to the event loop it is first
+        used on, so async clients get one connection pool per running loop and are pooled per loop as well;
+        clients of loops that have been closed are dropped.
+        '''
+        self.clients = {}
+        self.async_clients = {}
+        self.lock = threading.Lock()
+        self.http_client = None
+        self.http_async_clients = {}
+        self.constructed = 0
+        self.reused = 0
+
+    def _evict_closed_loops(self):
+        for loop in [loop for loop in self.http_async_clients if loop.is_closed()]:
+            ## the transport of a closed loop cannot be closed gracefully anymore, its sockets go with it
+            del self.http_async_clients[loop]
+            self.async_clients = {key: client for key, client in self.async_clients.items() if key[0] is not loop}
+
+    def get(self, model, api_key, response_format_config, asynchronous=False, **options):
+        '''
+        options are passed on to ChatOpenAI (e.g. timeout, max_tokens).
+        With asynchronous=True the client is meant for the event loop running in the calling thread.
+        '''
+        key = (model, api_key, json.dumps(response_format_config, sort_keys=True), json.dumps(options, sort_keys=True))
+        loop = asyncio.get_running_loop() if asynchronous else None
+        with self.lock:
+            clients = self.clients
+            if asynchronous:
+                self._evict_closed_loops()
+                clients = self.async_clients
+                key = (loop,) + key
+            if key in clients:
+                self.reused += 1
+                return clients[key]
+
+            if self.http_client is None:
+                self.http_client = httpx.Client()
+            http_options = {'http_client': self.http_client}
+            if asynchronous:
+                if loop not in self.http_async_clients:
+                    self.http_async_clients[loop] = httpx.AsyncClient()
+                http_options['http_async_client'] = self.http_async_clients[loop]
+
+            client = ChatOpenAI(
+                model=model,
+                api_key=api_key,
+                model_kwargs={"response_format": response_format_config},
+                ## streamed responses report token usage in their last chunk only when asked to
+                stream_usage=True,
+                ## retries are handled by the rate limiter in tools.ratelimit
+                max_retries=0,
+                **http_options,
+                **options,
+            )
+            clients[key] = client
+            self.constructed += 1
+            return client
+
+    def stats(self):
+        return {'constructed': self.constructed, 'reused': self.reused, 'clients': len(self.clients), 'async_clients': len(self.async_clients), 'loops': len(self.http_async_clients)}
+
+    def clear(self):
+        with self.lock:
+            self.clients = {}
+            self.async_clients = {}
+            if self.http_client is not None:
+                self.http_client.close()
+            self.http_client = None
+            self.http_async_clients = {}
+
+CLIENT_POOL = ClientPool()
+
+def get_chat_model(model, api_key, response_format_config, asynchronous=False, **options):
+    return CLIENT_POOL.get(model, api_key, response_format_config, asynchronous=asynchronous, **options)
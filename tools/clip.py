@@ -1,41 +1,52 @@
-import bentoml
 from pathlib import Path
 import numpy as np
+from tools.backend import BACKEND, encode_array, decode_array, file_digest
+from tools.ratelimit import get_limiter
+from tools.bento import get_service
+
+def _encode_image(image_path):
+    result = get_service('clip').call('encode_image',
+        items=[
+            Path(image_path),
+        ],
+    )
+    return result[0]
+
+def _encode_text(text):
+    result = get_service('clip').call('encode_text',
+        items=[
+            text,
+        ],
+    )
+    return result[0]
 
 def clip_image_embedding(image_path):
-    # with bentoml.SyncHTTPClient("http://localhost:3000") as client:
-    with bentoml.SyncHTTPClient("http://chetak.ucsd.edu:3002") as client:
-        result = client.encode_image(
-            items=[
-                Path(image_path),
-            ],
-        )
-    result = result[0]
+    request = {'image': file_digest(image_path)}
+    result = BACKEND.call('clip_image', request, lambda: get_limiter('clip').call(lambda: _encode_image(image_path)), encode=encode_array, decode=decode_array)
     result = result / np.linalg.norm(result)
     return result    
 
 def clip_text_embedding(text):
-    with bentoml.SyncHTTPClient("http://chetak.ucsd.edu:3002") as client:
-        result = client.encode_text(
-            items=[
-                text,
-            ],
-        )
-    result = result[0]
+    request = {'text': text}
+    result = BACKEND.call('clip_text', request, lambda: get_limiter('clip').call(lambda: _encode_text(text)), encode=encode_array, decode=decode_array)
     result = result / np.linalg.norm(result)
     
     return result    
 
+def _rank(text, image_path):
+    result = get_service('clip').call('rank',
+        queries=[
+            Path(image_path),
+        ],
+        candidates=[
+            text,
+        ],
+    )
+    return result
+
 def cosine_similarity(text, image_path):
-    with bentoml.SyncHTTPClient("http://chetak.ucsd.edu:3002") as client:
-        result = client.rank(
-            queries=[
-                Path(image_path),
-            ],
-            candidates=[
-                text,
-            ],
-        )
+    request = {'text': text, 'image': file_digest(image_path)}
+    result = BACKEND.call('clip_rank', request, lambda: get_limiter('clip').call(lambda: _rank(text, image_path)), encode=encode_array, decode=decode_array)
     # result = result[0]
     # result = result / np.linalg.norm(result)
     
@@ -0,0 +1,132 @@
+import io
+import ast
+import tokenize
+
+## lines at column 0 that continue the previous statement rather than starting a new one
+CONTINUATIONS = ('else', 'elif', 'except', 'finally', 'case', ')', ']', '}', '#')
+
+class CodeSyntaxError(Exception):
+    def __init__(self, error, code):
+        super().__init__(f"{error.msg} (line {error.lineno})")
+        self.error = error
+        self.code = code
+
+class CodeFenceError(Exception):
+    pass
+
+class CodeStream:
+    def __init__(self, on_statement=None, fence="```python"):
+        '''
+        Incrementally parses a code response in Markdown format as its tokens arrive.
+        Complete top-level statements are handed to on_statement(node, source) as soon as the next statement starts,
+        a syntax error raises CodeSyntaxError without waiting for the rest of the response.
+        '''
+        self.on_statement = on_statement
+        self.fence = fence
+        self.text = ""
+        self.start = None
+        self.committed = 0
+        self.scanned = 0
+        self.done = False
+        self.terminated = False
+        self.statements = []
+
+    @property
+    def code(self):
+        if self.start is None:
+            return ""
+        code = self.text[self.start:]
+        end = code.find("```")
+        return code if end == -1 else code[:end]
+
+    def feed(self, chunk):
+        '''
+        Consumes a chunk of the response, returns True once the closing fence has been seen.
+        '''
+        if self.done:
+            return True
+        self.text += chunk
+        if self.start is None:
+            idx = self.text.find(self.fence)
+            if idx == -1:
+                return False
+            self.start = idx + len(self.fence)
+            self.committed = self.scanned = self.start
+
+        code = self.text[self.start:]
+        end = code.find("```", self.scanned - self.start)
+        if end != -1:
+            self.terminated = True
+            self.close()
+            return True
+
+        ## only complete lines are considered
+        while True:
+            newline = self.text.find("\n", self.scanned)
+            if newline == -1:
+                break
+            line = self.text[self.scanned:newline]
+            if self._starts_statement(line):
+                self._commit(self.scanned)
+            self.scanned = newline + 1
+        return False
+
+    def close(self):
+        '''
+        Parses whatever is left once the response is complete.
+        '''
+        if self.done:
+            return
+        self.done = True
+        if self.start is None:
+            return
+        code = self.code
+        pending = code[self.committed - self.start:]
+        self._parse(pending, offset=code[:self.committed - self.start].count("\n"), final=True)
+
+    def check(self):
+        '''
+        Raises CodeFenceError unless the response contained a complete code block.
+        '''
+        if self.start is None:
+            raise CodeFenceError(f"the response has no {self.fence} block")
+        if not self.terminated:
+            raise CodeFenceError(f"the {self.fence} block of the response is not terminated")
+
+    def _starts_statement(self, line):
+        if len(line.strip()) == 0 or line[0] in ' \t':
+            return False
+        return not line.startswith(CONTINUATIONS)
+
+    def _commit(self, upto):
+        pending = self.text[self.committed:upto]
+        if len(pending.strip()) == 0 or pending.strip().split("\n")[-1].startswith('@'):
+            ## a decorator belongs to the definition that follows it
+            return
+        offset = self.text[self.start:self.committed].count("\n")
+        if self._parse(pending, offset):
+            self.committed = upto
+
+    def _parse(self, pending, offset, final=False):
+        try:
+            module = ast.parse(pending)
+        except SyntaxError as e:
+            if not final and self._incomplete(pending):
+                return False
+            e.lineno = (e.lineno or 0) + offset
+            raise CodeSyntaxError(e, self.code)
+        for node in module.body:
+            source = ast.get_source_segment(pending, node)
+            self.statements.append(source)
+            if self.on_statement:
+                self.on_statement(node, source)
+        return True
+
+    def _incomplete(self, pending):
+        ## open brackets, strings or line continuations mean the statement has not finished yet
+        try:
+            for _ in tokenize.generate_tokens(io.StringIO(pending).readline):
+                pass
+        except tokenize.TokenError:
+            return True
+        return pending.rstrip().endswith('\\')
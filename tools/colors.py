@@ -0,0 +1,144 @@
+import re
+import difflib
+
+## CSS/X11 named colors plus a few names common in interior design
+NAMED_COLORS = {
+    'aliceblue': (240, 248, 255), 'antiquewhite': (250, 235, 215), 'aqua': (0, 255, 255), 'aquamarine': (127, 255, 212),
+    'azure': (240, 255, 255), 'beige': (245, 245, 220), 'bisque': (255, 228, 196), 'black': (0, 0, 0),
+    'blanchedalmond': (255, 235, 205), 'blue': (0, 0, 255), 'blueviolet': (138, 43, 226), 'brown': (165, 42, 42),
+    'burlywood': (222, 184, 135), 'cadetblue': (95, 158, 160), 'chartreuse': (127, 255, 0), 'chocolate': (210, 105, 30),
+    'coral': (255, 127, 80), 'cornflowerblue': (100, 149, 237), 'cornsilk': (255, 248, 220), 'crimson': (220, 20, 60),
+    'cyan': (0, 255, 255), 'darkblue': (0, 0, 139), 'darkcyan': (0, 139, 139), 'darkgoldenrod': (184, 134, 11),
+    'darkgray': (169, 169, 169), 'darkgreen': (0, 100, 0), 'darkkhaki': (189, 183, 107), 'darkmagenta': (139, 0, 139),
+    'darkolivegreen': (85, 107, 47), 'darkorange': (255, 140, 0), 'darkorchid': (153, 50, 204), 'darkred': (139, 0, 0),
+    'darksalmon': (233, 150, 122), 'darkseagreen': (143, 188, 143), 'darkslateblue': (72, 61, 139), 'darkslategray': (47, 79, 79),
+    'darkturquoise': (0, 206, 209), 'darkviolet': (148, 0, 211), 'deeppink': (255, 20, 147), 'deepskyblue': (0, 191, 255),
+    'dimgray': (105, 105, 105), 'dodgerblue': (30, 144, 255), 'firebrick': (178, 34, 34), 'floralwhite': (255, 250, 240),
+    'forestgreen': (34, 139, 34), 'fuchsia': (255, 0, 255), 'gainsboro': (220, 220, 220), 'ghostwhite': (248, 248, 255),
+    'gold': (255, 215, 0), 'goldenrod': (218, 165, 32), 'gray': (128, 128, 128), 'green': (0, 128, 0),
+    'greenyellow': (173, 255, 47), 'honeydew': (240, 255, 240), 'hotpink': (255, 105, 180), 'indianred': (205, 92, 92),
+    'indigo': (75, 0, 130), 'ivory': (255, 255, 240), 'khaki': (240, 230, 140), 'lavender': (230, 230, 250),
+    'lavenderblush': (255, 240, 245), 'lawngreen': (124, 252, 0), 'lemonchiffon': (255, 250, 205), 'lightblue': (173, 216, 230),
+    'lightcoral': (240, 128, 128), 'lightcyan': (224, 255, 255), 'lightgoldenrodyellow': (250, 250, 210), 'lightgray': (211, 211, 211),
+    'lightgreen': (144, 238, 144), 'lightpink': (255, 182, 193), 'lightsalmon': (255, 160, 122), 'lightseagreen': (32, 178, 170),
+    'lightskyblue': (135, 206, 250), 'lightslategray': (119, 136, 153), 'lightsteelblue': (176, 196, 222), 'lightyellow': (255, 255, 224),
+    'lime': (0, 255, 0), 'limegreen': (50, 205, 50), 'linen': (250, 240, 230), 'magenta': (255, 0, 255),
+    'maroon': (128, 0, 0), 'mediumaquamarine': (102, 205, 170), 'mediumblue': (0, 0, 205), 'mediumorchid': (186, 85, 211),
+    'mediumpurple': (147, 112, 219), 'mediumseagreen': (60, 179, 113), 'mediumslateblue': (123, 104, 238), 'mediumspringgreen': (0, 250, 154),
+    'mediumturquoise': (72, 209, 204), 'mediumvioletred': (199, 21, 133), 'midnightblue': (25, 25, 112), 'mintcream': (245, 255, 250),
+    'mistyrose': (255, 228, 225), 'moccasin': (255, 228, 181), 'navajowhite': (255, 222, 173), 'navy': (0, 0, 128),
+    'oldlace': (253, 245, 230), 'olive': (128, 128, 0), 'olivedrab': (107, 142, 35), 'orange': (255, 165, 0),
+    'orangered': (255, 69, 0), 'orchid': (218, 112, 214), 'palegoldenrod': (238, 232, 170), 'palegreen': (152, 251, 152),
+    'paleturquoise': (175, 238, 238), 'palevioletred': (219, 112, 147), 'papayawhip': (255, 239, 213), 'peachpuff': (255, 218, 185),
+    'peru': (205, 133, 63), 'pink': (255, 192, 203), 'plum': (221, 160, 221), 'powderblue': (176, 224, 230),
+    'purple': (128, 0, 128), 'rebeccapurple': (102, 51, 153), 'red': (255, 0, 0), 'rosybrown': (188, 143, 143),
+    'royalblue': (65, 105, 225), 'saddlebrown': (139, 69, 19), 'salmon': (250, 128, 114), 'sandybrown': (244, 164, 96),
+    'seagreen': (46, 139, 87), 'seashell': (255, 245, 238), 'sienna': (160, 82, 45), 'silver': (192, 192, 192),
+    'skyblue': (135, 206, 235), 'slateblue': (106, 90, 205), 'slategray': (112, 128, 144), 'snow': (255, 250, 250),
+    'springgreen': (0, 255, 127), 'steelblue': (70, 130, 180), 'tan': (210, 180, 140), 'teal': (0, 128, 128),
+    'thistle': (216, 191, 216), 'tomato': (255, 99, 71), 'turquoise': (64, 224, 208), 'violet': (238, 130, 238),
+    'wheat': (245, 222, 179), 'white': (255, 255, 255), 'whitesmoke': (245, 245, 245), 'yellow': (255, 255, 0),
+    'yellowgreen': (154, 205, 50),
+    'cream': (255, 253, 208), 'offwhite': (250, 249, 246), 'eggshell': (240, 234, 214), 'charcoal': (54, 69, 79),
+    'taupe': (72, 60, 50), 'greige': (190, 182, 170), 'sage': (178, 172, 136), 'terracotta': (226, 114, 91),
+    'mustard': (255, 219, 88), 'mint': (189, 252, 201), 'blush': (222, 93, 131), 'sand': (194, 178, 128),
+    'stone': (173, 165, 135), 'slate': (112, 128, 144), 'emerald': (80, 200, 120), 'burgundy': (128, 0, 32),
+    'peach': (255, 229, 180), 'lilac': (200, 162, 200), 'mauve': (224, 176, 255), 'ochre': (204, 119, 34),
+    'walnut': (119, 63, 26), 'oak': (196, 160, 110),
+    ## CSS spells every gray with grey as well
+    'grey': (128, 128, 128), 'darkgrey': (169, 169, 169), 'darkslategrey': (47, 79, 79), 'dimgrey': (105, 105, 105),
+    'lightgrey': (211, 211, 211), 'lightslategrey': (119, 136, 153), 'slategrey': (112, 128, 144),
+}
+
+## modifier -> (target, weight) the color is blended towards
+MODIFIERS = {
+    'light': ('white', 0.4), 'pale': ('white', 0.5), 'pastel': ('white', 0.5), 'soft': ('white', 0.25),
+    'dark': ('black', 0.4), 'deep': ('black', 0.3),
+    'muted': ('gray', 0.35), 'dusty': ('gray', 0.3), 'warm': ('orange', 0.1), 'cool': ('blue', 0.1),
+}
+
+## basic hue names, in a compound such as "sage green" or "cream white" they only qualify the more specific name
+BASIC_COLORS = {'red', 'green', 'blue', 'yellow', 'orange', 'purple', 'violet', 'pink', 'brown', 'black', 'white', 'gray', 'grey'}
+
+## words carrying no color information
+FILLERS = {'a', 'an', 'the', 'color', 'colour', 'colored', 'coloured', 'paint', 'painted', 'shade', 'of', 'and', 'with', 'tone', 'toned', 'ish', 'wall', 'walls'}
+
+## misspellings are only corrected for longer words, short everyday words are too close to short color names ("stand" - sand)
+FUZZY_CUTOFF = 0.9
+FUZZY_MIN_LENGTH = 5
+
+def _blend(color, target, weight):
+    return tuple((1-weight)*c + weight*t for c, t in zip(color, target))
+
+def _match(word):
+    if word in NAMED_COLORS:
+        return NAMED_COLORS[word]
+    if word.endswith('ish'):
+        ## bluish, greenish, reddish
+        for stem in [word[:-3], word[:-3]+'e', word[:-4]]:
+            if stem in NAMED_COLORS:
+                return NAMED_COLORS[stem]
+    if len(word) < FUZZY_MIN_LENGTH:
+        return None
+    matches = difflib.get_close_matches(word, NAMED_COLORS.keys(), n=1, cutoff=FUZZY_CUTOFF)
+    return NAMED_COLORS[matches[0]] if matches else None
+
+def _is_basic(name):
+    if name.endswith('ish'):
+        return any(stem in BASIC_COLORS for stem in [name[:-3], name[:-3]+'e', name[:-4]])
+    return name in BASIC_COLORS
+
+def parse_color(phrase):
+    '''
+    Resolves a color phrase such as "soft sage green" or "cream white" to an (R, G, B) tuple without any network call.
+    Adjacent words are first matched as compound names (e.g. "sky blue" -> skyblue). Of the remaining color words the
+    specific names win over basic hues ("sage green" -> sage), which are only averaged when nothing more specific is
+    given ("blue green"); the modifiers are applied on top. Returns None when any word is not recognised, a name such as
+    "baby blue" is left to the LLM rather than resolved to its hue.
+    '''
+    words = [w for w in re.findall(r"[a-z]+", phrase.lower().replace('-ish', '')) if w not in FILLERS]
+    if len(words) > 0 and ''.join(words) in NAMED_COLORS:
+        return NAMED_COLORS[''.join(words)]
+
+    modifiers = [w for w in words if w in MODIFIERS]
+    words = [w for w in words if w not in MODIFIERS]
+    colors = []
+    i = 0
+    while i < len(words):
+        ## longest compound name starting at word i
+        for j in range(len(words), i, -1):
+            name = ''.join(words[i:j])
+            if name in NAMED_COLORS or (j == i+1 and _match(name) is not None):
+                colors.append((name, _match(name)))
+                i = j
+                break
+        else:
+            return None
+
+    if len(colors) == 0:
+        return None
+    specific = [c for name, c in colors if not _is_basic(name)]
+    colors = specific if len(specific) > 0 else [c for _, c in colors]
+    color = tuple(sum(c[k] for c in colors)/len(colors) for k in range(3))
+    for modifier in modifiers:
+        target, weight = MODIFIERS[modifier]
+        color = _blend(color, NAMED_COLORS[target], weight)
+    return tuple(int(round(c)) for c in color)
+
+def resolve_color(phrase, cache=None, use_llm=True, default=(255, 255, 255)):
+    '''
+    Returns the (R, G, B) values of a color phrase. Unrecognised phrases go to the LLM when use_llm is set,
+    otherwise they resolve to default. cache is a dict (e.g. scene.colors) holding resolved phrases.
+    '''
+    if cache is not None and phrase in cache:
+        return cache[phrase]
+    color = parse_color(phrase)
+    if color is None and use_llm:
+        from tools.llm import LLM
+        result = LLM(system_desc="Given a color description, your task is to return the RGB values of the color in the format (R, G, B) as a JSON object. Example: 'red' -> 'R': 255, 'G': 0, 'B': 0", response_format="json", json_keys=['R','G','B'], name="wall_color").run(phrase)
+        color = (int(result['R']), int(result['G']), int(result['B']))
+    if color is None:
+        color = default
+    if cache is not None:
+        cache[phrase] = color
+    return color
@@ -3,12 +3,65 @@ import json
 from tqdm import tqdm 
 import random
 import os
-from langchain_openai import OpenAIEmbeddings
-from assets.llm_config import LLM_CONFIG    
+from tools.embeddings import Embeddings
 import numpy as np
 import trimesh
 
 CATEGORIES=['null','armchair', 'Lounge Chair / Cafe Chair / Office Chair', 'Pendant Lamp', 'Coffee Table', 'Corner/Side Table', 'Dining Table', 'King-size Bed', 'Nightstand', 'Bookcase / jewelry Armoire', 'Three-Seat / Multi-seat Sofa', 'TV Stand', 'Drawer Chest / Corner cabinet', 'Shelf', 'Wardrobe', 'Footstool / Sofastool / Bed End Stool / Stool', 'Sideboard / Side Cabinet / Console Table', 'Ceiling Lamp', 'Children Cabinet', 'Bed Frame', 'Round End Table', 'Desk', 'Single bed', 'Loveseat Sofa', 'Dining Chair', 'Barstool', 'Lazy Sofa', 'L-shaped Sofa', 'Wine Cabinet', 'Dressing Table', 'Dressing Chair', 'Kids Bed', 'Classic Chinese Chair', 'Bunk Bed', 'Chaise Longue Sofa', 'Lounge Chair / Book-chair / Computer Chair', 'Sideboard / Side Cabinet / Console', 'Bar', 'Three-Seat / Multi-person sofa', 'Double Bed', 'Shoe Cabinet', 'Couch Bed', 'Wine Cooler', 'Tea Table', 'Hanging Chair', 'Folding chair', 'U-shaped Sofa', 'Two-seat Sofa', 'Floor Lamp', 'Wall Lamp']
+## typical (width, depth, height) in meters of the 3D-FUTURE categories, priors for scaling objects of the category.
+## Placeholders set by hand from common furniture sizes, not statistics of the catalog: the normalized 3D-FUTURE
+## meshes carry no metric scale, so they cannot be measured from assets/cat2model.json.
+CATEGORY_DIMS={
+    'armchair': (0.85, 0.85, 0.9),
+    'Lounge Chair / Cafe Chair / Office Chair': (0.65, 0.65, 0.95),
+    'Pendant Lamp': (0.5, 0.5, 0.8),
+    'Coffee Table': (1.1, 0.6, 0.45),
+    'Corner/Side Table': (0.5, 0.5, 0.55),
+    'Dining Table': (1.6, 0.9, 0.75),
+    'King-size Bed': (2.0, 2.1, 1.2),
+    'Nightstand': (0.5, 0.4, 0.55),
+    'Bookcase / jewelry Armoire': (0.9, 0.4, 2.0),
+    'Three-Seat / Multi-seat Sofa': (2.2, 0.9, 0.85),
+    'TV Stand': (1.8, 0.45, 0.5),
+    'Drawer Chest / Corner cabinet': (0.9, 0.5, 1.1),
+    'Shelf': (1.0, 0.35, 1.8),
+    'Wardrobe': (1.2, 0.6, 2.1),
+    'Footstool / Sofastool / Bed End Stool / Stool': (0.45, 0.45, 0.45),
+    'Sideboard / Side Cabinet / Console Table': (1.6, 0.45, 0.8),
+    'Ceiling Lamp': (0.6, 0.6, 0.3),
+    'Children Cabinet': (0.8, 0.45, 1.0),
+    'Bed Frame': (1.6, 2.1, 1.0),
+    'Round End Table': (0.55, 0.55, 0.55),
+    'Desk': (1.2, 0.6, 0.75),
+    'Single bed': (1.0, 2.0, 0.9),
+    'Loveseat Sofa': (1.5, 0.85, 0.85),
+    'Dining Chair': (0.5, 0.5, 0.95),
+    'Barstool': (0.4, 0.4, 0.75),
+    'Lazy Sofa': (0.9, 0.9, 0.7),
+    'L-shaped Sofa': (2.6, 1.7, 0.85),
+    'Wine Cabinet': (1.0, 0.45, 1.9),
+    'Dressing Table': (1.0, 0.45, 0.76),
+    'Dressing Chair': (0.45, 0.45, 0.8),
+    'Kids Bed': (0.9, 1.7, 0.9),
+    'Classic Chinese Chair': (0.6, 0.5, 1.0),
+    'Bunk Bed': (1.0, 2.0, 1.7),
+    'Chaise Longue Sofa': (0.8, 1.7, 0.85),
+    'Lounge Chair / Book-chair / Computer Chair': (0.65, 0.65, 1.0),
+    'Sideboard / Side Cabinet / Console': (1.6, 0.45, 0.8),
+    'Bar': (1.8, 0.6, 1.05),
+    'Three-Seat / Multi-person sofa': (2.2, 0.9, 0.85),
+    'Double Bed': (1.6, 2.1, 1.0),
+    'Shoe Cabinet': (0.9, 0.35, 1.0),
+    'Couch Bed': (2.0, 0.95, 0.85),
+    'Wine Cooler': (0.6, 0.6, 0.85),
+    'Tea Table': (1.0, 0.6, 0.45),
+    'Hanging Chair': (1.0, 1.0, 1.9),
+    'Folding chair': (0.45, 0.5, 0.8),
+    'U-shaped Sofa': (3.0, 2.0, 0.85),
+    'Two-seat Sofa': (1.6, 0.85, 0.85),
+    'Floor Lamp': (0.4, 0.4, 1.6),
+    'Wall Lamp': (0.2, 0.2, 0.3),
+}
 FUTURE_MODEL_PATH = "/Users/kunalgupta/Documents/datasets/3D-FUTURE-model/"
 cat2num={
     'null': 100,
@@ -87,7 +140,7 @@ class AssetRetriever:
                 cat2model = json.load(file)
 
         self.cat2model = cat2model
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large", api_key=LLM_CONFIG['api_key'])
+        self.embeddings = Embeddings(model="text-embedding-3-large")
         
         if not os.path.exists('assets/embeddings.npz'):
             self.build()
@@ -103,7 +156,7 @@ class AssetRetriever:
         You should pay attention to the objects broad categery i.e. armchair, sofa, etc as well as its color - red, blue, orange, material - leather, wooded, stye - minimalist, modern. 
         A typical output should like like: {{"caption": "Chic nesting coffee tables with gold frames and white marble tops, adding a touch of luxury and versatility to any living space.", "details":True}}.
         """
-        myllm = LLM(system_desc=system_desc, image_input=True, response_format="json")
+        myllm = LLM(system_desc=system_desc, image_input=True, response_format="json", name="asset_captioner")
 
         if os.path.exists('assets/model2description.json'):
             with open('assets/model2description.json','r') as file:
@@ -161,9 +214,9 @@ class AssetRetriever:
             all_models = []
             all_ratios = []
 
-        for model, desc in tqdm(self.MODEL_TO_DESCRIPTION.items()):
-            if model in all_models:
-                continue
+        new_models = [model for model in self.MODEL_TO_DESCRIPTION if model not in all_models]
+        new_ratios = []
+        for model in tqdm(new_models):
             path = FUTURE_MODEL_PATH + model + '/normalized_model.obj'
             mesh = trimesh.load(path, process=False, force='mesh')
             
@@ -173,16 +226,17 @@ class AssetRetriever:
             height = bounds[1,1] - bounds[0,1]
             x0 = depth/width
             y0 = height/width
-            
-            emb = np.array(self.embeddings.embed_query(desc))
-            all_models.append(model)
-            if from_scratch:
-                all_ratios.append(np.array([x0, y0]))
-                all_embeddings.append(emb)
-                
-            else:
-                all_ratios = np.vstack((all_ratios, np.array([x0, y0])))
-                all_embeddings = np.vstack((all_embeddings, emb))
+            new_ratios.append(np.array([x0, y0]))
+        
+        ## the descriptions are embedded in batches rather than one request each
+        new_embeddings = [np.array(emb) for emb in self.embeddings.embed_documents([self.MODEL_TO_DESCRIPTION[model] for model in new_models])]
+        all_models += new_models
+        if from_scratch:
+            all_ratios = new_ratios
+            all_embeddings = new_embeddings
+        elif len(new_models) > 0:
+            all_ratios = np.vstack([all_ratios] + new_ratios)
+            all_embeddings = np.vstack([all_embeddings] + new_embeddings)
             
         np.savez('assets/embeddings.npz', all_embeddings=all_embeddings, all_models=all_models, all_ratios=all_ratios)
         
@@ -212,7 +266,7 @@ class AssetRetriever:
 class ScaleObj:
     def __init__(self):
         from tools.llm import LLM
-        self.llm = LLM(system_desc="You are a large language model based assistant, your job is to scale the object to the given dimensions. You only answer in the way following examples do. Anyother type of response is strictly forbidden. Return the values in meters.")
+        self.llm = LLM(system_desc="You are a large language model based assistant, your job is to scale the object to the given dimensions. You only answer in the way following examples do. Anyother type of response is strictly forbidden. Return the values in meters.", name="scale_obj")
         self.reset()
         os.makedirs('tmp/', exist_ok=True)
         
@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import fcntl
+import hashlib
+import threading
+import unicodedata
+import numpy as np
+from assets.llm_config import EMBEDDING_CONFIG
+
+def normalize_text(text):
+    ## whitespace and unicode normalization only, casing changes the embedding
+    return re.sub(r"\s+", " ", unicodedata.normalize('NFC', text)).strip()
+
+class EmbeddingCache:
+    def __init__(self, path, model, max_entries=20000, float16=True):
+        '''
+        Persistent store of the embeddings of one model, keyed by a hash of the normalized text.
+        Vectors live in a memory-mapped (max_entries x dim) .npy file, index.json maps keys to rows and the
+        last-used clock; when full, the least recently used row is overwritten. keys.npy holds the key each row
+        was written for, reads check it so that a row rewritten by another process is never served for the old key.
+        Writes from several processes are serialized with a file lock.
+        '''
+        self.path = os.path.join(path, re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+        self.model = model
+        self.max_entries = max_entries
+        self.dtype = np.float16 if float16 else np.float32
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self.vectors_file = os.path.join(self.path, 'vectors.npy')
+        self.index_file = os.path.join(self.path, 'index.json')
+        self.keys_file = os.path.join(self.path, 'keys.npy')
+        self.lock_file = os.path.join(self.path, '.lock')
+
+        self.vectors = None
+        self.row_keys = None
+        self.index = {}
+        self.clock = 0
+        self.index_mtime = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._refresh()
+
+    @staticmethod
+    def make_key(text):
+        return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+    def _refresh(self):
+        ## picks up rows written by other processes
+        try:
+            mtime = os.path.getmtime(self.index_file)
+        except OSError:
+            return
+        if mtime == self.index_mtime:
+            return
+        with open(self.index_file, 'r') as f:
+            data = json.load(f)
+        for key, entry in data['entries'].items():
+            ## keep the more recent use of entries this process has read meanwhile
+            if key in self.index and self.index[key]['row'] == entry['row']:
+                entry['used'] = max(entry['used'], self.index[key]['used'])
+        self.index = data['entries']
+        self.clock = max(self.clock, data['clock'])
+        self.index_mtime = mtime
+        if self.vectors is None and os.path.exists(self.vectors_file):
+            self.vectors = np.load(self.vectors_file, mmap_mode='r+')
+        if self.row_keys is None and os.path.exists(self.keys_file):
+            self.row_keys = np.load(self.keys_file, mmap_mode='r+')
+
+    def _save_index(self):
+        tmp_path = f"{self.index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'entries': self.index, 'clock': self.clock}, f)
+        os.replace(tmp_path, self.index_file)
+        self.index_mtime = os.path.getmtime(self.index_file)
+
+    def get(self, text):
+        '''
+        Returns the cached embedding as a list of floats or None on a miss.
+        '''
+        key = self.make_key(text)
+        with self.lock:
+            ## other processes may have evicted the entry or reused its row since the index was read
+            self._refresh()
+            entry = self.index.get(key)
+            if entry is None or self.vectors is None or not self._owns(entry['row'], key):
+                self.misses += 1
+                return None
+            self.clock += 1
+            entry['used'] = self.clock
+            self.hits += 1
+            return self.vectors[entry['row']].astype(np.float32).tolist()
+
+    def _owns(self, row, key):
+        return self.row_keys is not None and bytes(self.row_keys[row]) == bytes.fromhex(key)
+
+    def put(self, text, vector):
+        self.put_many([text], [vector])
+
+    def put_many(self, texts, vectors):
+        '''
+        Stores several embeddings with a single index write.
+        '''
+        if len(texts) == 0:
+            return
+        with self.lock, open(self.lock_file, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._refresh()
+            if self.vectors is None:
+                self.vectors = np.lib.format.open_memmap(self.vectors_file, mode='w+', dtype=self.dtype, shape=(self.max_entries, len(vectors[0])))
+            if self.row_keys is None:
+                ## caches written before the row keys existed get them from their index
+                self.row_keys = np.lib.format.open_memmap(self.keys_file, mode='w+', dtype=np.uint8, shape=(self.max_entries, 32))
+                for key, entry in self.index.items():
+                    self.row_keys[entry['row']] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(text)
+                if key in self.index:
+                    row = self.index[key]['row']
+                elif len(self.index) < self.max_entries:
+                    row = len(self.index)
+                else:
+                    ## reuse the row of the least recently used entry
+                    evicted = min(self.index, key=lambda k: self.index[k]['used'])
+                    row = self.index.pop(evicted)['row']
+                    self.evictions += 1
+                self.vectors[row] = np.asarray(vector, dtype=self.dtype)
+                self.row_keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                self.clock += 1
+                self.index[key] = {'row': row, 'used': self.clock}
+            self.vectors.flush()
+            self.row_keys.flush()
+            self._save_index()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits/total if total > 0 else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.index),
+        }
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_embedding_cache(model):
+    '''
+    Returns the process-wide embedding cache of a model configured by EMBEDDING_CONFIG['cache'], or None if disabled.
+    '''
+    config = EMBEDDING_CONFIG['cache']
+    if not config['enabled']:
+        return None
+    with _CACHES_LOCK:
+        if model not in _CACHES:
+            _CACHES[model] = EmbeddingCache(config['path'], model, max_entries=config['max_entries'], float16=config['float16'])
+    return _CACHES[model]
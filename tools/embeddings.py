@@ -0,0 +1,56 @@
+import threading
+from langchain_core.embeddings import Embeddings as BaseEmbeddings
+from langchain_openai import OpenAIEmbeddings
+from assets.llm_config import LLM_CONFIG, EMBEDDING_CONFIG
+from tools.backend import BACKEND
+from tools.ratelimit import get_limiter
+from tools.singleflight import SINGLEFLIGHT
+from tools.batching import MicroBatcher
+from tools.embedding_cache import get_embedding_cache
+
+## one batcher per model, shared by all Embeddings instances
+_BATCHERS = {}
+_BATCHERS_LOCK = threading.Lock()
+
+class Embeddings(BaseEmbeddings):
+    def __init__(self, model="text-embedding-ada-002"):
+        '''
+        OpenAI embeddings routed through the record/replay backend. Drop-in replacement for OpenAIEmbeddings.
+        Concurrent embed_query calls are micro-batched into embed_documents requests and every text is looked up
+        in the persistent embedding cache first.
+        '''
+        self.model = model
+        self.client = OpenAIEmbeddings(model=model, api_key=LLM_CONFIG['api_key'], max_retries=0)
+        self.limiter = get_limiter('openai_embeddings')
+        with _BATCHERS_LOCK:
+            if model not in _BATCHERS:
+                _BATCHERS[model] = MicroBatcher(self._embed_batch, EMBEDDING_CONFIG['max_batch'], EMBEDDING_CONFIG['max_wait'])
+            self.batcher = _BATCHERS[model]
+        ## stand-in and replayed vectors never enter the cache
+        self.cache = get_embedding_cache(model) if BACKEND.mode in ['live', 'record'] else None
+
+    def _embed_batch(self, texts):
+        return self.limiter.call(lambda: self.client.embed_documents(texts))
+
+    def embed_query(self, text):
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+        request = {'model': self.model, 'text': text}
+        call = lambda: BACKEND.call('embeddings', request, lambda: self.batcher(text))
+        result = SINGLEFLIGHT.do(SINGLEFLIGHT.make_key('embeddings', request), call)
+        if self.cache is not None:
+            self.cache.put(text, result)
+        return result
+
+    def embed_documents(self, texts):
+        results = [self.cache.get(text) if self.cache is not None else None for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+        requests = [{'model': self.model, 'text': texts[i]} for i in missing]
+        embeddings = BACKEND.call_many('embeddings', requests, lambda requests: self._embed_batch([r['text'] for r in requests]))
+        for i, embedding in zip(missing, embeddings):
+            results[i] = embedding
+        if self.cache is not None:
+            self.cache.put_many([texts[i] for i in missing], embeddings)
+        return results
@@ -1,7 +1,18 @@
-from langchain_openai import ChatOpenAI
+import time
+import asyncio
+import hashlib
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 from langchain_core.output_parsers import StrOutputParser, SimpleJsonOutputParser
-from assets.llm_config import LLM_CONFIG 
+from assets.llm_config import LLM_CONFIG, CACHE_CONFIG, RETRY_CONFIG
+from tools.llm_cache import ResponseCache, get_response_cache
+from tools.client_pool import get_chat_model
+from tools.routing import get_tier, get_tier_config, stronger_tier
+from tools.backend import BACKEND
+from tools.metrics import METRICS
+from tools.ratelimit import get_limiter
+from tools.singleflight import SINGLEFLIGHT
+from tools.codestream import CodeStream, CodeSyntaxError, CodeFenceError
+from tools.prompt import count_tokens
 
 class LLM:
     def __init__(self, single_use=True, 
@@ -12,27 +23,35 @@ class LLM:
                  image_detail='low',
                  json_keys=None,
                  num_images=1,
+                 use_cache=None,
+                 name="llm",
+                 schema=None,
                  ):
         
+        self.name = name
+        self.schema = schema
+        if schema is not None:
+            ## structured output, json_keys default to the fields of the schema
+            response_format = "json"
+            json_keys = json_keys or list(schema.model_fields)
         self.response_format = response_format
         self.image_detail=image_detail
         self.image_input=image_input
         self.json_keys = json_keys
         self.num_images = num_images    
         
-        # Configure the response format
-        if self.response_format == "json":
+        # Configure the response format, schemas are enforced through tool calling instead
+        if self.schema is not None:
+            self.response_format_config = {"type": "text"}
+        elif self.response_format == "json":
             self.response_format_config = {"type": "json_object"}
         else:
             self.response_format_config = {"type": "text"}
         
-        # Initialize the model with the given configuration
-        self.model = ChatOpenAI(
-            model=LLM_CONFIG['model'] if not force_accurate else "gpt-4o",
-            api_key=LLM_CONFIG['api_key'],
-            model_kwargs={"response_format": self.response_format_config},
-            # seed=LLM_CONFIG['seed']
-        )
+        # Initialize the model of the tier the call site is routed to
+        self.tier = get_tier(name, force_accurate)
+        self.model_name = get_tier_config(self.tier)['model']
+        self.model = self._get_model(self.tier)
         
         # Initial system message and prompt template
         self.system_desc = system_desc or "You are a helpful assistant."
@@ -50,6 +69,11 @@ class LLM:
         self.single_use = single_use
         self.history = []
         self.reset()
+        
+        # Optional on-disk response cache shared by all LLM instances
+        if use_cache is None:
+            use_cache = CACHE_CONFIG['enabled']
+        self.cache = get_response_cache() if use_cache else None
 
     def _sanitize_output(self, text: str):
         _, after = text.split("```python")
@@ -59,68 +83,375 @@ class LLM:
         """Resets the chat history, retaining the system description."""
         self.history = [{"role": "system", "content": self.system_desc}]
     
-    def _get_prompt_with_history(self):
+    def _get_prompt_with_history(self, history=None):
         """Constructs the full prompt including chat history."""
-        return "".join([f"{msg['role']}: {msg['content']}\n" for msg in self.history])
-    
-    def run(self, query, image_paths=None):
-        """Generates a response from the model based on the query and history."""
-        # Append the user query to the history
-        self.history.append({"role": "human", "content": query})
-        
+        history = self.history if history is None else history
+        return "".join([f"{msg['role']}: {msg['content']}\n" for msg in history])
+
+    def _build_prompt(self, query):
         # Prepare the full prompt with chat history
-        full_prompt = self._get_prompt_with_history()
-        
-        # Define the chain based on the response format
-        if self.response_format == "json":
-            chain = self.prompt_template | self.model | SimpleJsonOutputParser()
-        else:
-            chain = self.prompt_template | self.model | StrOutputParser()
-        
+        full_prompt = self._get_prompt_with_history(self.history + [{"role": "human", "content": query}])
         if self.response_format == "code":
             full_prompt += """Return only python code in Markdown format, e.g.:
 ```python
 ....
 ```"""
-        # Invoke the model and get the response
-        if self.image_input:
-            assert len(image_paths) == self.num_images, f"Number of images should be {self.num_images}."
-            result = self.invoke_image_prompt_template(chain, full_prompt, image_paths)
+        return full_prompt
+
+    def _get_model(self, tier, asynchronous=False):
+        config = get_tier_config(tier)
+        options = {key: config[key] for key in ['timeout', 'max_tokens'] if config.get(key) is not None}
+        return get_chat_model(config['model'], LLM_CONFIG['api_key'], self.response_format_config, asynchronous=asynchronous, **options)
+
+    def _get_chain(self, tier=None, asynchronous=False):
+        ## async clients are bound to the running event loop, they are looked up on every call
+        if asynchronous:
+            model = self._get_model(self.tier if tier is None else tier, asynchronous=True)
         else:
-            result = chain.invoke({"input": full_prompt})
-        
+            model = self.model if tier is None or tier == self.tier else self._get_model(tier)
+        if self.schema is not None:
+            return self.prompt_template | model.with_structured_output(self.schema, include_raw=True)
+        return self.prompt_template | model
+
+    def _get_parser(self):
+        # Define the parser based on the response format
+        if self.response_format == "json":
+            return SimpleJsonOutputParser()
+        return StrOutputParser()
+
+    def _parse(self, output):
+        """Splits a chain output into the raw message (for metrics) and the parsed result."""
+        if self.schema is None:
+            return output, self._get_parser().invoke(output)
+        message = output['raw']
+        if output['parsed'] is not None:
+            return message, output['parsed'].model_dump()
+        ## keep whatever was generated so that the re-ask can point out what is wrong with it
+        tool_calls = getattr(message, 'tool_calls', None)
+        return message, tool_calls[0]['args'] if tool_calls else message.content
+
+    def _record(self, start, messages, latency=None):
+        """Records tokens and latency of a call under the call-site label; no messages means no live call was made."""
+        latency = time.time()-start if latency is None else latency
+        if len(messages) == 0:
+            METRICS.record(self.name, latency=latency, cached=True)
+        for message in messages:
+            usage = getattr(message, 'usage_metadata', None) or {}
+            METRICS.record(self.name, prompt_tokens=usage.get('input_tokens', 0), completion_tokens=usage.get('output_tokens', 0), latency=latency)
+
+    def _get_inputs(self, prompt, image_paths=None):
+        if not self.image_input:
+            return {"input": prompt}
+        assert image_paths is not None and len(image_paths) == self.num_images, f"Number of images should be {self.num_images}."
+        if self.num_images < 1 or self.num_images > 4:
+            raise ValueError("Number of images should be between 1 and 4.")
+        inputs = {'input': prompt, 'detail_parameter': self.image_detail}
+        for i, path in enumerate(image_paths):
+            inputs[f'image_path{i+1}'] = path
+        return inputs
+
+    def _postprocess(self, result):
         if self.response_format == "code":
             result = self._sanitize_output(result)
+        return result
 
-        if self.response_format == "json" and self.json_keys:
-            # Check if all the keys are present in the response
-            for key in self.json_keys:
-                if key not in result:
-                    query = """ 
-                    For the query: {query}, the following response was generated: {response}. It didn't follow the expected format containing the keys: {self.json_keys}. Please ensure that the response follows the expected format and contains all the keys.
-                    """
-                    result = self.run(query, image_paths)
-            
-        # Append the model response to the history
-        self.history.append({"role": "assistant", "content": result})
-        
+    def _reask_query(self, query, result):
+        return f"""For the query: {query}, the following response was generated: {result}. It didn't follow the expected format: {'; '.join(self._errors(result))}. Please ensure that the response follows the expected format and contains all the keys: {self.json_keys}."""
+
+    def _retry_delay(self, attempt):
+        return RETRY_CONFIG['backoff']*(2**attempt)
+
+    def _check(self, result):
+        """Returns the validated result, raises once the retries are exhausted."""
+        errors = self._errors(result)
+        if errors:
+            raise ValueError(f"{self.name}: invalid response after {RETRY_CONFIG['max_retries']} retries: {'; '.join(errors)}")
+        if self.schema is not None:
+            return self.schema.model_validate(result).model_dump()
+        return result
+
+    def _revalidate(self, query, result, image_paths=None):
+        """
+        Re-asks, a bounded number of times with exponential backoff, while the response is invalid.
+        Every retry escalates to the next stronger model tier.
+        """
+        tier = self.tier
+        for attempt in range(RETRY_CONFIG['max_retries']):
+            if not self._errors(result):
+                break
+            METRICS.retry(self.name)
+            time.sleep(self._retry_delay(attempt))
+            tier = stronger_tier(tier)
+            result = self._postprocess(self._invoke(self._build_prompt(self._reask_query(query, result)), image_paths, tier=tier))
+        return self._check(result)
+
+    async def _arevalidate(self, query, result, image_paths=None):
+        tier = self.tier
+        for attempt in range(RETRY_CONFIG['max_retries']):
+            if not self._errors(result):
+                break
+            METRICS.retry(self.name)
+            await asyncio.sleep(self._retry_delay(attempt))
+            tier = stronger_tier(tier)
+            result = self._postprocess(await self._ainvoke(self._build_prompt(self._reask_query(query, result)), image_paths, tier=tier))
+        return self._check(result)
+
+    def _finish(self, query, result):
+        # Append the query and the model response to the history
         if self.single_use:
             self.reset()
+        else:
+            self.history.append({"role": "human", "content": query})
+            self.history.append({"role": "assistant", "content": result})
 
-        # Return the response
+    def run(self, query, image_paths=None):
+        """Generates a response from the model based on the query and history."""
+        full_prompt = self._build_prompt(query)
+        result = self._postprocess(self._invoke(full_prompt, image_paths))
+
+        # Check if the response follows the expected format
+        result = self._revalidate(query, result, image_paths)
+
+        self._finish(query, result)
         return result
 
-    def invoke_image_prompt_template(self, chain, prompt, image_paths):
-        if self.num_images == 1:
-            return chain.invoke({'input':prompt, 'image_path1': image_paths[0], 'detail_parameter': self.image_detail})
-        elif self.num_images == 2:
-            return chain.invoke({'input':prompt, 'image_path1': image_paths[0], 'image_path2': image_paths[1], 'detail_parameter': self.image_detail})
-        elif self.num_images == 3:
-            return chain.invoke({'input':prompt, 'image_path1': image_paths[0], 'image_path2': image_paths[1], 'image_path3': image_paths[2], 'detail_parameter': self.image_detail})
-        elif self.num_images == 4:
-            return chain.invoke({'input':prompt, 'image_path1': image_paths[0], 'image_path2': image_paths[1], 'image_path3': image_paths[2], 'image_path4': image_paths[3], 'detail_parameter': self.image_detail})
+    async def arun(self, query, image_paths=None):
+        """Asynchronous counterpart of run, built on the langchain async path."""
+        full_prompt = self._build_prompt(query)
+        result = self._postprocess(await self._ainvoke(full_prompt, image_paths))
+        result = await self._arevalidate(query, result, image_paths)
+
+        self._finish(query, result)
+        return result
+
+    def run_stream(self, query, on_statement=None, max_retries=2):
+        """
+        Streaming counterpart of run for response_format="code". Tokens are consumed as they arrive, complete
+        top-level statements are handed to on_statement(node, source) and the request is cancelled as soon as
+        the closing fence is seen or the partial program has a syntax error. Responses with a syntax error or
+        without a complete code block are re-issued. Statements of a failed attempt may be delivered again by the next one.
+        """
+        assert self.response_format == "code", "Streaming is only supported for code responses."
+        full_prompt = self._build_prompt(query)
+        for attempt in range(max_retries+1):
+            try:
+                result = self._postprocess(self._invoke_stream(full_prompt, CodeStream(on_statement)))
+                break
+            except (CodeSyntaxError, CodeFenceError) as e:
+                METRICS.retry(self.name)
+                print(f"Invalid streamed program: {e}. Retrying...")
+                full_prompt = self._build_prompt(query + f"\nA previous attempt was invalid ({e}), make sure that the program is valid python in a single ```python block.")
         else:
-            raise ValueError("Number of images should be between 1 and 4.")
+            ## leave the remaining errors to the debugger, a response without code raises as in run
+            result = self._postprocess(self._invoke(full_prompt))
+
+        self._finish(query, result)
+        return result
+
+    def _check_stream(self, stream, text):
+        ## responses that were not streamed are parsed as a whole, raising the same errors
+        stream.feed(text)
+        stream.close()
+        stream.check()
+        return text
+
+    def _stream_message(self, prompt, chunks):
+        message = sum(chunks[1:], chunks[0])
+        if not getattr(message, 'usage_metadata', None):
+            ## usage comes in the last chunk, which never arrives when the request is cancelled after the code block
+            input_tokens, output_tokens = count_tokens(self.system_desc + prompt), count_tokens(message.content)
+            message.usage_metadata = {'input_tokens': input_tokens, 'output_tokens': output_tokens, 'total_tokens': input_tokens+output_tokens}
+        return message
+
+    def _invoke_stream(self, prompt, stream):
+        """
+        Returns the text of the response up to the end of its code block. Raises CodeSyntaxError or CodeFenceError
+        before an incomplete response is recorded or cached.
+        """
+        start = time.time()
+        key, cached = self._cache_lookup(prompt)
+        if cached is not None:
+            self._record(start, [])
+            return self._check_stream(stream, cached)
+        inputs = self._get_inputs(prompt)
+        messages = []
+
+        def call():
+            with get_limiter('openai').slot():
+                chunks = self._get_chain().stream(inputs)
+                try:
+                    for chunk in chunks:
+                        messages.append(chunk)
+                        if stream.feed(chunk.content):
+                            break
+                    stream.close()
+                finally:
+                    ## closing the generator cancels the request
+                    chunks.close()
+            stream.check()
+            return stream.text
+
+        try:
+            result = BACKEND.call('llm', self._request(prompt), call)
+        finally:
+            if len(messages) > 0:
+                self._record(start, [self._stream_message(prompt, messages)])
+        if len(messages) == 0:
+            self._check_stream(stream, result)
+        self._cache_store(key, result)
+        return result
+
+    def run_many(self, queries, image_paths=None, max_concurrency=None):
+        """
+        Runs independent queries through a single batched call, at most max_concurrency requests in flight.
+        Every query sees the same history; results are returned in the order of the queries.
+        """
+        if image_paths is None:
+            image_paths = [None]*len(queries)
+        assert len(image_paths) == len(queries), "image_paths should contain one entry per query."
+
+        start = time.time()
+        prompts = [self._build_prompt(query) for query in queries]
+        results = [None]*len(queries)
+        keys = [None]*len(queries)
+        pending = []
+        for i, prompt in enumerate(prompts):
+            keys[i], cached = self._cache_lookup(prompt, image_paths[i])
+            if cached is not None:
+                results[i] = cached
+                self._record(start, [])
+            else:
+                pending.append(i)
+
+        if len(pending) > 0:
+            requests = [self._request(prompts[i], image_paths[i]) for i in pending]
+            inputs = [self._get_inputs(prompts[i], image_paths[i]) for i in pending]
+
+            messages = []
+            def batch(requests):
+                ## requests are passed through in order, so inputs line up with them
+                ## failed items come back as exceptions, only those are retried
+                ## langchain sends a whole batch at once unless told otherwise, so it never exceeds the provider's cap
+                limiter = get_limiter('openai')
+                concurrency = min(max_concurrency or limiter.max_concurrency, limiter.max_concurrency)
+                run_batch = lambda items: self._get_chain().batch(items, config={"max_concurrency": concurrency}, return_exceptions=True)
+                outputs = limiter.call_many(run_batch, inputs, max_concurrency=concurrency)
+                outputs = [self._parse(output) for output in outputs]
+                messages.extend(message for message, _ in outputs)
+                return [result for _, result in outputs]
+
+            batch_start = time.time()
+            outputs = BACKEND.call_many('llm', requests, batch)
+            latency = time.time()-batch_start
+            if len(messages) == 0:
+                for _ in pending:
+                    self._record(batch_start, [], latency=latency)
+            for message in messages:
+                self._record(batch_start, [message], latency=latency)
+            for i, output in zip(pending, outputs):
+                self._cache_store(keys[i], output)
+                results[i] = output
+
+        for i, query in enumerate(queries):
+            results[i] = self._revalidate(query, self._postprocess(results[i]), image_paths[i])
+            self._finish(query, results[i])
+        return results
+
+    def _missing_keys(self, result):
+        if self.response_format != "json" or not self.json_keys:
+            return []
+        if not isinstance(result, dict):
+            return list(self.json_keys)
+        return [key for key in self.json_keys if key not in result]
+
+    def _errors(self, result):
+        """Describes what is wrong with a response, an empty list means it is valid."""
+        missing = self._missing_keys(result)
+        if missing:
+            return [f"missing keys {missing}"]
+        if self.schema is not None:
+            from pydantic import ValidationError
+            try:
+                self.schema.model_validate(result)
+            except ValidationError as e:
+                return [f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()]
+        return []
+
+    def _request(self, prompt, image_paths=None, tier=None):
+        """Describes the full request; used as the cache and record/replay key."""
+        images = []
+        if self.image_input:
+            for path in image_paths:
+                with open(path, 'rb') as f:
+                    images.append(hashlib.sha256(f.read()).hexdigest())
+        return dict(
+            model=self.model_name if tier is None else get_tier_config(tier)['model'],
+            system_desc=self.system_desc,
+            response_format=self.response_format,
+            json_keys=self.json_keys,
+            schema=self.schema.model_json_schema() if self.schema is not None else None,
+            prompt=prompt,
+            images=images,
+            image_detail=self.image_detail if self.image_input else None,
+        )
+
+    def _cache_key(self, prompt, image_paths=None, tier=None):
+        return ResponseCache.make_key(**self._request(prompt, image_paths, tier))
+
+    def _cache_lookup(self, prompt, image_paths=None, tier=None):
+        if self.cache is None:
+            return None, None
+        key = self._cache_key(prompt, image_paths, tier)
+        return key, self.cache.get(key)
+
+    def _cache_store(self, key, result):
+        ## responses that fail the expected JSON format are never cached
+        if key is not None and not self._errors(result):
+            self.cache.put(key, result)
+
+    def _invoke(self, prompt, image_paths=None, tier=None):
+        """Invokes the chain, serving identical requests from the response cache when enabled."""
+        start = time.time()
+        key, cached = self._cache_lookup(prompt, image_paths, tier)
+        if cached is not None:
+            self._record(start, [])
+            return cached
+        inputs = self._get_inputs(prompt, image_paths)
+        messages = []
+
+        def call():
+            message, result = self._parse(get_limiter('openai').call(lambda: self._get_chain(tier).invoke(inputs)))
+            messages.append(message)
+            return result
+
+        ## identical requests in flight share one call
+        request = self._request(prompt, image_paths, tier)
+        result = SINGLEFLIGHT.do(SINGLEFLIGHT.make_key('llm', request), lambda: BACKEND.call('llm', request, call))
+        self._record(start, messages)
+        self._cache_store(key, result)
+        return result
+
+    async def _ainvoke(self, prompt, image_paths=None, tier=None):
+        start = time.time()
+        key, cached = self._cache_lookup(prompt, image_paths, tier)
+        if cached is not None:
+            self._record(start, [])
+            return cached
+        inputs = self._get_inputs(prompt, image_paths)
+        messages = []
+
+        async def call():
+            message, result = self._parse(await get_limiter('openai').acall(lambda: self._get_chain(tier, asynchronous=True).ainvoke(inputs)))
+            messages.append(message)
+            return result
+
+        result = await BACKEND.acall('llm', self._request(prompt, image_paths, tier), call)
+        self._record(start, messages)
+        self._cache_store(key, result)
+        return result
+
+    def invoke_image_prompt_template(self, chain, prompt, image_paths):
+        return chain.invoke(self._get_inputs(prompt, image_paths))
         
     def prepare_image_prompt_template(self):
         if self.num_images == 1:
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from assets.llm_config import CACHE_CONFIG
+
+class ResponseCache:
+    def __init__(self, path, max_entries=10000, ttl=None):
+        '''
+        Disk-backed, content-addressed store for LLM responses.
+        Each entry lives in its own JSON file named after the request hash; the file mtime doubles as the LRU clock.
+        '''
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.size = len(self._entries())
+
+    @staticmethod
+    def make_key(**request):
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.json')
+
+    def _entries(self):
+        return [f for f in os.listdir(self.path) if f.endswith('.json')]
+
+    def get(self, key):
+        '''
+        Returns the cached response for the key or None on a miss.
+        '''
+        path = self._file(key)
+        with self.lock:
+            try:
+                with open(path, 'r') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if self.ttl is not None and time.time() - entry['created'] > self.ttl:
+                self._remove(path)
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            ## touch the entry so that it becomes the most recently used one
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            return entry['response']
+
+    def put(self, key, response):
+        path = self._file(key)
+        entry = {'created': time.time(), 'response': response}
+        with self.lock:
+            is_new = not os.path.exists(path)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            if is_new:
+                self.size += 1
+            if self.max_entries is not None and self.size > self.max_entries:
+                self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            self.size -= 1
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        for f in self._entries():
+            path = os.path.join(self.path, f)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        self.size = len(entries)
+        entries.sort()
+        for _, path in entries[:max(self.size - self.max_entries, 0)]:
+            self._remove(path)
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            for f in self._entries():
+                self._remove(os.path.join(self.path, f))
+            self.size = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits/total if total > 0 else 0.0,
+            'evictions': self.evictions,
+            'expired': self.expired,
+            'entries': self.size,
+        }
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+def get_response_cache():
+    '''
+    Returns the process-wide response cache configured by CACHE_CONFIG.
+    '''
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache(CACHE_CONFIG['path'], max_entries=CACHE_CONFIG['max_entries'], ttl=CACHE_CONFIG['ttl'])
+    return _CACHE
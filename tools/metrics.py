@@ -0,0 +1,102 @@
+import os
+import json
+import atexit
+import threading
+
+METRICS_DIR = 'tmp/metrics'
+
+class CallMetrics:
+    FIELDS = ['calls', 'cached', 'retries', 'prompt_tokens', 'completion_tokens', 'latency', 'max_latency', 'throttled', 'queue_wait', 'max_queue_depth']
+
+    def __init__(self):
+        '''
+        Per-call-site counters for remote model calls (LLM and agent chats) and rate-limited providers.
+        Fields starting with max_ are maxima, all others are sums.
+        '''
+        self.sites = {}
+        self.lock = threading.Lock()
+
+    def _site(self, site):
+        if site not in self.sites:
+            self.sites[site] = {field: 0 for field in self.FIELDS}
+        return self.sites[site]
+
+    def record(self, site, prompt_tokens=0, completion_tokens=0, latency=0.0, cached=False):
+        with self.lock:
+            counters = self._site(site)
+            counters['calls'] += 1
+            counters['cached'] += int(cached)
+            counters['prompt_tokens'] += prompt_tokens
+            counters['completion_tokens'] += completion_tokens
+            counters['latency'] += latency
+            counters['max_latency'] = max(counters['max_latency'], latency)
+
+    def retry(self, site):
+        with self.lock:
+            self._site(site)['retries'] += 1
+
+    def throttle(self, site, wait, queue_depth):
+        with self.lock:
+            counters = self._site(site)
+            counters['throttled'] += 1
+            counters['queue_wait'] += wait
+            counters['max_queue_depth'] = max(counters['max_queue_depth'], queue_depth)
+
+    def get(self, site=None):
+        '''
+        Returns a copy of the counters of a call site, or of all call sites if site is None.
+        '''
+        with self.lock:
+            if site is not None:
+                return dict(self.sites.get(site, {field: 0 for field in self.FIELDS}))
+            return {name: dict(counters) for name, counters in self.sites.items()}
+
+    def merge(self, sites):
+        with self.lock:
+            for site, other in sites.items():
+                counters = self._site(site)
+                for field in self.FIELDS:
+                    if field.startswith('max_'):
+                        counters[field] = max(counters[field], other.get(field, 0))
+                    else:
+                        counters[field] += other.get(field, 0)
+
+    def report(self):
+        sites = self.get()
+        for counters in sites.values():
+            counters['mean_latency'] = counters['latency']/counters['calls'] if counters['calls'] > 0 else 0.0
+        totals = {field: sum(counters[field] for counters in sites.values()) for field in self.FIELDS if not field.startswith('max_')}
+        ordered = dict(sorted(sites.items(), key=lambda item: -item[1]['latency']))
+        return {'totals': totals, 'sites': ordered}
+
+    def reset(self):
+        with self.lock:
+            self.sites = {}
+
+    def dump(self, path=METRICS_DIR):
+        '''
+        Writes the raw counters of this process to path/<pid>.json so that a parent process can aggregate them.
+        '''
+        if not os.path.isdir(path) or len(self.sites) == 0:
+            return
+        with open(os.path.join(path, f'{os.getpid()}.json'), 'w') as f:
+            json.dump(self.get(), f)
+
+METRICS = CallMetrics()
+
+## scene programs run in subprocesses, their counters are collected through METRICS_DIR
+atexit.register(METRICS.dump)
+
+def collect_report(path=METRICS_DIR):
+    '''
+    Aggregates the counters of this process with those dumped by subprocesses into a single report.
+    '''
+    aggregate = CallMetrics()
+    aggregate.merge(METRICS.get())
+    if os.path.isdir(path):
+        for f in os.listdir(path):
+            if not f.endswith('.json') or f == f'{os.getpid()}.json':
+                continue
+            with open(os.path.join(path, f), 'r') as fp:
+                aggregate.merge(json.load(fp))
+    return aggregate.report()
@@ -0,0 +1,84 @@
+from assets.llm_config import PROMPT_CONFIG
+
+_ENCODING = None
+
+def _get_encoding():
+    global _ENCODING
+    if _ENCODING is None:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding(PROMPT_CONFIG['encoding'])
+        except Exception:
+            ## tiktoken is optional, fall back to the usual ~4 characters per token estimate
+            _ENCODING = False
+    return _ENCODING
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return (len(text)+3)//4
+
+def truncate(text, max_tokens, keep='head'):
+    '''
+    Trims text to at most max_tokens tokens, keeping its head or its tail.
+    '''
+    if max_tokens is None or count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    marker = "\n...[truncated]...\n"
+    if encoding:
+        tokens = encoding.encode(text)
+        return encoding.decode(tokens[:max_tokens]) + marker if keep == 'head' else marker + encoding.decode(tokens[-max_tokens:])
+    return text[:max_tokens*4] + marker if keep == 'head' else marker + text[-max_tokens*4:]
+
+def get_budget(site, section):
+    return PROMPT_CONFIG['budgets'].get(site, {}).get(section)
+
+class PromptBuilder:
+    def __init__(self, site=None):
+        '''
+        Assembles a prompt as static content, retrieved examples and dynamic content, in that order.
+        Static content (API documentation, guidelines) is identical across calls so it forms a stable prefix that
+        the provider can cache. Examples and trimmable dynamic sections are cut to the token budgets configured
+        for the call site in PROMPT_CONFIG.
+        '''
+        self.site = site
+        self.static_parts = []
+        self.example_parts = []
+        self.dynamic_parts = []
+
+    def add_static(self, text):
+        self.static_parts.append(text)
+        return self
+
+    def add_examples(self, header, examples, section='examples'):
+        '''
+        examples are ordered by relevance, the least relevant ones are dropped first when over budget.
+        '''
+        budget = get_budget(self.site, section)
+        kept = []
+        used = count_tokens(header)
+        for example in examples:
+            tokens = count_tokens(example)
+            if budget is not None and used + tokens > budget:
+                if len(kept) == 0:
+                    ## always keep (part of) the most relevant example
+                    kept.append(truncate(example, max(budget - used, 0)))
+                break
+            kept.append(example)
+            used += tokens
+        self.example_parts.append(header + "\n" + "\n".join(kept))
+        return self
+
+    def add_dynamic(self, text, section=None, keep='head'):
+        if section is not None:
+            text = truncate(text, get_budget(self.site, section), keep=keep)
+        self.dynamic_parts.append(text)
+        return self
+
+    def build(self):
+        return "\n".join(self.static_parts + self.example_parts + self.dynamic_parts)
+
+    def count(self):
+        return count_tokens(self.build())
@@ -0,0 +1,199 @@
+import time
+import random
+import asyncio
+import threading
+from contextlib import contextmanager
+from assets.llm_config import RATE_LIMIT_CONFIG
+from tools.metrics import METRICS
+
+RETRYABLE_STATUS = [408, 409, 429]
+RETRYABLE_ERRORS = ['RateLimitError', 'APITimeoutError', 'APIConnectionError', 'InternalServerError', 'ConnectError', 'ReadTimeout', 'TimeoutException']
+
+def get_status(e):
+    for attr in ['status_code', 'error_code', 'status']:
+        status = getattr(e, attr, None)
+        if status is None:
+            status = getattr(getattr(e, 'response', None), attr, None)
+        try:
+            return int(status)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def is_retryable(e):
+    '''
+    Rate limits (429), server errors (5xx), timeouts and dropped connections are retried, anything else is raised.
+    '''
+    status = get_status(e)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(e).__name__ in RETRYABLE_ERRORS
+
+class RateLimiter:
+    def __init__(self, provider, rate, burst, max_concurrency, max_retries=5, backoff=1.0, max_backoff=30.0):
+        '''
+        Token bucket (rate requests per second, up to burst at once) combined with a cap on requests in flight.
+        Requests waiting for either are counted as the queue; throttling is recorded in METRICS under ratelimit.<provider>.
+        '''
+        self.provider = provider
+        self.site = f"ratelimit.{provider}"
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.waiting = 0
+        self.cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now-self.updated)*self.rate)
+        self.updated = now
+
+    def _try_acquire(self, tokens, slots):
+        '''
+        Takes the tokens and slots if available, otherwise returns how long to wait before trying again.
+        '''
+        self._refill()
+        slots = min(slots, self.max_concurrency)
+        tokens = min(tokens, self.burst)
+        if self.in_flight + slots > self.max_concurrency:
+            return None
+        if self.tokens < tokens:
+            return (tokens-self.tokens)/self.rate
+        self.tokens -= tokens
+        self.in_flight += slots
+        return 0.0
+
+    def try_acquire(self, tokens=1, slots=1):
+        '''
+        Takes the tokens and slots only if they are available right away, returns whether it did.
+        '''
+        with self.cond:
+            return self._try_acquire(tokens, slots) == 0.0
+
+    def acquire(self, tokens=1, slots=1):
+        start = time.monotonic()
+        with self.cond:
+            wait = self._try_acquire(tokens, slots)
+            if wait == 0.0:
+                return
+            self.waiting += 1
+            depth = self.waiting
+            try:
+                while wait != 0.0:
+                    ## None means no free slot, release() notifies
+                    self.cond.wait(timeout=wait)
+                    wait = self._try_acquire(tokens, slots)
+            finally:
+                self.waiting -= 1
+        METRICS.throttle(self.site, time.monotonic()-start, depth)
+
+    async def aacquire(self, tokens=1, slots=1):
+        start = time.monotonic()
+        with self.cond:
+            wait = self._try_acquire(tokens, slots)
+            if wait == 0.0:
+                return
+            self.waiting += 1
+            depth = self.waiting
+        try:
+            while wait != 0.0:
+                await asyncio.sleep(wait if wait is not None else 0.05)
+                with self.cond:
+                    wait = self._try_acquire(tokens, slots)
+        finally:
+            with self.cond:
+                self.waiting -= 1
+        METRICS.throttle(self.site, time.monotonic()-start, depth)
+
+    def release(self, slots=1):
+        with self.cond:
+            self.in_flight -= min(slots, self.max_concurrency)
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self, tokens=1, slots=1):
+        self.acquire(tokens, slots)
+        try:
+            yield
+        finally:
+            self.release(slots)
+
+    def _delay(self, attempt):
+        ## full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff*(2**attempt)))
+
+    def call(self, fn, tokens=1, slots=1):
+        '''
+        Runs fn within the limits, retrying retryable errors with jittered exponential backoff.
+        '''
+        for attempt in range(self.max_retries+1):
+            try:
+                with self.slot(tokens, slots):
+                    return fn()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                METRICS.retry(self.site)
+                time.sleep(self._delay(attempt))
+
+    def call_many(self, fn, items, max_concurrency=None):
+        '''
+        Runs fn on a list of items within the limits, one token and one slot per item. Items are sent in chunks no larger
+        than the burst and the concurrency cap (and max_concurrency if given), each chunk waiting for its own tokens.
+        fn returns one result per item, with the exception in place of the result of an item that failed. Only the items
+        that failed with a retryable error are run again; results are returned in the order of the items.
+        '''
+        size = max(1, int(min(self.burst, self.max_concurrency, max_concurrency or self.max_concurrency)))
+        results = [None]*len(items)
+        pending = list(range(len(items)))
+        for attempt in range(self.max_retries+1):
+            failed = []
+            for start in range(0, len(pending), size):
+                chunk = pending[start:start+size]
+                with self.slot(len(chunk), len(chunk)):
+                    outputs = fn([items[i] for i in chunk])
+                for i, output in zip(chunk, outputs):
+                    if isinstance(output, Exception):
+                        if attempt == self.max_retries or not is_retryable(output):
+                            raise output
+                        failed.append(i)
+                    else:
+                        results[i] = output
+            if len(failed) == 0:
+                break
+            METRICS.retry(self.site)
+            time.sleep(self._delay(attempt))
+            pending = failed
+        return results
+
+    async def acall(self, afn, tokens=1, slots=1):
+        for attempt in range(self.max_retries+1):
+            await self.aacquire(tokens, slots)
+            try:
+                return await afn()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                METRICS.retry(self.site)
+            finally:
+                self.release(slots)
+            await asyncio.sleep(self._delay(attempt))
+
+    def stats(self):
+        with self.cond:
+            return {'in_flight': self.in_flight, 'waiting': self.waiting, 'tokens': self.tokens}
+
+RATE_LIMITERS = {
+    provider: RateLimiter(provider, **limits, **RATE_LIMIT_CONFIG['retry'])
+    for provider, limits in RATE_LIMIT_CONFIG['providers'].items()
+}
+
+def get_limiter(provider):
+    return RATE_LIMITERS[provider]
@@ -0,0 +1,21 @@
+from assets.llm_config import ROUTING_CONFIG
+
+def get_tier(name, force_accurate=False):
+    '''
+    Returns the model tier of a call-site label, force_accurate always routes to the strongest configured tier.
+    '''
+    if force_accurate:
+        return ROUTING_CONFIG['force_accurate_tier']
+    return ROUTING_CONFIG['routes'].get(name, ROUTING_CONFIG['default_tier'])
+
+def get_tier_config(tier):
+    return ROUTING_CONFIG['tiers'][tier]
+
+def stronger_tier(tier):
+    '''
+    Returns the next tier in the escalation order, or tier itself if it is already the strongest.
+    '''
+    order = ROUTING_CONFIG['order']
+    if tier not in order:
+        return tier
+    return order[min(order.index(tier)+1, len(order)-1)]
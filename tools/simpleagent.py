@@ -1,7 +1,11 @@
-from autogen import UserProxyAgent, ConversableAgent, GroupChat, GroupChatManager
+import time
+from autogen import UserProxyAgent, ConversableAgent, GroupChat, GroupChatManager, gather_usage_summary
 from tools.llm import LLM
 from assets.llm_config import LLM_CONFIG
 from tools.rag import Retriever
+from tools.backend import BACKEND
+from tools.metrics import METRICS
+from tools.singleflight import SINGLEFLIGHT
 
 class SimpleAgent:
     def __init__(self, name, role, description, context=None, concluding_llm=None, additional_context=None, chunk_size=512, critic_description=None, force_accurate=False):
@@ -35,7 +39,7 @@ class SimpleAgent:
         if concluding_llm:
             self.concluding_llm = concluding_llm
         else:
-            self.concluding_llm = LLM(single_use=True, system_desc="You are a helpful assistant that goes through a chat and generates a reponse based on the query.", response_format="text")
+            self.concluding_llm = LLM(single_use=True, system_desc="You are a helpful assistant that goes through a chat and generates a reponse based on the query.", response_format="text", name=f"{name}.concluding_llm")
 
         self.agent = ConversableAgent(
             name=name,
@@ -48,7 +52,7 @@ class SimpleAgent:
         )
         
         if critic_description:
-            self.critic = LLM(single_use=True, system_desc=critic_description+self.additional_context, response_format="text", force_accurate=force_accurate)
+            self.critic = LLM(single_use=True, system_desc=critic_description+self.additional_context, response_format="text", force_accurate=force_accurate, name=f"{name}.critic")
         else:
             self.critic = None
             
@@ -72,9 +76,32 @@ class SimpleAgent:
         self.tool_agent.register_for_execution(name=name)(tool)
 
     def respond(self, query):
-        if self.critic:
-            return self.__respond_with_critic(query)
-        return self.__respond(query)
+        request = {
+            'name': self.name,
+            'description': self.description + self.additional_context,
+            'query': query,
+            'response_format': self.concluding_llm.response_format,
+            'json_keys': self.concluding_llm.json_keys,
+            'schema': self.concluding_llm.schema.model_json_schema() if self.concluding_llm.schema is not None else None,
+        }
+        respond_fn = self.__respond_with_critic if self.critic else self.__respond
+        ## concurrent identical requests, e.g. the same description from several scenes, share one chat
+        return SINGLEFLIGHT.do(SINGLEFLIGHT.make_key('agent', request), lambda: BACKEND.call('agent', request, lambda: respond_fn(query)))
+    
+    def _usage(self):
+        ## cumulative tokens used by the autogen agents, the chat metrics are recorded as deltas
+        summary = gather_usage_summary([self.agent, self.tool_agent])['usage_including_cached_inference']
+        prompt_tokens = sum(usage['prompt_tokens'] for usage in summary.values() if isinstance(usage, dict))
+        completion_tokens = sum(usage['completion_tokens'] for usage in summary.values() if isinstance(usage, dict))
+        return prompt_tokens, completion_tokens
+    
+    def _chat(self, query):
+        start = time.time()
+        prompt_tokens, completion_tokens = self._usage()
+        result = self.tool_agent.initiate_chat(self.agent, message=query, summary_method="last_msg", human_input_mode="NEVER",silent=False)
+        new_prompt_tokens, new_completion_tokens = self._usage()
+        METRICS.record(f"{self.name}.chat", prompt_tokens=new_prompt_tokens-prompt_tokens, completion_tokens=new_completion_tokens-completion_tokens, latency=time.time()-start)
+        return result
     
     def __respond(self, query):
         if self.retriever:
@@ -82,7 +109,7 @@ class SimpleAgent:
             prompt = f"\nFollowing are an example of how your response should look like:\n{context}\nRefrain from simply outputing the example responses, use your own creativity!\n"   
             query = prompt + query
         
-        result = self.tool_agent.initiate_chat(self.agent, message=query, summary_method="last_msg", human_input_mode="NEVER",silent=False)
+        result = self._chat(query)
         prompt = f"Query: {query}. \n Chat: {result}"
         prompt += f"\n Generate a response to the query based on the above chat. \nYour response:"
         result = self.concluding_llm.run(prompt)
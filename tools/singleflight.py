@@ -0,0 +1,61 @@
+import copy
+import json
+import hashlib
+import threading
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self):
+        '''
+        Coalesces identical concurrent requests: the first caller of a key runs the function, callers arriving while
+        it is in flight wait for it and receive a copy of its result (or its exception). Nothing is kept once the
+        call completes, persistent caching is left to the response cache.
+        '''
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(namespace, request):
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return namespace + ':' + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            ## waiters get their own copy, callers are free to mutate results
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+    def stats(self):
+        with self.lock:
+            return {'executed': self.executed, 'coalesced': self.coalesced, 'in_flight': len(self.calls)}
+
+SINGLEFLIGHT = SingleFlight()
@@ -1,13 +1,18 @@
-import bentoml
 from PIL import Image
-def text2img(text):
-    # with bentoml.SyncHTTPClient("http://localhost:4000") as client:
-    with bentoml.SyncHTTPClient("http://chetak.ucsd.edu:3003") as client:
-        result = client.txt2img(
-            prompt=text,
-            num_inference_steps=1,
-            guidance_scale=0.0
-        )
+from tools.backend import BACKEND, encode_image, decode_image
+from tools.ratelimit import get_limiter
+from tools.bento import get_service
+
+def _txt2img(text):
+    result = get_service('text2img').call('txt2img',
+        prompt=text,
+        num_inference_steps=1,
+        guidance_scale=0.0
+    )
     
     result = Image.open(result)
     return result
+
+def text2img(text):
+    request = {'prompt': text, 'num_inference_steps': 1, 'guidance_scale': 0.0}
+    return BACKEND.call('text2img', request, lambda: get_limiter('text2img').call(lambda: _txt2img(text)), encode=encode_image, decode=decode_image)